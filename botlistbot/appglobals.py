@@ -1,17 +1,54 @@
 import os
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 
 from decouple import config
 from peewee import Proxy
 from playhouse.db_url import connect
+from playhouse.pool import PooledDatabase
+
+from botlistbot import metrics
+from botlistbot import settings
+from botlistbot.lib.ratelimiter import RateLimiter
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 ACCOUNTS_DIR = Path(ROOT_DIR) / "accounts"
 
 DATABASE_PATH = config('DATABASE_URL')
 
-_auto_typed_db = connect(DATABASE_PATH)
+
+def _pooled_url(url: str) -> str:
+    """ Uses the pooled variant of the Postgres backends, e.g. postgres:// -> postgresext+pool:// """
+    parts = urlsplit(url)
+    if parts.scheme in ('postgres', 'postgresql', 'postgresext', 'postgresqlext'):
+        return urlunsplit(parts._replace(scheme='postgresext+pool'))
+    return url
+
+
+if settings.DATABASE_POOL_SIZE > 0 and _pooled_url(DATABASE_PATH) != DATABASE_PATH:
+    _auto_typed_db = connect(
+        _pooled_url(DATABASE_PATH),
+        max_connections=settings.DATABASE_POOL_SIZE,
+        stale_timeout=settings.DATABASE_STALE_TIMEOUT,
+        timeout=settings.DATABASE_POOL_TIMEOUT,
+    )
+else:
+    _auto_typed_db = connect(DATABASE_PATH)
 _auto_typed_db.autorollback = True
 
 db = Proxy()
 db.initialize(_auto_typed_db)
+
+
+def is_pooled() -> bool:
+    return isinstance(db.obj, PooledDatabase)
+
+
+# Shared by everything that sends many messages: the channel publisher, notifications, broadcasts
+rate_limiter = RateLimiter(
+    global_rate=settings.TELEGRAM_GLOBAL_RATE,
+    private_rate=settings.TELEGRAM_PRIVATE_CHAT_RATE,
+    group_rate=settings.TELEGRAM_GROUP_RATE,
+    group_burst=settings.TELEGRAM_GROUP_BURST,
+)
+metrics.register('Telegram rate limiter', lambda: rate_limiter.stats)
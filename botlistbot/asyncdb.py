@@ -0,0 +1,105 @@
+"""
+Runs blocking peewee work off the asyncio event loop.
+
+All database access of the handlers goes through `run`, which executes the given callable in
+a bounded pool of `settings.DB_WORKERS` threads. With a pooled database, every call checks out
+a connection and returns it afterwards. Otherwise each worker keeps its own connection.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from botlistbot import appglobals
+from botlistbot import metrics
+from botlistbot import settings
+from botlistbot.appglobals import db
+
+executor = ThreadPoolExecutor(max_workers=settings.DB_WORKERS, thread_name_prefix='db')
+
+_lock = threading.Lock()
+_waiting = 0
+_running = 0
+_calls = 0
+_wait_times = deque(maxlen=1000)  # ms spent queued, of the most recent calls
+_run_times = deque(maxlen=1000)  # ms spent executing, of the most recent calls
+_checkout_times = deque(maxlen=1000)  # ms spent waiting for a pooled connection
+
+
+async def run(func: Callable, *args, **kwargs) -> Any:
+    """ Awaits `func(*args, **kwargs)`, executed by one of the database worker threads """
+    return await asyncio.wrap_future(submit(func, *args, **kwargs))
+
+
+def submit(func: Callable, *args, **kwargs) -> Future:
+    """ Schedules `func(*args, **kwargs)` on one of the database worker threads """
+    global _waiting
+    with _lock:
+        _waiting += 1
+    return executor.submit(_call, time.perf_counter(), func, args, kwargs)
+
+
+def _call(submitted: float, func: Callable, args, kwargs):
+    global _waiting, _running, _calls
+    start = time.perf_counter()
+    with _lock:
+        _waiting -= 1
+        _running += 1
+    pooled = appglobals.is_pooled()
+    try:
+        if pooled:
+            db.connect(reuse_if_open=True)
+            checked_out = time.perf_counter()
+            _checkout_times.append((checked_out - start) * 1000)
+        return func(*args, **kwargs)
+    finally:
+        if pooled:
+            db.close()
+        end = time.perf_counter()
+        with _lock:
+            _running -= 1
+            _calls += 1
+            _wait_times.append((start - submitted) * 1000)
+            _run_times.append((end - start) * 1000)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 2)
+
+
+def stats() -> dict:
+    with _lock:
+        wait_times = list(_wait_times)
+        run_times = list(_run_times)
+        return dict(
+            workers=settings.DB_WORKERS,
+            waiting=_waiting,
+            running=_running,
+            calls=_calls,
+            wait_p50_ms=_percentile(wait_times, 0.5),
+            wait_p99_ms=_percentile(wait_times, 0.99),
+            run_p50_ms=_percentile(run_times, 0.5),
+            run_p99_ms=_percentile(run_times, 0.99),
+        )
+
+
+def pool_stats() -> dict:
+    pool = db.obj
+    checkout_times = list(_checkout_times)
+    return dict(
+        max_connections=pool._max_connections,
+        in_use=len(pool._in_use),
+        idle=len(pool._connections),
+        checkout_p50_ms=_percentile(checkout_times, 0.5),
+        checkout_p99_ms=_percentile(checkout_times, 0.99),
+    )
+
+
+metrics.register('Database workers', stats)
+if appglobals.is_pooled():
+    metrics.register('Database pool', pool_stats)
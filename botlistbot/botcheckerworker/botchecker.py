@@ -1,8 +1,8 @@
 #!/usr/bin/python3
-from collections import Counter
+from collections import Counter, defaultdict
 
 import asyncio
-import filecmp
+import itertools
 import logging
 import os
 import re
@@ -12,6 +12,7 @@ import traceback
 from datetime import datetime, timedelta
 from logzero import logger as log
 
+from playhouse.signals import post_save, pre_save
 from pyrogram.raw.functions.contacts import ResolveUsername as Search
 from pyrogram.raw.functions.messages import DeleteHistory
 from pyrogram.raw.functions.users import GetUsers
@@ -36,15 +37,25 @@ except ImportError:
     InlineResultContainer = None
     Response = None
 
-from typing import Union
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
 
+from botlistbot import asyncdb
 from botlistbot import captions
 from botlistbot import helpers
+from botlistbot import searchindex
 from botlistbot import settings
 from botlistbot import util
 from botlistbot.const import CallbackActions
 from botlistbot.helpers import make_sticker
-from botlistbot.models import Bot, Bot as BotModel, Keyword
+from botlistbot.lib.keywordmatcher import KeywordMatcher
+from botlistbot.botcheckerworker import digest as notifications
+from botlistbot.botcheckerworker import scheduler
+from botlistbot.botcheckerworker.digest import Digest
+from botlistbot.botcheckerworker.pool import CheckerPool
+from botlistbot.models import Bot, Bot as BotModel, BotIndex, Keyword
+from botlistbot.models.bot import photo_store
+from botlistbot.models.botcheck import BotCheck, CheckHistory, percentile
+from botlistbot.models.uptime import BotUptime
 
 logging.getLogger().setLevel(logging.WARNING)
 
@@ -53,12 +64,24 @@ ZERO_CHAR2 = u"\u200B"  # ZERO-WIDTH-SPACE
 botbuilder_pattern = re.compile('|'.join(settings.BOTBUILDER_DETERMINERS), re.IGNORECASE)
 offline_pattern = re.compile('|'.join(settings.OFFLINE_DETERMINERS), re.IGNORECASE)
 
+PAGE_SIZE = 50  # bots read from the database at once
+IDLE_INTERVAL = 0.5  # seconds a worker waits when there is no bot to check
+
 TMP_DIR = os.path.join(settings.BOT_THUMBNAIL_DIR, "tmp")
 if os.path.exists(TMP_DIR):
     shutil.rmtree(TMP_DIR)
 os.makedirs(TMP_DIR)
 
 
+class PingTiming(NamedTuple):
+    first_response: int  # milliseconds
+    full_response: int
+
+
+def _timestamp(date) -> float:
+    return date.timestamp() if isinstance(date, datetime) else float(date)
+
+
 def zero_width_encoding(encoded_string):
     if not encoded_string:
         return None
@@ -80,7 +103,7 @@ class BotChecker(_BaseClass):
         self.username_flood_until = None
         self._message_intervals = {}
         self._last_ping = None
-        self.__photos_lock = asyncio.Lock()
+        self.__downloads = asyncio.Semaphore(settings.PROFILE_PICTURE_DOWNLOADS)
 
         if InteractionClientAsync is not None:
             super(BotChecker, self).__init__(
@@ -138,26 +161,35 @@ class BotChecker(_BaseClass):
     async def get_ping_response(
             self,
             to_check: Bot,
-            timeout=30,
+            timeout=settings.PING_TIMEOUT,
             try_inline=True
-    ) -> Union[Response, InlineResultContainer]:
+    ) -> Tuple[Union[Response, InlineResultContainer, bool], Optional[PingTiming]]:
+        """
+        :return: The response, or False if the bot is offline, and how long the bot took to
+            respond
+        """
+        sent_at = time.time()
         response = await self.ping_bot(
             to_check.chat_id,
             override_messages=settings.PING_MESSAGES,
             max_wait_response=timeout,
             raise_=False
         )
+        full = round((time.time() - sent_at) * 1000)
         if response.empty:
             if try_inline and to_check.inlinequeries:
                 for q in settings.PING_INLINEQUERIES:
+                    inline_sent_at = time.time()
                     try:
-                        return self.get_inline_bot_results(to_check.username, q)
+                        results = self.get_inline_bot_results(to_check.username, q)
                     except UnknownError as e:
                         if "timeout" in e.MESSAGE.lower():
                             continue
                         else:
                             raise e
-                return False
+                    took = round((time.time() - inline_sent_at) * 1000)
+                    return results, PingTiming(took, took)
+                return False, None
 
         # Evaluate WJClub's ParkMeBot flags
         reserved_username = ZERO_CHAR1 + ZERO_CHAR1 + ZERO_CHAR1 + ZERO_CHAR1
@@ -166,11 +198,16 @@ class BotChecker(_BaseClass):
 
         full_text = response.full_text
         if zero_width_encoding(full_text) in (reserved_username, parked, maintenance):
-            return False
+            return False, None
         if offline_pattern.search(full_text):
-            return False
+            return False, None
+        if response.empty:
+            return response, None
 
-        return response
+        # message dates have a resolution of seconds
+        first_at = min(_timestamp(m.date) for m in response.messages)
+        first = min(max(round((first_at - sent_at) * 1000), 0), full)
+        return response, PingTiming(first, full)
 
     def resolve_bot(self, bot: BotModel):
         if bot.chat_id:
@@ -197,43 +234,106 @@ class BotChecker(_BaseClass):
 
         return None
 
-    async def download_profile_photo(self, bot: BotModel, photo_path):
-        tmp_file = os.path.join(TMP_DIR, bot.username.replace('@', '') + '.jpg')
+    async def download_profile_photo(self, bot: BotModel) -> bool:
+        """
+        Downloads the profile photo of `bot` into the photo store, unless the photo id is the
+        same as on the last download.
+
+        :return: Whether the bot has a new profile picture
+        """
         photos = self.get_user_profile_photos(bot.chat_id).photos
-        if photos:
-            photo_size_object = photos[0][-1]
+        if not photos:
+            return False
+        photo_size_object = photos[0][-1]
+        photo_id = getattr(photo_size_object, 'file_unique_id', None) or \
+            getattr(photo_size_object, 'file_id', None)
+        if photo_id and photo_id == bot.photo_id and bot.photo_hash in photo_store:
+            return False
 
-            await self.__photos_lock.acquire()
+        tmp_file = os.path.join(TMP_DIR, '{}.jpg'.format(bot.id))
+        async with self.__downloads:
             try:
-                try:
-                    self.download_media(
-                        photo_size_object,
-                        file_name=tmp_file,
-                        block=True
-                    )
-                except FloodWait as e:
-                    wait_seconds = getattr(e, 'x', getattr(e, 'value', 60))
-                    log.debug(f"FloodWait for downloading media ({wait_seconds})")
-
-                if os.path.exists(tmp_file):
-                    try:
-                        similar = filecmp.cmp(tmp_file, photo_path, shallow=False)
-                    except FileNotFoundError:
-                        similar = False
+                self.download_media(
+                    photo_size_object,
+                    file_name=tmp_file,
+                    block=True
+                )
+            except FloodWait as e:
+                wait_seconds = getattr(e, 'x', getattr(e, 'value', 60))
+                log.debug(f"FloodWait for downloading media ({wait_seconds})")
 
-                    if not similar:
-                        shutil.copy(tmp_file, photo_path)
-            finally:
-                self.__photos_lock.release()
+        if not os.path.exists(tmp_file):
+            return False
+        photo_hash = photo_store.put(tmp_file)
+        changed = photo_hash != bot.photo_hash
+        bot.photo_id = photo_id
+        bot.photo_hash = photo_hash
+        return changed
+
+
+def ping_timeout(to_check: BotModel, latencies: List[int]) -> float:
+    """
+    Seconds to wait for the response of a bot: a few times its usual response time when it was
+    online and has been measured often enough, the full `settings.PING_TIMEOUT` otherwise.
+    """
+    if to_check.offline or len(latencies) < 5:
+        return settings.PING_TIMEOUT
+    usual = percentile(latencies, 0.95) / 1000
+    return min(max(usual * settings.PING_TIMEOUT_FACTOR, settings.PING_MIN_TIMEOUT),
+               settings.PING_TIMEOUT)
+
+
+def save_checked(bots: List[BotModel]):
+    """
+    Writes the changed fields of the given bots with one bulk UPDATE per combination of changed
+    fields. The save signals are sent as for `Bot.save`, so that the indexes are updated.
+    """
+    groups = defaultdict(list)
+    for checked in bots:
+        if checked._dirty:
+            groups[tuple(sorted(checked._dirty))].append(checked)
+
+    with BotModel._meta.database.atomic():
+        for names, group in groups.items():
+            for checked in group:
+                pre_save.send(checked, created=False)
+            BotModel.bulk_update(group, fields=[BotModel._meta.fields[n] for n in names])
+            for checked in group:
+                checked._dirty.clear()
+                post_save.send(checked, created=False)
+
+
+async def persist(to_check: BotModel, before: dict, writes: Optional[asyncio.Queue]):
+    """ Saves the fields of `to_check` that differ from `before`, through the writer if given """
+    to_check._dirty = {n for n in to_check._dirty if to_check.__data__.get(n) != before.get(n)}
+    if writes is None:
+        await asyncdb.run(save_checked, [to_check])
+    else:
+        await writes.put(to_check)
+
+
+async def postpone(to_check: BotModel, before: dict, writes: Optional[asyncio.Queue]):
+    """ Retries a bot that could not be pinged after the regular interval """
+    to_check.next_check = scheduler.postponed(datetime.now())
+    await persist(to_check, before, writes)
 
 
 async def check_bot(
         telegram_bot,
         bot_checker: BotChecker,
         to_check: BotModel,
-        result_queue: asyncio.Queue
+        result_queue: asyncio.Queue,
+        history: CheckHistory = None,
+        latencies: List[int] = None,
+        matcher: KeywordMatcher = None,
+        writes: asyncio.Queue = None,
+        digest: Digest = None
 ):
     log.debug("Checking bot {}...".format(to_check.username))
+    own_digest = digest is None
+    if own_digest:
+        digest = Digest(telegram_bot)
+    before = dict(to_check.__data__)
 
     try:
         peer = bot_checker.resolve_bot(to_check)
@@ -250,24 +350,29 @@ async def check_bot(
             await telegram_bot.send_message(settings.BLSF_ID, text, reply_markup=markup)
         except BadRequest:
             await telegram_bot.send_notification(text)
+        await postpone(to_check, before, writes)
         return await result_queue.put('not found')
 
     if not peer:
+        await postpone(to_check, before, writes)
         return await result_queue.put('skipped')
 
     bot_checker.update_bot_details(to_check, peer=peer)
 
     # Check online state
+    latencies = latencies if latencies is not None else []
     try:
-        response = await bot_checker.get_ping_response(
+        response, timing = await bot_checker.get_ping_response(
             to_check,
-            timeout=30,
+            timeout=ping_timeout(to_check, latencies),
             try_inline=to_check.inlinequeries)
     except UnknownError as e:
+        await postpone(to_check, before, writes)
         await result_queue.put(e.MESSAGE)
         return
     except Exception as e:
         log.exception(e)
+        await postpone(to_check, before, writes)
         await result_queue.put(str(e))
         return
 
@@ -277,45 +382,72 @@ async def check_bot(
     was_offline = to_check.offline
     is_offline = response.empty if isinstance(response, Response) else not bool(response)
 
+    if is_offline:
+        timing = None
+    if timing:
+        latencies.append(timing.first_response)
+        to_check.latency = percentile(latencies, 0.9)
+
     now = datetime.now()
     to_check.last_ping = now
     if not is_offline:
         to_check.last_response = now
 
+    changed = was_offline != is_offline
+    BotCheck.record(
+        to_check, now, online=not is_offline, changed=changed,
+        latency=timing.first_response if timing else None,
+        full_latency=timing.full_response if timing else None,
+        path=None if is_offline else
+        BotCheck.MESSAGE if isinstance(response, Response) else BotCheck.INLINE)
+    to_check.next_check = now + scheduler.next_check_interval(
+        to_check, history, now, online=not is_offline, changed=changed)
+
     if was_offline != is_offline:
-        await telegram_bot.send_message(settings.BOTLIST_NOTIFICATIONS_ID, '{} went {}.'.format(
-            to_check.str_no_md,
-            'offline' if to_check.offline else 'online'
-        ), timeout=40)
+        await digest.add(
+            notifications.WENT_OFFLINE if to_check.offline else notifications.CAME_ONLINE,
+            to_check.str_no_md)
 
-    await add_keywords(telegram_bot, response, to_check)
+    await add_keywords(telegram_bot, response, to_check, matcher, digest)
 
     # Download profile picture
     if settings.DOWNLOAD_PROFILE_PICTURES:
-        await download_profile_picture(telegram_bot, bot_checker, to_check)
+        await download_profile_picture(telegram_bot, bot_checker, to_check, digest)
 
-    to_check.save()
+    await disable_decider(telegram_bot, to_check, digest)
+    await persist(to_check, before, writes)
 
     if settings.DELETE_CONVERSATION_AFTER_PING:
         await bot_checker.schedule_conversation_deletion(to_check.chat_id, 10)
 
-    await disable_decider(telegram_bot, to_check)
-
+    if own_digest:
+        await digest.flush()
     await result_queue.put('offline' if to_check.offline else 'online')
 
 
-async def download_profile_picture(telegram_bot, bot_checker, to_check):
-    photo_file = to_check.thumbnail_file
+async def download_profile_picture(telegram_bot, bot_checker, to_check, digest: Digest = None):
     sticker_file = os.path.join(settings.BOT_THUMBNAIL_DIR, '_sticker_tmp.webp')
-    await bot_checker.download_profile_photo(to_check, photo_file)
+    if not await bot_checker.download_profile_photo(to_check):
+        return
+    photo_file = to_check.thumbnail_file
     if settings.NOTIFY_NEW_PROFILE_PICTURE:
         make_sticker(photo_file, sticker_file)
+        if digest is not None:
+            await digest.add_picture(to_check.username, photo_file)
+            return
         await telegram_bot.send_notification("New profile picture of {}:".format(to_check.username))
         await telegram_bot.send_sticker(settings.BOTLIST_NOTIFICATIONS_ID,
                          open(photo_file, 'rb'), timeout=360)
 
 
-async def add_keywords(telegram_bot, response, to_check):
+def keyword_matcher() -> KeywordMatcher:
+    """ Matches all keywords in use, except for the forbidden ones """
+    return KeywordMatcher(
+        k for k in Keyword.vocabulary() if k not in settings.FORBIDDEN_KEYWORDS)
+
+
+async def add_keywords(telegram_bot, response, to_check, matcher: KeywordMatcher = None,
+                       digest: Digest = None):
     if not isinstance(response, Response) or response.empty:
         return
 
@@ -325,15 +457,16 @@ async def add_keywords(telegram_bot, response, to_check):
         to_check.botbuilder = True
 
     # Search /start and /help response for global list of keywords
-    to_add = []
-    for name in Keyword.get_distinct_names(exclude_from_bot=to_check):
-        if re.search(r'\b{}\b'.format(name), full_text, re.IGNORECASE):
-            to_add.append(name)
-
-    to_add = [x for x in to_add if x not in settings.FORBIDDEN_KEYWORDS]
+    if matcher is None:
+        matcher = keyword_matcher()
+    found = matcher.find(full_text)
+    to_add = await asyncdb.run(_save_keywords, to_check, found) if found else []
 
     if to_add:
-        Keyword.insert_many([dict(name=k, entity=to_check) for k in to_add]).execute()
+        if digest is not None:
+            await digest.add(notifications.NEW_KEYWORDS, '{}: {}'.format(
+                to_check.str_no_md, ', '.join(['#' + k for k in to_add])))
+            return
         msg = 'New keyword{}: {} for {}.'.format(
             's' if len(to_add) > 1 else '',
             ', '.join(['#' + k for k in to_add]),
@@ -342,6 +475,16 @@ async def add_keywords(telegram_bot, response, to_check):
         log.info(msg)
 
 
+def _save_keywords(to_check: BotModel, found: Iterable[str]) -> List[str]:
+    """ Adds the keywords the bot does not have yet and returns them """
+    to_add = sorted(set(found) - {k.name for k in to_check.keywords})
+    if to_add:
+        Keyword.insert_many([dict(name=k, entity=to_check) for k in to_add]).execute()
+        searchindex.index.add_keywords(to_check.id, to_add)
+        BotIndex.save_bot(to_check)
+    return to_add
+
+
 async def result_reader(queue) -> Counter:
     stats = Counter()
     while True:
@@ -352,23 +495,101 @@ async def result_reader(queue) -> Counter:
     return stats
 
 
-async def run(telegram_bot, bot_checker, bots, stop_event=None) -> Counter:
-    result_queue = asyncio.Queue()
-    reader_future = asyncio.ensure_future(result_reader(result_queue))
-
-    semaphore = asyncio.Semaphore(settings.BOTCHECKER_CONCURRENT_COUNT)
-
-    async def _worker(to_check_bot):
-        async with semaphore:
-            await check_bot(telegram_bot, bot_checker, to_check_bot, result_queue)
+async def write_results(writes: asyncio.Queue):
+    """
+    Saves the checked bots whenever `settings.BOTCHECK_BATCH_SIZE` of them are waiting or
+    `settings.BOTCHECK_FLUSH_INTERVAL` seconds have passed, until None is received
+    """
+    batch = []
+    deadline = time.monotonic() + settings.BOTCHECK_FLUSH_INTERVAL
 
-    tasks = []
-    for to_check in bots:
-        if stop_event and stop_event.is_set():
+    while True:
+        try:
+            checked = await asyncio.wait_for(
+                writes.get(), timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            checked = False
+        if checked is None:
             break
-        tasks.append(asyncio.ensure_future(_worker(to_check)))
-
-    await asyncio.gather(*tasks, return_exceptions=True)
+        if checked is not False:
+            batch.append(checked)
+        if len(batch) >= settings.BOTCHECK_BATCH_SIZE or time.monotonic() >= deadline:
+            if batch:
+                await asyncdb.run(save_checked, batch)
+                batch = []
+            await asyncdb.run(BotCheck.flush)
+            deadline = time.monotonic() + settings.BOTCHECK_FLUSH_INTERVAL
+    if batch:
+        await asyncdb.run(save_checked, batch)
+    await asyncdb.run(BotCheck.flush)
+
+
+async def run(telegram_bot, checkers: CheckerPool, bots: Iterable[BotModel],
+              stop_event=None, digest: Digest = None) -> Counter:
+    """
+    Checks the given bots in a pipeline: the producer reads the bots page by page into a
+    bounded queue per session, the sessions' workers check them, and a single writer saves the
+    results in batches. Nothing more than a few pages of bots is held in memory.
+
+    The notifications of the run are collected in `digest`, which is sent at the end unless it
+    was given by the caller.
+    """
+    own_digest = digest is None
+    if own_digest:
+        digest = Digest(telegram_bot)
+    result_queue = asyncio.Queue()
+    reader_future = asyncio.ensure_future(result_reader(result_queue))
+    writes = asyncio.Queue(maxsize=settings.BOTCHECK_BATCH_SIZE * 2)
+    writer_future = asyncio.ensure_future(write_results(writes))
+    queues = {name: asyncio.Queue(maxsize=settings.BOTCHECKER_CONCURRENT_COUNT * 2)
+              for name in checkers.checkers}
+    matcher = await asyncdb.run(keyword_matcher)
+
+    def stopped():
+        return stop_event is not None and stop_event.is_set()
+
+    async def produce():
+        bots_iter = iter(bots)
+        while not stopped():
+            page = await asyncdb.run(list, itertools.islice(bots_iter, PAGE_SIZE))
+            if not page:
+                return
+            bot_ids = [b.id for b in page]
+            histories = await asyncdb.run(BotCheck.history_of, bot_ids, scheduler.HISTORY_WINDOW)
+            latencies = await asyncdb.run(BotCheck.latencies_of, bot_ids, scheduler.HISTORY_WINDOW)
+            for to_check in page:
+                await queues[checkers.session_for(to_check)].put(
+                    (to_check, histories.get(to_check.id), latencies[to_check.id]))
+
+    producer = asyncio.ensure_future(produce())
+
+    async def consume(name):
+        bot_checker = checkers.checkers[name]
+        while not stopped():
+            item = checkers.next_bot(name, queues)
+            if item is None:
+                if checkers.all_flooded() or (
+                        producer.done() and all(q.empty() for q in queues.values())):
+                    return
+                await asyncio.sleep(IDLE_INTERVAL)
+                continue
+            to_check, history, bot_latencies = item
+            try:
+                await check_bot(telegram_bot, bot_checker, to_check, result_queue, history,
+                                bot_latencies, matcher, writes, digest)
+            except Exception as e:
+                log.exception(e)
+
+    # every session checks up to BOTCHECKER_CONCURRENT_COUNT bots at the same time
+    consumers = [asyncio.ensure_future(consume(name))
+                 for name in checkers.checkers for _ in range(settings.BOTCHECKER_CONCURRENT_COUNT)]
+
+    await asyncio.gather(*consumers, return_exceptions=True)
+    producer.cancel()  # when stopped, it may be waiting for a full queue
+    await writes.put(None)
+    await writer_future
+    if own_digest:
+        await digest.flush()
 
     await result_queue.put(None)
     return await reader_future
@@ -376,49 +597,56 @@ async def run(telegram_bot, bot_checker, bots, stop_event=None) -> Counter:
 
 async def ping_bots_job(context):
     bot = context.bot
-    bot_checker: BotChecker = context.job.data.get('checker')
+    checkers: CheckerPool = context.job.data.get('checker')
     stop_event = context.job.data.get('stop')
 
-    all_bots = BotModel.select(BotModel).where(
-        (BotModel.approved == True)
-        &
-        ((BotModel.disabled_reason == BotModel.DisabledReason.offline) |
-         BotModel.disabled_reason.is_null())
-    ).order_by(
-        BotModel.last_ping.asc()
-    )
+    due_bots = scheduler.iter_due(scheduler.batch_size(len(checkers)))
 
+    digest = Digest(bot)
     start = time.time()
-    result = await run(bot, bot_checker, all_bots, stop_event)  # type: Counter
+    result = await run(bot, checkers, due_bots, stop_event, digest)  # type: Counter
     end = time.time()
+    if not result and not digest:
+        return  # no bot was due
 
-    if not result:
-        msg = "BotChecker encountered problems."
-    else:
-        msg = "BotChecker completed in {}s:\n".format(round(end - start))
-        for k, v in result.items():
-            msg += "\n- {} {}".format(v, k)
-    await bot.send_message(settings.BOTLIST_NOTIFICATIONS_ID, msg)
+    msg = "BotChecker completed in {}s:\n".format(round(end - start))
+    for k, v in result.items():
+        msg += "\n- {} {}".format(v, k)
     log.info(msg)
+    # the summary and the events of the run in as few messages as possible
+    await digest.flush(header=msg)
 
 
-async def disable_decider(telegram_bot: TelegramBot, to_check: BotModel):
+async def disable_decider(telegram_bot: TelegramBot, to_check: BotModel, digest: Digest = None):
+    """ Disables or re-enables the bot, which is saved by the caller """
     assert to_check.disabled_reason != BotModel.DisabledReason.banned
 
+    uptime = await asyncdb.run(BotUptime.of_bot, to_check) if to_check.offline else None
+    rarely_online = (
+            uptime is not None and
+            uptime.checks >= settings.DISABLE_BOT_MIN_CHECKS and
+            uptime.ratio < settings.DISABLE_BOT_MIN_UPTIME
+    )
+
     if (
             to_check.offline and
-            to_check.offline_for > settings.DISABLE_BOT_INACTIVITY_DELTA and
+            (to_check.offline_for > settings.DISABLE_BOT_INACTIVITY_DELTA or rarely_online) and
             to_check.disabled_reason != BotModel.DisabledReason.offline
     ):
-        # Disable if the bot has been offline for too long
+        # Disable if the bot has been offline for too long, or was hardly ever online lately
         if to_check.disable(to_check.DisabledReason.offline):
-            to_check.save()
-
-            if to_check.last_response:
+            if rarely_online:
+                reason = "it was only online in {} of the checks of the last 30 days".format(
+                    uptime)
+            elif to_check.last_response:
                 reason = "its last response was " + helpers.slang_datetime(to_check.last_response)
             else:
                 reason = "it's been offline for.. like... ever"
 
+            if digest is not None:
+                await digest.add(notifications.DISABLED, "{} ({})".format(
+                    to_check.str_no_md, reason))
+                return
             msg = "{} disabled as {}.".format(to_check, reason)
             log.info(msg)
             await telegram_bot.send_message(settings.BOTLIST_NOTIFICATIONS_ID, msg, timeout=30,
@@ -431,7 +659,9 @@ async def disable_decider(telegram_bot: TelegramBot, to_check: BotModel):
     ):
         # Re-enable if the bot is disabled and came back online
         if to_check.enable():
-            to_check.save()
+            if digest is not None:
+                await digest.add(notifications.ENABLED, to_check.str_no_md)
+                return
             msg = "{} was included in the @BotList again as it came back online.".format(to_check)
             log.info(msg)
             await telegram_bot.send_message(settings.BOTLIST_NOTIFICATIONS_ID, msg, timeout=30,
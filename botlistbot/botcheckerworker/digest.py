@@ -0,0 +1,100 @@
+"""
+Collects the notifications of a bot checker run and sends them as a few grouped messages.
+
+Events are added to titled sections and sent to the BotList notifications chat together, when
+the run is over or `settings.BOTCHECKER_DIGEST_INTERVAL` seconds after the first pending event.
+New profile pictures follow the text, each one preceded by the username of its bot.
+"""
+import time
+from collections import OrderedDict
+from typing import List
+
+from logzero import logger as log
+from telegram.error import TelegramError
+
+from botlistbot import appglobals
+from botlistbot import settings
+
+WENT_OFFLINE = '💤 Went offline'
+CAME_ONLINE = '✅ Came back online'
+NEW_KEYWORDS = '🏷 New keywords'
+DISABLED = '🚫 Disabled'
+ENABLED = '♻️ Included in the @BotList again'
+NEW_PICTURES = '🖼 New profile pictures'
+
+MAX_MESSAGE_LENGTH = 4000
+
+
+class Digest:
+    def __init__(self, telegram_bot, chat_id=settings.BOTLIST_NOTIFICATIONS_ID,
+                 interval=settings.BOTCHECKER_DIGEST_INTERVAL):
+        self.bot = telegram_bot
+        self.chat_id = chat_id
+        self.interval = interval
+        self.sections = OrderedDict()  # title -> lines
+        self.pictures = []  # (username, path of the picture)
+        self._pending_since = None
+
+    def __len__(self):
+        return sum(len(lines) for lines in self.sections.values()) + len(self.pictures)
+
+    async def add(self, section: str, line: str):
+        self.sections.setdefault(section, []).append(line)
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        elif time.monotonic() - self._pending_since >= self.interval:
+            await self.flush()
+
+    async def add_picture(self, username: str, path: str):
+        """ Lists the bot and sends its new profile picture with the digest """
+        self.pictures.append((username, path))
+        await self.add(NEW_PICTURES, username)
+
+    def messages(self, header: str = None) -> List[str]:
+        """ The pending events, in as few messages as possible """
+        blocks = [header] if header else []
+        for title, lines in self.sections.items():
+            blocks.append('{} ({}):\n{}'.format(title, len(lines), '\n'.join(lines)))
+
+        messages = []
+        current = ''
+        for block in blocks:
+            separator = '\n\n'
+            for line in block.split('\n'):
+                line = line[:MAX_MESSAGE_LENGTH]
+                if not current:
+                    current = line
+                elif len(current) + len(separator) + len(line) > MAX_MESSAGE_LENGTH:
+                    messages.append(current)
+                    current = line
+                else:
+                    current += separator + line
+                separator = '\n'
+        if current:
+            messages.append(current)
+        return messages
+
+    async def flush(self, header: str = None):
+        """ Sends the pending events, preceded by the `header` if given """
+        messages = self.messages(header)
+        pictures = self.pictures
+        self.sections = OrderedDict()
+        self.pictures = []
+        self._pending_since = None
+
+        for text in messages:
+            await self._send(lambda: self.bot.send_message(self.chat_id, text))
+        for username, path in pictures:
+            try:
+                with open(path, 'rb') as photo:
+                    label = "New profile picture of {}:".format(username)
+                    await self._send(lambda: self.bot.send_message(self.chat_id, label))
+                    await self._send(lambda: self.bot.send_sticker(self.chat_id, photo))
+            except OSError as e:
+                log.warning("Profile picture of {} is gone: {}".format(username, e))
+
+    async def _send(self, request):
+        try:
+            await appglobals.rate_limiter.run(self.chat_id, request)
+        except TelegramError as e:
+            log.warning("Could not send a bot checker notification: {}".format(e))
@@ -6,28 +6,35 @@ from pyrogram import Client
 
 from botlistbot import appglobals
 from botlistbot import settings
+from botlistbot.models import Revision
 from logzero import logger as log
 
 from botcheckerworker.botchecker import BotChecker
-from botcheckerworker.user_account_repository import download_session
+from botcheckerworker.pool import CheckerPool
+from botlistbot.components.userbot import _download_missing_session
 
-download_session("josxa", appglobals.ACCOUNTS_DIR)
+for session_name in settings.USERBOT_SESSIONS:
+    _download_missing_session(session_name)
 
-bot_checker = BotChecker(
-    session_name=settings.USERBOT_SESSION,
-    api_id=settings.API_ID,
-    api_hash=settings.API_HASH,
-    phone_number=settings.USERBOT_PHONE,
-    workdir=appglobals.ACCOUNTS_DIR
-)
+bot_checker = CheckerPool({
+    session_name: BotChecker(
+        session_name=session_name,
+        api_id=settings.API_ID,
+        api_hash=settings.API_HASH,
+        phone_number=settings.USERBOT_PHONE if session_name == settings.USERBOT_SESSION else None,
+        workdir=appglobals.ACCOUNTS_DIR
+    ) for session_name in settings.USERBOT_SESSIONS
+})
 
 
 async def start_userbot():
-    log.info("Starting Userbot...")
-    bot_checker.start()
-    log.info("Userbot running.")
+    Revision.listen()
+    log.info("Starting {} userbot session(s)...".format(len(bot_checker)))
+    for checker in bot_checker:
+        checker.start()
+    log.info("Userbots running.")
 
-    await bot_checker.idle()
+    await next(iter(bot_checker)).idle()
 
     if settings.RUN_BOTCHECKER:
         pass
@@ -0,0 +1,100 @@
+"""
+Spreads the bot checks over several userbot sessions.
+
+Every bot is assigned to a session by consistent hashing, so that a session keeps checking the
+same bots (and has their peers cached), and adding or removing a session only moves the bots
+of that session. When the session of a bot is in a flood wait for username resolution, the bot
+is handed to the next healthy session on the ring.
+"""
+import asyncio
+import bisect
+import hashlib
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from botlistbot.models import Bot
+from botlistbot.models.botcheck import CheckHistory
+
+if TYPE_CHECKING:
+    from botlistbot.botcheckerworker.botchecker import BotChecker
+
+VIRTUAL_NODES = 64  # points per session on the ring
+
+
+def _point(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class CheckerPool:
+    def __init__(self, checkers: Dict[str, 'BotChecker']):
+        """
+        :param checkers: The `BotChecker`s by session name
+        """
+        if not checkers:
+            raise ValueError("At least one session is needed")
+        self.checkers = checkers
+        self._ring = sorted(
+            (_point('{}#{}'.format(name, i)), name)
+            for name in checkers for i in range(VIRTUAL_NODES))
+        self._points = [point for point, _ in self._ring]
+
+    def __len__(self):
+        return len(self.checkers)
+
+    def __iter__(self) -> Iterator['BotChecker']:
+        return iter(self.checkers.values())
+
+    def sessions_for(self, bot: Bot) -> List[str]:
+        """ All session names in the order of preference for checking `bot` """
+        start = bisect.bisect(self._points, _point(str(bot.id))) % len(self._ring)
+        names = []
+        for i in range(len(self._ring)):
+            name = self._ring[(start + i) % len(self._ring)][1]
+            if name not in names:
+                names.append(name)
+                if len(names) == len(self.checkers):
+                    break
+        return names
+
+    def flooded(self, name: str) -> bool:
+        flood_until = self.checkers[name].username_flood_until
+        return flood_until is not None and flood_until > datetime.now()
+
+    def all_flooded(self) -> bool:
+        return all(self.flooded(name) for name in self.checkers)
+
+    def session_for(self, bot: Bot) -> str:
+        """ The session of `bot`, or the next one that is not in a flood wait """
+        names = self.sessions_for(bot)
+        for name in names:
+            if not self.flooded(name):
+                return name
+        return names[0]
+
+    def checker_for(self, bot: Bot) -> 'BotChecker':
+        return self.checkers[self.session_for(bot)]
+
+    def next_bot(self, name: str, queues: Dict[str, asyncio.Queue]
+                 ) -> Optional[Tuple[Bot, Optional[CheckHistory], List[int]]]:
+        """
+        The next queued (bot, check history, latencies) that the session `name` should check:
+        one of its own queue, or when that is empty, one queued for a session that is in a flood
+        wait. None if the session is in a flood wait itself or there is nothing to do right now.
+        """
+        if self.flooded(name):
+            return None
+        if not queues[name].empty():
+            return queues[name].get_nowait()
+        for other, queue in queues.items():
+            if not queue.empty() and self.flooded(other):
+                return queue.get_nowait()
+        return None
+
+    @property
+    def stats(self) -> dict:
+        now = datetime.now()
+        return {
+            name: 'flood wait until {:%H:%M:%S}'.format(c.username_flood_until)
+            if c.username_flood_until and c.username_flood_until > now else 'ok'
+            for name, c in self.checkers.items()
+        }
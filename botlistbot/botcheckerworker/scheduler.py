@@ -0,0 +1,105 @@
+"""
+Decides when each bot is pinged next.
+
+Every bot gets a `next_check` time derived from its check history: bots that recently switched
+between online and offline, new bots and offline bots are checked every
+`settings.BOTCHECKER_INTERVAL` or more often, whereas bots that have been online for a long time
+are checked less and less frequently, up to `settings.BOTCHECKER_MAX_INTERVAL`.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from botlistbot import settings
+from botlistbot.models import Bot
+from botlistbot.models.botcheck import CheckHistory
+
+HISTORY_WINDOW = timedelta(days=7)
+NEW_BOT_AGE = timedelta(days=14)
+
+
+def next_check_interval(bot: Bot, history: Optional[CheckHistory], now: datetime,
+                        online: bool, changed: bool) -> timedelta:
+    """
+    :param history: The checks of `bot` before the current one
+    :param online: The result of the current check
+    :param changed: Whether the current check changed the online state
+    """
+    base = settings.BOTCHECKER_INTERVAL
+    flaps = (history.flaps if history else 0) + int(changed)
+
+    if flaps >= 2:
+        interval = base / 4
+    elif flaps == 1:
+        interval = base / 2
+    elif not online or (bot.date_added and now.date() - bot.date_added < NEW_BOT_AGE):
+        interval = base
+    else:
+        # online streak: since the last time the bot was seen offline
+        streak_start = history.last_offline if history else None
+        if streak_start is None:
+            streak_start = datetime.combine(bot.date_added, datetime.min.time()) \
+                if bot.date_added else now
+        streak_weeks = max((now - streak_start).days, 0) / 7
+        interval = base * min(1 + streak_weeks, settings.BOTCHECKER_MAX_INTERVAL / base)
+
+    interval = min(max(interval, settings.BOTCHECKER_MIN_INTERVAL), settings.BOTCHECKER_MAX_INTERVAL)
+    # spread the checks of bots with the same policy over time
+    return timedelta(seconds=interval * random.uniform(0.9, 1.1))
+
+
+def postponed(now: datetime) -> datetime:
+    """ Next check of a bot that could not be pinged this time """
+    return now + timedelta(seconds=settings.BOTCHECKER_INTERVAL)
+
+
+def batch_size(sessions: int = 1) -> int:
+    """ The number of bots that may be checked per run of the ping job """
+    return math.ceil(
+        settings.BOTCHECKER_HOURLY_BUDGET * sessions * settings.BOTCHECKER_RUN_INTERVAL / 3600)
+
+
+def iter_due(limit: int, page_size: int = 50) -> Iterator[Bot]:
+    """
+    Bots whose next check is due, the never checked ones first, then the most overdue.
+
+    The bots are fetched in pages by keyset pagination on (next_check, id), so that only a
+    page of them is held in memory, and bots that were checked in the meantime are not fetched
+    again.
+    """
+    now = datetime.now()
+    checkable = Bot.select().where(
+        (Bot.approved == True) &
+        ((Bot.disabled_reason == Bot.DisabledReason.offline) | Bot.disabled_reason.is_null())
+    )
+
+    last_id = 0
+    while limit > 0:
+        page = list(checkable.where(Bot.next_check.is_null(), Bot.id > last_id).order_by(
+            Bot.id).limit(min(page_size, limit)))
+        if not page:
+            break
+        limit -= len(page)
+        last_id = page[-1].id
+        yield from page
+
+    last = None
+    while limit > 0:
+        query = checkable.where(Bot.next_check <= now)
+        if last is not None:
+            last_check, last_id = last
+            query = query.where(
+                (Bot.next_check > last_check) |
+                ((Bot.next_check == last_check) & (Bot.id > last_id)))
+        page = list(query.order_by(Bot.next_check, Bot.id).limit(min(page_size, limit)))
+        if not page:
+            break
+        limit -= len(page)
+        # taken before the bots are checked, which moves their next check
+        last = (page[-1].next_check, page[-1].id)
+        yield from page
+
+
+def select_due(limit: int) -> List[Bot]:
+    return list(iter_due(limit))
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import defaultdict
+from typing import List, NamedTuple
+
+from playhouse.signals import post_delete, post_save, pre_save
+
+from botlistbot import settings
+from botlistbot.models import Bot
+from botlistbot.models import Category
+from botlistbot.models.revision import Revision
+
+
+class RenderedCategory(NamedTuple):
+    bots: List[Bot]
+    lines: List[str]  # markdown of each bot, in the same order as `bots`
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+
+_cache = {}  # category id -> (revision nr, time rendered, RenderedCategory)
+_versions = defaultdict(int)  # category id -> number of invalidations of that category
+_cleared = 0  # number of invalidations of all categories
+_lock = threading.Lock()
+
+
+def _version(category_id):
+    return _cleared, _versions[category_id]
+
+
+def rendered_category(category: Category) -> RenderedCategory:
+    """
+    The bots of a category (without new ones) and their rendered lines, shared by the channel
+    publisher, inline articles and the explore menu. Rendered once per revision and category,
+    and again whenever a bot of that category is saved, by this or (see `Revision.listen`)
+    another process. Without a listener, renderings expire after
+    `settings.REVISION_REFRESH_INTERVAL` seconds instead.
+    """
+    revision = Revision.get_instance().nr
+    with _lock:
+        cached = _cache.get(category.id)
+        if cached and cached[0] == revision and (
+                Revision.listening() or
+                time.monotonic() - cached[1] <= settings.REVISION_REFRESH_INTERVAL):
+            return cached[2]
+        version = _version(category.id)
+        rendered_at = time.monotonic()
+
+    bots = list(Bot.of_category_without_new(category))
+    rendered = RenderedCategory(bots=bots, lines=[str(b) for b in bots])
+    with _lock:
+        # not cached if a bot was saved in the meantime, as it may already be outdated
+        if _version(category.id) == version:
+            _cache[category.id] = (revision, rendered_at, rendered)
+    return rendered
+
+
+def invalidate(category_id=None):
+    global _cleared
+    with _lock:
+        if category_id is None:
+            _cache.clear()
+            _cleared += 1
+        else:
+            _cache.pop(category_id, None)
+            _versions[category_id] += 1
+
+
+Revision.subscribe(lambda nr: invalidate())
+Revision.subscribe_bot_changes(lambda bot_id, category_id: invalidate(category_id))
+
+
+@pre_save(sender=Bot)
+def _category_bot_pre_save(model_class, instance, created):
+    instance._category_moved = created or any(
+        f.name == 'category' for f in instance.dirty_fields)
+
+
+@post_save(sender=Bot)
+def _category_bot_saved(model_class, instance, created):
+    if getattr(instance, '_category_moved', True):
+        invalidate()  # the previous category is unknown
+    else:
+        invalidate(instance.category_id)
+
+
+@post_delete(sender=Bot)
+def _category_bot_deleted(model_class, instance):
+    invalidate(instance.category_id)
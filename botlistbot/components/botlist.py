@@ -1,13 +1,19 @@
 import asyncio
 import codecs
 import datetime
+import hashlib
+import json
 import logging
 import re
 import traceback
+from functools import partial
 from typing import List
 
 from botlistbot import appglobals
+from botlistbot import asyncdb
+from botlistbot import categorycache
 from botlistbot import helpers
+from botlistbot import jobs
 from botlistbot import mdformat
 from botlistbot import settings
 from botlistbot import util
@@ -20,18 +26,21 @@ from botlistbot.models import Statistic
 from botlistbot.models.channel import Channel
 from botlistbot.models.revision import Revision
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.error import BadRequest, RetryAfter, TelegramError
+from telegram.error import BadRequest, TelegramError
 from botlistbot.util import restricted
 from logzero import logger as log
 
 
 def _format_category_bots(category):
-    cat_bots = Bot.of_category_without_new(category)
     text = '*' + str(category) + '*\n'
-    text += '\n'.join([str(b) for b in cat_bots])
+    text += categorycache.rendered_category(category).text
     return text
 
 
+def _content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
 class BotList:
     FILES_ROOT = appglobals.ROOT_DIR + '/files/'
     INTRO_GIF = appglobals.ROOT_DIR + "/assets/gif/animation.gif"
@@ -40,23 +49,20 @@ class BotList:
     ENGLISH_INTRO_TEXT = FILES_ROOT + 'intro_en.txt'
     SPANISH_INTRO_TEXT = FILES_ROOT + 'intro_es.txt'
 
-    def __init__(self, bot, update, channel, resend, silent):
-        if not channel:
-            self.notify_admin_err(
-                "I don't know the channel `{}`. Please make sure I am an admin there, "
-                "and send a random message so that I can remember the channel meta data.".format(
-                    self.channel.username))
-            return
-
+    def __init__(self, bot, chat_id, message_id, channel, resend, silent, job=None):
+        """
+        :param chat_id: The chat of the admin message that shows the progress
+        :param message_id: The admin message that shows the progress
+        """
         self.bot = bot
-        self.update = update
         self.channel = channel
         self.resend = resend
         self.silent = silent
         self.sent = {}
         self.sent['category'] = list()
-        self.chat_id = update.effective_chat.id
-        self.message_id = util.mid_from_update(update)
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.job = job  # JobContext when published as a job
 
     async def notify_admin(self, txt):
         await self.bot.formatter.send_or_edit(self.chat_id, Emoji.HOURGLASS_WITH_FLOWING_SAND + ' ' + txt,
@@ -95,51 +101,53 @@ class BotList:
         with codecs.open(filename, 'r', 'utf-8') as f:
             return f.read()
 
+    async def _to_channel(self, request):
+        """ Sends a request to the channel as soon as the flood limits allow """
+        return await appglobals.rate_limiter.run(self.channel.chat_id, request)
+
     async def send_or_edit(self, text, message_id, reply_markup=None):
         text = text[:4096]  # hotfix - we can't send as multiple message because the list expects a unique message id
-        await asyncio.sleep(3)
-        while True:
-            try:
-                if self.resend:
-                    return await util.send_md_message(self.bot, self.channel.chat_id, text, timeout=120,
-                                                disable_notification=True, reply_markup=reply_markup)
-                else:
-                    if reply_markup:
-                        return await self.bot.formatter.send_or_edit(self.channel.chat_id, text,
-                                                               to_edit=message_id,
-                                                               timeout=120,
-                                                               disable_web_page_preview=True,
-                                                               disable_notification=True,
-                                                               reply_markup=reply_markup)
-                    else:
-                        return await self.bot.formatter.send_or_edit(self.channel.chat_id, text,
-                                                               to_edit=message_id,
-                                                               timeout=120,
-                                                               disable_web_page_preview=True,
-                                                               disable_notification=True)
-            except BadRequest as e:
-                if 'chat not found' in e.message.lower():
-                    await self.notify_admin_err(
-                        "I can't reach BotList Bot with chat-id `{}` (CHAT NOT FOUND error). "
-                        "There's probably something wrong with the database.".format(
-                            self.channel.chat_id))
-                    raise e
-                if 'message not modified' in e.message.lower():
-                    return None
+
+        async def send():
+            if self.resend:
+                return await util.send_md_message(self.bot, self.channel.chat_id, text, timeout=120,
+                                            disable_notification=True, reply_markup=reply_markup)
+            else:
+                if reply_markup:
+                    return await self.bot.formatter.send_or_edit(self.channel.chat_id, text,
+                                                           to_edit=message_id,
+                                                           timeout=120,
+                                                           disable_web_page_preview=True,
+                                                           disable_notification=True,
+                                                           reply_markup=reply_markup)
                 else:
-                    log.error(e)
-                    raise e
-            except RetryAfter as e:
-                log.warning(f"Retrying after {e.retry_after} seconds...")
-                await asyncio.sleep(e.retry_after)
-                continue
+                    return await self.bot.formatter.send_or_edit(self.channel.chat_id, text,
+                                                           to_edit=message_id,
+                                                           timeout=120,
+                                                           disable_web_page_preview=True,
+                                                           disable_notification=True)
+
+        try:
+            return await self._to_channel(send)
+        except BadRequest as e:
+            if 'chat not found' in e.message.lower():
+                await self.notify_admin_err(
+                    "I can't reach BotList Bot with chat-id `{}` (CHAT NOT FOUND error). "
+                    "There's probably something wrong with the database.".format(
+                        self.channel.chat_id))
+                raise e
+            if 'message not modified' in e.message.lower():
+                return None
+            else:
+                log.error(e)
+                raise e
 
     async def update_intro(self):
         if self.resend:
             await self.notify_admin("Sending intro GIF...")
-            await self.bot.send_document(self.channel.chat_id, open(self.INTRO_GIF, 'rb'),
-                                  timeout=120)
-            await asyncio.sleep(1)
+            with open(self.INTRO_GIF, 'rb') as gif:
+                await self._to_channel(lambda: self.bot.send_document(
+                    self.channel.chat_id, gif, timeout=120))
 
         intro_en = self._read_file(self.ENGLISH_INTRO_TEXT)
         intro_es = self._read_file(self.SPANISH_INTRO_TEXT)
@@ -202,8 +210,14 @@ class BotList:
         await self.notify_admin(
             "Updating BotList categories to Revision {}...".format(Revision.get_instance().nr))
 
+        # Editing the text of a message removes its buttons
+        text_changed = set()
+
         for cat in categories:
             text = _format_category_bots(cat)
+            text_hash = _content_hash(text)
+            if not self.resend and cat.current_message_id and cat.text_hash == text_hash:
+                continue
 
             log.info(f"Updating category {cat.name}...")
             msg = await self.send_or_edit(text, cat.current_message_id)
@@ -213,6 +227,8 @@ class BotList:
                     'Resent' if self.resend else 'Updated',
                     cat
                 ))
+                text_changed.add(cat.id)
+            cat.text_hash = text_hash
             cat.save()
 
         self._save_channel()
@@ -239,12 +255,17 @@ class BotList:
                     url=BotList.create_hyperlink(categories[i + 1].current_message_id)))
 
             reply_markup = InlineKeyboardMarkup([buttons])
+            buttons_hash = _content_hash(json.dumps(reply_markup.to_dict(), sort_keys=True))
+            if categories[i].id not in text_changed and categories[i].buttons_hash == buttons_hash:
+                continue
 
             log.info(f"Adding buttons to message with category {categories[i].name}...")
-            await self.bot.edit_message_reply_markup(
+            await self._to_channel(lambda: self.bot.edit_message_reply_markup(
                 self.channel.chat_id,
                 categories[i].current_message_id,
-                reply_markup=reply_markup, timeout=60)
+                reply_markup=reply_markup, timeout=60))
+            categories[i].buttons_hash = buttons_hash
+            categories[i].save()
 
     async def send_footer(self):
         num_bots = Bot.select_approved().count()
@@ -268,11 +289,12 @@ class BotList:
         else:
             footer_to_edit = self.channel.footer_mid
 
-        footer_msg = await self.bot.formatter.send_or_edit(self.channel.chat_id, footer,
-                                                     to_edit=footer_to_edit,
-                                                     timeout=120,
-                                                     disable_notifications=self.silent,
-                                                     reply_markup=self.portal_markup)
+        footer_msg = await self._to_channel(lambda: self.bot.formatter.send_or_edit(
+            self.channel.chat_id, footer,
+            to_edit=footer_to_edit,
+            timeout=120,
+            disable_notifications=self.silent,
+            reply_markup=self.portal_markup))
         if footer_msg:
             self.channel.footer_mid = footer_msg.message_id
             self.sent['footer'] = "Footer sent"
@@ -286,19 +308,8 @@ class BotList:
         new_bots = Bot.select_new_bots()
         if not self.silent and len(new_bots) > 0:
             await self.notify_admin("Sending notifications to subscribers...")
-            subscribers = Notifications.select().where(Notifications.enabled == True)
-            notification_count = 0
-            for sub in subscribers:
-                try:
-                    await util.send_md_message(self.bot, sub.chat_id,
-                                         messages.BOTLIST_UPDATE_NOTIFICATION.format(
-                                             n_bots=len(new_bots),
-                                             new_bots=Bot.get_new_bots_markdown()))
-                    notification_count += 1
-                    sub.last_notification = datetime.date.today()
-                    sub.save()
-                except TelegramError:
-                    pass
+            notification_count = await notify_subscribers(
+                self.bot, on_progress=self.job.progress if self.job else None)
             self.sent['notifications'] = "Notifications sent to {} users.".format(
                 notification_count)
 
@@ -324,28 +335,109 @@ class BotList:
                 pass
 
 
+def _update_notification_text():
+    new_bots = Bot.select_new_bots()
+    return messages.BOTLIST_UPDATE_NOTIFICATION.format(
+        n_bots=len(new_bots),
+        new_bots=Bot.get_new_bots_markdown())
+
+
+async def notify_subscribers(bot, on_progress=None) -> int:
+    """
+    Sends the notification about the current revision to every subscriber who did not get it yet,
+    `settings.NOTIFICATION_CONCURRENCY` at a time. Progress is stored every
+    `settings.NOTIFICATION_PROGRESS_BATCH` notifications, so an interrupted run can be resumed.
+
+    :param on_progress: Awaited with (done, total, unit) whenever progress was stored
+
+    :return: The number of delivered notifications
+    """
+    revision = Revision.get_instance().nr
+    text = await asyncdb.run(_update_notification_text)
+    pending = asyncio.Queue()
+    for subscriber in await asyncdb.run(Notifications.select_pending, revision):
+        pending.put_nowait(subscriber)
+    total = pending.qsize()
+
+    succeeded, failed = [], []
+    delivered = 0
+    processed = 0
+
+    async def save_progress():
+        nonlocal processed
+        batch_succeeded, batch_failed = succeeded[:], failed[:]
+        succeeded.clear()
+        failed.clear()
+        await asyncdb.run(Notifications.mark_notified, revision, batch_succeeded, batch_failed)
+        processed += len(batch_succeeded) + len(batch_failed)
+        if on_progress:
+            await on_progress(processed, total, 'notifications')
+
+    async def worker():
+        nonlocal delivered
+        while not pending.empty():
+            subscriber_id, chat_id = pending.get_nowait()
+            try:
+                await appglobals.rate_limiter.run(
+                    chat_id, partial(util.send_md_message, bot, chat_id, text))
+                succeeded.append(subscriber_id)
+                delivered += 1
+            except TelegramError as e:
+                log.debug("Could not notify {}: {}".format(chat_id, e))
+                failed.append(subscriber_id)
+            if len(succeeded) + len(failed) >= settings.NOTIFICATION_PROGRESS_BATCH:
+                await save_progress()
+
+    await asyncio.gather(*(worker() for _ in range(settings.NOTIFICATION_CONCURRENCY)))
+    await save_progress()
+
+    log.info("Notified {} subscribers about revision {}.".format(delivered, revision))
+    return delivered
+
+
 @restricted(strict=True)
 async def send_botlist(update, context, resend=False, silent=False):
-    log.info("Re-sending BotList..." if resend else "Updating BotList...")
+    await jobs.enqueue(
+        'send_botlist', dict(resend=resend, silent=silent),
+        report_chat_id=update.effective_chat.id, report_message_id=util.mid_from_update(update))
+    await asyncdb.run(
+        Statistic.of, update, 'send', 'botlist (resend: {})'.format(str(resend)), Statistic.IMPORTANT)
+
+
+@jobs.handler('send_botlist')
+async def send_botlist_job(job: jobs.JobContext):
+    resend = job.payload['resend']
+    silent = job.payload['silent']
+    if 'revision' not in job.checkpoint:
+        log.info("Re-sending BotList..." if resend else "Updating BotList...")
+        # stored first, so that a job resumed before it was set does not bump it twice
+        await job.save(revision=Revision.get_instance().next)
+    if 'step' not in job.checkpoint:
+        await asyncdb.run(Revision.set_to, job.checkpoint['revision'])
+        await job.save(step=0)
 
     channel = helpers.get_channel()
-    revision = Revision.get_instance()
-    revision.nr += 1
-    revision.save()
-
-    all_categories = Category.select_all()
-
-    botlist = BotList(context.bot, update, channel, resend, silent)
-    if resend:
-        await botlist.delete_full_botlist()
-    await botlist.update_intro()
-    await botlist.update_categories(all_categories)
-    await botlist.update_new_bots_list()
-    await botlist.update_category_list()
-    await botlist.send_footer()
-    await botlist.finish()
+    if not channel:
+        raise ValueError("I don't know the channel @{}. Please make sure I am an admin there, and send "
+                         "a random message so that I can remember it.".format(settings.SELF_CHANNEL_USERNAME))
+    botlist = BotList(job.bot, job.job.report_chat_id, job.job.report_message_id, channel,
+                      resend, silent, job=job)
+    botlist.sent = job.checkpoint.get('sent', botlist.sent)
+
+    steps = [
+        botlist.delete_full_botlist if resend else None,
+        botlist.update_intro,
+        lambda: botlist.update_categories(Category.select_all()),
+        botlist.update_new_bots_list,
+        botlist.update_category_list,
+        botlist.send_footer,
+        botlist.finish,
+    ]
+    for i in range(job.checkpoint['step'], len(steps)):
+        if steps[i]:
+            await steps[i]()
+        await job.save(step=i + 1, sent=botlist.sent)
     channel.save()
-    Statistic.of(update, 'send', 'botlist (resend: {})'.format(str(resend)), Statistic.IMPORTANT)
 
 
 async def new_channel_post(update, context, photo=None):
@@ -3,7 +3,7 @@ from telegram import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     Message,
-    ReplyMarkup,
+    TelegramObject,
 )
 from telegram.constants import ParseMode
 
@@ -75,7 +75,7 @@ HINTS = {
 
 def append_restricted_delete_button(
     update, chat_data, reply_markup
-) -> Tuple[Optional[ReplyMarkup], Callable[[Message], None]]:
+) -> Tuple[Optional[TelegramObject], Callable[[Message], None]]:
     uid = update.effective_user.id
     command_mid = update.effective_message.message_id
 
@@ -111,7 +111,7 @@ def append_restricted_delete_button(
     return reply_markup, append_callback
 
 
-def append_free_delete_button(update, reply_markup) -> Optional[ReplyMarkup]:
+def append_free_delete_button(update, reply_markup) -> Optional[TelegramObject]:
     if not util.is_group_message(update) or not isinstance(
         reply_markup, InlineKeyboardMarkup
     ):
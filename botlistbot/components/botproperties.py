@@ -2,6 +2,7 @@ from telegram import ForceReply, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.constants import ParseMode
 from telegram.error import BadRequest
 
+from botlistbot import asyncdb
 from botlistbot import captions
 from botlistbot import helpers
 from botlistbot import mdformat
@@ -24,7 +25,7 @@ def _is_clear_query(query):
 
 async def set_country_menu(update, context, to_edit):
     uid = util.uid_from_update(update)
-    countries = Country.select().order_by(Country.name).execute()
+    countries = await asyncdb.run(list, Country.select().order_by(Country.name))
 
     buttons = util.build_menu(
         [InlineKeyboardButton(
@@ -50,7 +51,7 @@ async def set_country_menu(update, context, to_edit):
 
 
 async def set_country(update, context, to_edit, country):
-    user = User.from_update(update)
+    user = await asyncdb.run(User.from_update, update)
 
     if await check_suggestion_limit(update, context, user):
         return
@@ -60,12 +61,12 @@ async def set_country(update, context, to_edit, country):
         value = None
     else:
         raise AttributeError("Error setting country to {}.".format(country))
-    Suggestion.add_or_update(user, 'country', to_edit, value)
+    await asyncdb.run(Suggestion.add_or_update, user, 'country', to_edit, value)
 
 
 async def set_text_property(update, context, property_name, to_edit=None):
     uid = util.uid_from_update(update)
-    user = User.from_update(update)
+    user = await asyncdb.run(User.from_update, update)
     if await check_suggestion_limit(update, context, user):
         return
 
@@ -114,20 +115,20 @@ async def set_text_property(update, context, property_name, to_edit=None):
 
         if to_edit:
             if _is_clear_query(text):
-                Suggestion.add_or_update(user, property_name, to_edit, None)
+                await asyncdb.run(Suggestion.add_or_update, user, property_name, to_edit, None)
             else:
-                Suggestion.add_or_update(user, property_name, to_edit, value)
+                await asyncdb.run(Suggestion.add_or_update, user, property_name, to_edit, value)
             await admin.edit_bot(update, context, to_edit)
         else:
             await context.bot.formatter.send_failure(uid, "An unexpected error occured.")
 
 
 async def toggle_value(update, context, property_name, to_edit, value):
-    user = User.from_update(update)
+    user = await asyncdb.run(User.from_update, update)
 
     if await check_suggestion_limit(update, context, user):
         return
-    Suggestion.add_or_update(user, property_name, to_edit, bool(value))
+    await asyncdb.run(Suggestion.add_or_update, user, property_name, to_edit, bool(value))
 
 
 async def set_keywords_init(update, context, kw_context):
@@ -136,18 +137,23 @@ async def set_keywords_init(update, context, kw_context):
     return await set_keywords(update, context, to_edit)
 
 
+def _keywords_and_pending_suggestions(to_edit):
+    keywords = list(Keyword.select().where(Keyword.entity == to_edit))
+    pending = list(Suggestion.select().where(
+        Suggestion.executed == False,
+        Suggestion.subject == to_edit,
+        Suggestion.action << ['add_keyword', 'remove_keyword']
+    ))
+    return keywords, pending
+
+
 @track_activity('menu', 'set keywords', Statistic.DETAILED)
 async def set_keywords(update, context, to_edit):
     chat_id = util.uid_from_update(update)
-    keywords = Keyword.select().where(Keyword.entity == to_edit)
+    keywords, pending = await asyncdb.run(_keywords_and_pending_suggestions, to_edit)
     context.chat_data['edit_bot'] = to_edit
     set_keywords_msgid = context.chat_data.get('set_keywords_msg')
 
-    pending = Suggestion.select().where(
-        Suggestion.executed == False,
-        Suggestion.subject == to_edit,
-        Suggestion.action << ['add_keyword', 'remove_keyword']
-    )
     pending_removal = [y for y in pending if y.action == 'remove_keyword']
 
     # Filter keywords by name to not include removal suggestions
@@ -199,7 +205,7 @@ async def set_keywords(update, context, to_edit):
 
 
 async def add_keyword(update, context):
-    user = User.from_telegram_object(update.effective_user)
+    user = await asyncdb.run(User.from_telegram_object, update.effective_user)
     if await check_suggestion_limit(update, context, user):
         return
     kw = update.message.text
@@ -217,20 +223,17 @@ async def add_keyword(update, context):
         await update.message.reply_text('Keywords must not be longer than 20 characters.')
 
     # Ignore duplicates
-    try:
-        Keyword.get((Keyword.name == kw) & (Keyword.entity == bot_to_edit))
+    if await asyncdb.run(Keyword.get_or_none, (Keyword.name == kw) & (Keyword.entity == bot_to_edit)):
         return
-    except Keyword.DoesNotExist:
-        pass
 
-    Suggestion.add_or_update(user=user, action='add_keyword', subject=bot_to_edit, value=kw)
+    await asyncdb.run(Suggestion.add_or_update, user=user, action='add_keyword', subject=bot_to_edit, value=kw)
     await set_keywords(update, context, bot_to_edit)
-    Statistic.of(update, 'added keyword to'.format(kw), bot_to_edit.username)
+    await asyncdb.run(Statistic.of, update, 'added keyword to'.format(kw), bot_to_edit.username)
 
 
 async def delete_keyword_suggestion(update, context, kw_context):
     suggestion = kw_context.get('suggestion')
-    suggestion.delete_instance()
+    await asyncdb.run(suggestion.delete_instance)
     await set_keywords(update, context, kw_context.get('to_edit'))
 
 
@@ -254,37 +257,37 @@ async def delete_bot_confirm(update, context, to_edit):
 async def delete_bot(update, context, to_edit: Bot):
     username = to_edit.username
     to_edit.disable(Bot.DisabledReason.banned)
-    to_edit.save()
+    await asyncdb.run(to_edit.save)
     await context.bot.formatter.send_or_edit(
         update.effective_user.id,
         "Bot has been disabled and banned.",
         to_edit=util.mid_from_update(update)
     )
-    Statistic.of(update, 'disable', username, Statistic.IMPORTANT)
+    await asyncdb.run(Statistic.of, update, 'disable', username, Statistic.IMPORTANT)
 
 
 async def change_category(update, context, to_edit, category):
     uid = update.effective_user.id
-    user = User.get(User.chat_id == uid)
+    user = await asyncdb.run(User.get, User.chat_id == uid)
 
     if uid == 918962:
         # Special for t3chno
         to_edit.category = category
-        to_edit.save()
+        await asyncdb.run(to_edit.save)
     else:
         if await check_suggestion_limit(update, context, user):
             return
-        Suggestion.add_or_update(user, 'category', to_edit, category.id)
+        await asyncdb.run(Suggestion.add_or_update, user, 'category', to_edit, category.id)
 
 
 async def check_suggestion_limit(update, context, user):
     cid = update.effective_chat.id
-    if Suggestion.over_limit(user):
+    if await asyncdb.run(Suggestion.over_limit, user):
         await context.bot.formatter.send_failure(cid,
                                    "You have reached the limit of {} suggestions. Please wait for "
                                    "the Moderators to approve of some of them.".format(
                                        settings.SUGGESTION_LIMIT))
-        Statistic.of(update, 'hit the suggestion limit')
+        await asyncdb.run(Statistic.of, update, 'hit the suggestion limit')
         return True
     return False
 
@@ -330,18 +333,17 @@ async def change_suggestion(update, context, suggestion, page_handover):
 
 
 async def remove_keyword(update, context, kw_context):
-    user = User.from_telegram_object(update.effective_user)
+    user = await asyncdb.run(User.from_telegram_object, update.effective_user)
     if await check_suggestion_limit(update, context, user):
         return
     to_edit = kw_context.get('to_edit')
     kw = kw_context.get('keyword')
-    Suggestion.add_or_update(user=user, action='remove_keyword', subject=to_edit, value=kw.name)
+    await asyncdb.run(Suggestion.add_or_update, user=user, action='remove_keyword', subject=to_edit, value=kw.name)
     return await set_keywords(update, context, to_edit)
 
 
-@restricted
-async def accept_suggestion(update, context, suggestion: Suggestion):
-    user = User.from_telegram_object(update.effective_user)
+def _apply_suggestion(suggestion: Suggestion):
+    """ :return: The texts announcing the applied suggestion and telling its submittant """
     suggestion.apply()
 
     if suggestion.action == 'offline':
@@ -350,6 +352,13 @@ async def accept_suggestion(update, context, suggestion: Suggestion):
             'offline' if suggestion.subject.offline else 'online')
     else:
         suggestion_text = str(suggestion)
+    return suggestion_text, str(suggestion)
+
+
+@restricted
+async def accept_suggestion(update, context, suggestion: Suggestion):
+    user = await asyncdb.run(User.from_telegram_object, update.effective_user)
+    suggestion_text, submittant_text = await asyncdb.run(_apply_suggestion, suggestion)
 
     suggestion_text = suggestion_text[0].upper() + suggestion_text[1:]
     suggestion_text += '\nApproved by ' + user.markdown_short
@@ -359,7 +368,7 @@ async def accept_suggestion(update, context, suggestion: Suggestion):
     if user != suggestion.user.chat_id:
         submittant_notification = '*Thank you* {}, your suggestion has been accepted:' \
                                   '\n\n{}'.format(util.escape_markdown(suggestion.user.first_name),
-                                                  str(suggestion))
+                                                  submittant_text)
         try:
             await context.bot.send_message(suggestion.user.chat_id, submittant_notification,
                              parse_mode='markdown', disable_web_page_preview=True)
@@ -1,10 +1,13 @@
 import re
+from functools import partial
 from pprint import pprint
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ConversationHandler
 
+from botlistbot import appglobals
 from botlistbot import captions
+from botlistbot import jobs
 from botlistbot import const
 from botlistbot import mdformat
 from botlistbot import settings
@@ -101,24 +104,41 @@ async def send_broadcast(update, context):
         await context.bot.formatter.send_failure(uid, "Missing attributes for broadcast. Aborting...")
         return ConversationHandler.END
 
-    mid = bc.get('reply_to_message_id')
-
-    if mode == 'replying':
-        msg = await util.send_md_message(context.bot, recipient, text, reply_to_message_id=mid)
-    elif mode == 'editing':
-        msg = await context.bot.formatter.send_or_edit(recipient, text, to_edit=mid)
-    else:
-        msg = await util.send_md_message(context.bot, recipient, text)
+    await jobs.enqueue(
+        'broadcast',
+        dict(text=text, recipient=recipient, mode=mode, reply_to_message_id=bc.get('reply_to_message_id')),
+        report_chat_id=uid, report_message_id=util.mid_from_update(update))
+
+
+@jobs.handler('broadcast')
+async def broadcast_job(job: jobs.JobContext):
+    text = job.payload['text']
+    recipient = job.payload['recipient']
+    mode = job.payload['mode']
+    mid = job.payload['reply_to_message_id']
+    uid = job.job.report_chat_id
+
+    sent_mid = job.checkpoint.get('sent_message_id')
+    if sent_mid is None:
+        if mode == 'replying':
+            send = partial(util.send_md_message, job.bot, recipient, text, reply_to_message_id=mid)
+        elif mode == 'editing':
+            send = partial(job.bot.formatter.send_or_edit, recipient, text, to_edit=mid)
+        else:
+            send = partial(util.send_md_message, job.bot, recipient, text)
+        msg = await appglobals.rate_limiter.run(recipient, send)
+        sent_mid = msg.message_id
+        await job.save(sent_message_id=sent_mid)
 
     # Post actions
     buttons = [
         InlineKeyboardButton(captions.PIN,
-                             callback_data=util.callback_for_action('pin_message', {'mid': msg.message_id})),
+                             callback_data=util.callback_for_action('pin_message', {'mid': sent_mid})),
         InlineKeyboardButton('Add "Thank You" counter',
                              callback_data=util.callback_for_action('add_thank_you',
-                                                                    {'cid': recipient, 'mid': msg.message_id})),
+                                                                    {'cid': recipient, 'mid': sent_mid})),
     ]
     reply_markup = InlineKeyboardMarkup(util.build_menu(buttons, 1))
-    mid = util.mid_from_update(update)
     action_taken = "edited" if mode == 'editing' else "broadcasted"
-    await context.bot.formatter.send_or_edit(uid, mdformat.success("Message {}.".format(action_taken)), mid, reply_markup=reply_markup)
+    await job.bot.formatter.send_or_edit(uid, mdformat.success("Message {}.".format(action_taken)),
+                                         job.job.report_message_id, reply_markup=reply_markup)
@@ -14,7 +14,7 @@ from botlistbot.models.revision import Revision
 from botlistbot.util import track_groups
 
 try:
-    from botlistbot.components.userbot import BotChecker
+    from botlistbot.botcheckerworker.pool import CheckerPool
     from botcheckerworker.botchecker import add_keywords, download_profile_picture
 except:
     log.warning("Not using BotChecker in contributions.py")
@@ -321,9 +321,10 @@ async def new_bot_submission(update, context, bot_checker=None):
     return ConversationHandler.END
 
 
-async def check_submission(context, bot_checker: "BotChecker", to_check: Bot):
-    if bot_checker is None:
+async def check_submission(context, checkers: "CheckerPool", to_check: Bot):
+    if checkers is None:
         return
+    bot_checker = checkers.checker_for(to_check)
 
     botlistbot_user = User.botlist_user_instance()
 
@@ -360,7 +361,7 @@ async def check_submission(context, bot_checker: "BotChecker", to_check: Bot):
         return
 
     # Check online state
-    response = await bot_checker.get_ping_response(
+    response, _ = await bot_checker.get_ping_response(
         to_check, timeout=18, try_inline=to_check.inlinequeries
     )
 
@@ -6,6 +6,7 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ConversationHandler
 
 from botlistbot import captions
+from botlistbot import categorycache
 from botlistbot import helpers
 from botlistbot import mdformat
 from botlistbot import settings
@@ -199,7 +200,9 @@ async def show_new_bots(update, context, back_button=False):
 async def send_category(update, context, category):
     uid = util.uid_from_update(update)
     cid = update.effective_chat.id
-    bots = Bot.of_category_without_new(category)[: settings.MAX_BOTS_PER_MESSAGE]
+    rendered = categorycache.rendered_category(category)
+    bots = rendered.bots[: settings.MAX_BOTS_PER_MESSAGE]
+    lines = rendered.lines[: settings.MAX_BOTS_PER_MESSAGE]
     bots_with_description = [b for b in bots if b.description is not None]
     detailed_buttons_enabled = len(
         bots_with_description
@@ -238,9 +241,9 @@ async def send_category(update, context, category):
 
     if uid in settings.MODERATORS and util.is_private_message(update):
         # append admin edit buttons
-        txt += "\n".join(["{} — /edit{} 🛃".format(b, b.id) for b in bots])
+        txt += "\n".join(["{} — /edit{} 🛃".format(line, b.id) for b, line in zip(bots, lines)])
     else:
-        txt += "\n".join([str(b) for b in bots])
+        txt += "\n".join(lines)
 
     if detailed_buttons_enabled:
         txt += "\n\n" + util.action_hint(
@@ -303,7 +306,7 @@ async def send_bot_details(
         btn = InlineCallbackButton(
             captions.BACK_TO_CATEGORY,
             CallbackActions.SELECT_BOT_FROM_CATEGORY,
-            {"id": item.category.id},
+            {"id": item.category_id},
         )
         header_buttons.insert(0, btn)
         header_buttons.append(
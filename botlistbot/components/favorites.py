@@ -8,6 +8,7 @@ from telegram import InlineKeyboardButton
 from telegram import InlineKeyboardMarkup, ReplyKeyboardMarkup
 from telegram.ext import ConversationHandler
 
+from botlistbot import asyncdb
 from botlistbot import captions
 from botlistbot import mdformat
 from botlistbot import const
@@ -38,7 +39,7 @@ async def add_favorite_handler(update, context):
             username = re.match(settings.REGEX_BOT_IN_TEXT, query).groups()[0]
             try:
                 # TODO: get exact database matches for input without `@`
-                item = Bot.by_username(username, include_disabled=True)
+                item = await asyncdb.run(Bot.by_username, username, include_disabled=True)
 
                 return await add_favorite(update, context, item)
             except Bot.DoesNotExist:
@@ -68,16 +69,16 @@ async def add_favorite_handler(update, context):
 
 
 async def add_favorite(update, context, item: Bot, callback_alert=None):
-    user = User.from_update(update)
+    user = await asyncdb.run(User.from_update, update)
     uid = util.uid_from_update(update)
     mid = util.mid_from_update(update)
     from botlistbot.components.basic import main_menu_buttons
     main_menu_markup = ReplyKeyboardMarkup(main_menu_buttons(uid in settings.MODERATORS))
 
-    fav, created = Favorite.add(user=user, item=item)
+    fav, created = await asyncdb.run(Favorite.add, user=user, item=item)
     if created:
-        Statistic.of(user, 'add-favorite', item.username)
-        text = mdformat.love("{} added to your {}favorites.".format(fav.bot, '' if callback_alert else '/'))
+        await asyncdb.run(Statistic.of, user, 'add-favorite', item.username)
+        text = mdformat.love("{} added to your {}favorites.".format(item, '' if callback_alert else '/'))
         if callback_alert:
             await update.callback_query.answer(text=text, show_alert=False)
         else:
@@ -87,7 +88,7 @@ async def add_favorite(update, context, item: Bot, callback_alert=None):
             await send_favorites_list(update, context, to_edit=mid)
     else:
         text = mdformat.none_action(
-            "{} is already a favorite of yours.{}".format(fav.bot, '' if callback_alert else ' /favorites'))
+            "{} is already a favorite of yours.{}".format(item, '' if callback_alert else ' /favorites'))
         if callback_alert:
             await update.callback_query.answer(text=text, show_alert=False)
         else:
@@ -98,11 +99,11 @@ async def add_favorite(update, context, item: Bot, callback_alert=None):
 @track_activity('view-favorites', level=Statistic.ANALYSIS)
 async def send_favorites_list(update, context, to_edit=None):
     uid = util.uid_from_update(update)
-    user = User.from_update(update)
+    user = await asyncdb.run(User.from_update, update)
 
     asyncio.create_task(_too_many_favorites_handler(update, context, user))
 
-    favorites = Favorite.select_all(user)
+    favorites = await asyncdb.run(Favorite.select_all, user)
 
     buttons = [
         [
@@ -138,9 +139,9 @@ async def send_favorites_list(update, context, to_edit=None):
 @track_activity('toggled their favorites layout', level=Statistic.ANALYSIS)
 async def toggle_favorites_layout(update, context, value):
     uid = util.uid_from_update(update)
-    user = User.from_update(update)
+    user = await asyncdb.run(User.from_update, update)
     user.favorites_layout = value
-    user.save()
+    await asyncdb.run(user.save)
     await send_favorites_list(update, context)
 
 
@@ -195,8 +196,8 @@ def _favorites_categories_md(favorites, layout=None):
 @track_activity('menu', 'remove favorite', Statistic.DETAILED)
 async def remove_favorite_menu(update, context):
     uid = util.uid_from_update(update)
-    user = User.from_update(update)
-    favorites = Favorite.select_all(user)
+    user = await asyncdb.run(User.from_update, update)
+    favorites = await asyncdb.run(Favorite.select_all, user)
 
     fav_remove_buttons = [InlineKeyboardButton(
         '✖️ {}'.format(str(f.bot.username)),
@@ -214,18 +215,23 @@ async def remove_favorite_menu(update, context):
 
 async def _too_many_favorites_handler(update, context, user):
     uid = util.uid_from_update(update)
-    any_removed = False
-    while too_many_favorites(user):
-        oldest = Favorite.get_oldest(user)
-        oldest.delete_instance()
-        any_removed = True
-        Statistic.of(update, 'had to lose a favorite because HE HAD TOO FUCKIN MANY 😬')
-    if any_removed:
+    removed = None
+    while await asyncdb.run(too_many_favorites, user):
+        removed = await asyncdb.run(_remove_oldest_favorite, user)
+        await asyncdb.run(Statistic.of, update, 'had to lose a favorite because HE HAD TOO FUCKIN MANY 😬')
+    if removed is not None:
         txt = "You have too many favorites, _they do not fit into a single message_. That's why I removed your " \
-              "oldest bot, *{}*, from your list of favorites.".format(oldest.bot if oldest.bot else oldest.custom_bot)
+              "oldest bot, *{}*, from your list of favorites.".format(removed)
         await util.send_md_message(context.bot, uid, txt)
 
 
+def _remove_oldest_favorite(user):
+    """ :return: The removed bot, or the username of a custom one """
+    oldest = Favorite.get_oldest(user)
+    oldest.delete_instance()
+    return oldest.bot if oldest.bot else oldest.custom_bot
+
+
 def too_many_favorites(user):
     favs = Favorite.select_all(user)
     promo = max(len(messages.PROMOTION_MESSAGE), len(messages.FAVORITES_HEADLINE))
@@ -235,13 +241,13 @@ def too_many_favorites(user):
 
 async def add_custom(update, context, username):
     uid = util.uid_from_update(update)
-    user = User.from_update(update)
+    user = await asyncdb.run(User.from_update, update)
     mid = util.mid_from_update(update)
     from botlistbot.components.basic import main_menu_buttons
     main_menu_markup = ReplyKeyboardMarkup(main_menu_buttons(uid in settings.MODERATORS))
 
     try:
-        fav = Favorite.get(custom_bot=username)
+        fav = await asyncdb.run(Favorite.get, custom_bot=username)
         await util.send_or_edit_md_message(
             context.bot, uid, mdformat.none_action(
                 "{} is already a favorite of yours. /favorites".format(fav.custom_bot)),
@@ -249,7 +255,7 @@ async def add_custom(update, context, username):
             reply_markup=main_menu_markup)
     except Favorite.DoesNotExist:
         fav = Favorite(user=user, custom_bot=username, date_added=datetime.date.today())
-        fav.save()
+        await asyncdb.run(fav.save)
         msg = await context.bot.formatter.send_or_edit(uid,
                                            mdformat.love("{} added to your /favorites.".format(fav.custom_bot)),
                                            to_edit=mid)
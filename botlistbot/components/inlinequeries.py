@@ -1,18 +1,25 @@
+from functools import partial
+from typing import Callable, Iterable, List
 from uuid import uuid4
 
 import emoji
 
+from botlistbot import asyncdb
 from botlistbot import captions
+from botlistbot import categorycache
 from botlistbot import const
 from botlistbot import mdformat
+from botlistbot import metrics
 from botlistbot import search
 from botlistbot import util
 from botlistbot.components import favorites, botlistchat
 from botlistbot.dialog import messages
-from botlistbot.models import Bot, Category
+from botlistbot.lib.lrucache import LRUCache
+from botlistbot.models import Category
 from botlistbot.models import Favorite
 from botlistbot.models import Statistic
 from botlistbot.models import User
+from botlistbot.models.revision import Revision
 from telegram import InlineKeyboardButton
 from telegram import InlineKeyboardMarkup
 from telegram import InlineQueryResultArticle
@@ -20,11 +27,17 @@ from telegram import InputTextMessageContent
 from telegram.constants import ParseMode
 
 # CONSTANTS
-MAX_BOTS = 30
+RESULTS_PER_PAGE = 30
+MAX_MESSAGE_LENGTH = 4096
 SEARCH_QUERY_MIN_LENGTH = 2
 CONTRIBUTING_QUERIES = [const.DeepLinkingActions.CONTRIBUTING, 'ctrbt', 'contrib']
 EXAMPLES_QUERIES = ['example', const.DeepLinkingActions.EXAMPLES]
 
+# Non-personal answers, keyed by (normalized query, revision number)
+results_cache = LRUCache(maxsize=1024, ttl=120)
+metrics.register('Inline query cache', lambda: results_cache.stats)
+Revision.subscribe(lambda nr: results_cache.clear())
+
 
 def query_too_short_article():
     txt = '[I am a stupid, crazy fool.](https://www.youtube.com/watch?v=DLzxrzFCyOs)'
@@ -50,10 +63,10 @@ def new_bots_article():
 
 
 def category_article(cat):
-    cat_bots = Bot.of_category_without_new(cat)
+    rendered = categorycache.rendered_category(cat)
     txt = messages.PROMOTION_MESSAGE + '\n\n'
-    txt += "There are *{}* bots in the category *{}*:\n\n".format(len(cat_bots), str(cat))
-    txt += '\n'.join([str(b) for b in cat_bots])
+    txt += "There are *{}* bots in the category *{}*:\n\n".format(len(rendered.bots), str(cat))
+    txt += rendered.text
     return InlineQueryResultArticle(
         id=uuid4(),
         title=emoji.emojize(cat.emojis, language='alias') + cat.name,
@@ -83,13 +96,23 @@ def bot_article(b):
 def all_bot_results_article(lst, too_many_results):
     txt = messages.PROMOTION_MESSAGE + '\n\n'
     txt += "{} one of these {} bots:\n\n".format(messages.rand_call_to_action(), len(lst))
-    txt += '\n'.join([str(b) for b in lst])
+
+    # whole lines only, a cut markdown entity would make Telegram reject the message
+    shown = 0
+    for b in lst[:RESULTS_PER_PAGE]:
+        line = str(b) + '\n'
+        if len(txt) + len(line) > MAX_MESSAGE_LENGTH - 50:  # room for the remainder
+            break
+        txt += line
+        shown += 1
+    if shown < len(lst):
+        txt += '... and {} more'.format(len(lst) - shown)
     return InlineQueryResultArticle(
         id=uuid4(),
         title='{} {} ʙᴏᴛ ʀᴇsᴜʟᴛs'.format(
             mdformat.smallcaps("Send"),
             len(lst)),
-        input_message_content=InputTextMessageContent(message_text=txt[:4096],
+        input_message_content=InputTextMessageContent(message_text=txt,
                                                       parse_mode=ParseMode.MARKDOWN)
     )
 
@@ -118,33 +141,91 @@ def hint_article(msg, reply_markup, key):
     )
 
 
-async def inlinequery_handler(update, context):
-    query = update.inline_query.query.lower()
+class LazyResults:
+    """
+    Inline query results that are only rendered once a page containing them is requested.
+    Rendered articles are kept, so scrolling back and forth does not render them again.
+    """
 
-    user = User.from_update(update)
-    results_list = list()
+    def __init__(self, factories: Iterable[Callable[[], InlineQueryResultArticle]]):
+        self._factories = list(factories)
+        self._rendered = {}
 
+    def __len__(self):
+        return len(self._factories)
+
+    def page(self, offset: int, limit: int) -> List[InlineQueryResultArticle]:
+        return list(self._generate(offset, min(offset + limit, len(self._factories))))
+
+    def _generate(self, start, stop):
+        for i in range(start, stop):
+            article = self._rendered.get(i)
+            if article is None:
+                article = self._rendered[i] = self._factories[i]()
+            yield article
+
+
+def _public_answer(query):
+    """
+    The part of an inline query answer that is the same for every user. The favorites article,
+    if any, is inserted by the caller at position `favorites_at` of the first page unless that
+    is None.
+    """
     input_given = len(query.strip()) > 0
     query_too_short = 0 < len(query.strip()) < SEARCH_QUERY_MIN_LENGTH
 
-    too_many_results = False
     cat_results = []
     bot_results = []
+    factories = list()
 
     if input_given:
         # query category results
-        cat_results = search.search_categories(query)
+        cat_results = list(search.search_categories(query))
 
         if not query_too_short:
             # query bot results
             bot_results = list(search.search_bots(query))
-            if len(bot_results) > MAX_BOTS:
-                bot_results = bot_results[:MAX_BOTS]
-                too_many_results = True
+    too_many_results = len(bot_results) > RESULTS_PER_PAGE
+
+    invalid_search_term = query_too_short and not cat_results
+    if invalid_search_term:
+        factories.append(query_too_short_article)
+
+    answer = dict(results=None, favorites_at=None, kwargs=dict())
+
+    results_available = cat_results or bot_results
+    if results_available:
+        if len(bot_results) > 1:
+            factories.append(partial(all_bot_results_article, bot_results, too_many_results))
+        factories.extend(partial(category_article, c) for c in cat_results)
+        factories.extend(partial(bot_article, b) for b in bot_results)
+
+        if len(bot_results) > 0:
+            answer['kwargs'] = dict(
+                switch_pm_text="See all results" if too_many_results else "Search in private chat",
+                switch_pm_parameter=util.encode_base64(query))
+    else:
+        answer['favorites_at'] = len(factories)
+        factories.append(new_bots_article)
+        factories.extend(partial(category_article, c) for c in Category.select_all())
+
+        if not (invalid_search_term or not input_given):
+            answer['kwargs'] = dict(switch_pm_text="No results. Contribute a bot?",
+                                    switch_pm_parameter='contributing')
+
+    answer['results'] = LazyResults(factories)
+    return answer
+
+
+async def inlinequery_handler(update, context):
+    query = update.inline_query.query.lower()
+
+    user = await asyncdb.run(User.from_update, update)
+    results_list = list()
 
     # query for new bots
     if query == messages.NEW_BOTS_INLINEQUERY.lower() or query == 'new':
-        results_list.append(new_bots_article())
+        results_list.append(await asyncdb.run(new_bots_article))
         await context.bot.answer_inline_query(update.inline_query.id, results=results_list)
         return
 
@@ -179,11 +260,13 @@ async def inlinequery_handler(update, context):
         await context.bot.answer_inline_query(update.inline_query.id, results=results_list, cache_time=600)
         return
 
-    if query == const.DeepLinkingActions.FAVORITES and user.has_favorites:
-        results_list.append(favorites_article(user))
-        await context.bot.answer_inline_query(update.inline_query.id, results=results_list, cache_time=0,
-                              is_personal=True)
-        return
+    if query == const.DeepLinkingActions.FAVORITES:
+        article = await asyncdb.run(_favorites_article_if_any, user)
+        if article:
+            results_list.append(article)
+            await context.bot.answer_inline_query(update.inline_query.id, results=results_list,
+                                                  cache_time=0, is_personal=True)
+            return
 
     msg, reply_markup, key = botlistchat.get_hint_data(query)
     if msg is not None:
@@ -191,46 +274,40 @@ async def inlinequery_handler(update, context):
         await context.bot.answer_inline_query(update.inline_query.id, results=results_list, cache_time=600)
         return
 
-    invalid_search_term = query_too_short and not cat_results
-    if invalid_search_term:
-        results_list.append(query_too_short_article())
+    try:
+        offset = max(int(update.inline_query.offset or 0), 0)
+    except ValueError:
+        offset = 0  # sent by the client, so not necessarily one of ours
+    page, num_results, kwargs = await asyncdb.run(_answer_page, user, query, offset)
+    results_list.extend(page)
 
-    results_available = cat_results or bot_results
-    if results_available:
-        if len(bot_results) > 1:
-            results_list.append(all_bot_results_article(bot_results, too_many_results))
-        for c in cat_results:
-            results_list.append(category_article(c))
-        for b in bot_results:
-            results_list.append(bot_article(b))
+    next_offset = offset + RESULTS_PER_PAGE
+    await context.bot.answer_inline_query(update.inline_query.id, results=results_list, cache_time=0,
+                                          is_personal=True,
+                                          next_offset=str(next_offset) if next_offset < num_results else '',
+                                          **kwargs)
 
-        if len(bot_results) > 0:
-            await context.bot.answer_inline_query(update.inline_query.id, results=results_list,
-                                  switch_pm_text="See all results" if too_many_results else "Search in private chat",
-                                  switch_pm_parameter=util.encode_base64(query), cache_time=0,
-                                  is_personal=True)
-        else:
-            await context.bot.answer_inline_query(update.inline_query.id, results=results_list, cache_time=0,
-                                  is_personal=True)
-    else:
-        if user.has_favorites:
-            results_list.append(favorites_article(user))
-        results_list.append(new_bots_article())
-        categories = Category.select_all()
-        for c in categories:
-            results_list.append(category_article(c))
-
-        if invalid_search_term or not input_given:
-            await context.bot.answer_inline_query(update.inline_query.id, results=results_list, cache_time=0,
-                                  is_personal=True)
-        else:
-            await context.bot.answer_inline_query(update.inline_query.id, results=results_list,
-                                  switch_pm_text="No results. Contribute a bot?",
-                                  switch_pm_parameter='contributing', cache_time=0,
-                                  is_personal=True)
+
+def _favorites_article_if_any(user):
+    return favorites_article(user) if user.has_favorites else None
+
+
+def _answer_page(user, query, offset):
+    """ :return: The results of the page at `offset`, the total number of results and the answer kwargs """
+    normalized_query = ' '.join(query.split())
+    answer = results_cache.get_or_compute(
+        (normalized_query, Revision.get_instance().nr),
+        lambda: _public_answer(normalized_query)
+    )
+
+    results = answer['results']
+    page = results.page(offset, RESULTS_PER_PAGE)
+    if offset == 0 and answer['favorites_at'] is not None and user.has_favorites:
+        page.insert(answer['favorites_at'], favorites_article(user))
+    return page, len(results), answer['kwargs']
 
 
 async def chosen_result(update, context):
     if update.chosen_inline_result.inline_message_id:
         context.chat_data['sent_inlinequery'] = update.chosen_inline_result.inline_message_id
-    Statistic.of(update, 'chosen-inlinequery-result', level=Statistic.ANALYSIS)
+    await asyncdb.run(Statistic.of, update, 'chosen-inlinequery-result', level=Statistic.ANALYSIS)
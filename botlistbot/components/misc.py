@@ -5,6 +5,7 @@ import os
 from telegram.constants import ParseMode
 from telegram.ext import ConversationHandler
 
+from botlistbot import metrics
 from botlistbot import util
 from botlistbot.models import Statistic, APIAccess
 from botlistbot.models import User, Bot, Notifications
@@ -46,6 +47,16 @@ async def t3chnostats(update, context):
     await update.message.reply_text(txt, parse_mode=ParseMode.MARKDOWN)
 
 
+@restricted
+async def send_metrics(update, context):
+    lines = []
+    for name, values in metrics.collect().items():
+        lines.append('*{}*'.format(util.escape_markdown(name)))
+        lines.extend(util.escape_markdown('  {}: {}'.format(k, v)) for k, v in values.items())
+    txt = '\n'.join(lines) if lines else 'No metrics available.'
+    await update.message.reply_text(txt, parse_mode=ParseMode.MARKDOWN)
+
+
 async def set_notifications(update, context, value: bool):
     cid = update.effective_chat.id
     try:
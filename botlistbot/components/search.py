@@ -13,6 +13,7 @@ from telegram import (
 from telegram.constants import ParseMode
 from telegram.ext import ConversationHandler
 
+from botlistbot import asyncdb
 from botlistbot import captions
 from botlistbot import const
 from botlistbot import search
@@ -28,14 +29,14 @@ from botlistbot.models import User
 
 async def search_query(update, context, query, send_errors=True):
     cid: int = update.effective_chat.id
-    user: User = User.from_update(update)
+    user: User = await asyncdb.run(User.from_update, update)
     is_admin: bool = cid in settings.MODERATORS
     replied_to_message_id: Optional[int] = util.original_reply_id(update)
     is_suggestion_by_other: bool = (
         update.effective_chat and update.effective_chat.id == settings.BOTLISTCHAT_ID
     )
 
-    results = search.search_bots(query)
+    results = await asyncdb.run(search.search_bots, query, ranked=True)
 
     reply_markup = (
         ReplyKeyboardMarkup(basic.main_menu_buttons(is_admin), resize_keyboard=True)
@@ -3,21 +3,36 @@ import threading
 from logzero import logger as log
 
 from botlistbot import appglobals
+from botlistbot import metrics
 from botlistbot import settings
 
 BotChecker = None
 _bot_checker_instance = None
 
 
-def _create_bot_checker():
+def _download_missing_session(session_name):
+    """Fetch a session from the account repository unless it exists in the accounts dir."""
+    session_file = appglobals.ACCOUNTS_DIR / (session_name.replace(".session", "") + ".session")
+    if session_file.exists():
+        return
+    try:
+        from botlistbot.botcheckerworker.user_account_repository import download_session
+
+        download_session(session_name, appglobals.ACCOUNTS_DIR)
+    except Exception as e:
+        log.warning(f"Could not download session '{session_name}': {e}")
+
+
+def _create_bot_checker(session_name):
     """Create and return a BotChecker instance using the botcheckerworker module."""
     from botlistbot.botcheckerworker.botchecker import BotChecker as _BotChecker
 
+    _download_missing_session(session_name)
     checker = _BotChecker(
-        session_name=settings.USERBOT_SESSION,
+        session_name=session_name,
         api_id=settings.API_ID,
         api_hash=settings.API_HASH,
-        phone_number=settings.USERBOT_PHONE,
+        phone_number=settings.USERBOT_PHONE if session_name == settings.USERBOT_SESSION else None,
         workdir=str(appglobals.ACCOUNTS_DIR),
     )
     return checker
@@ -25,8 +40,8 @@ def _create_bot_checker():
 
 def initialize_bot_checker():
     """
-    Initialize the BotChecker if configured.
-    Returns the BotChecker instance or None if not configured/available.
+    Initialize a BotChecker for each of the configured userbot sessions.
+    Returns the CheckerPool of them or None if not configured/available.
     """
     global BotChecker, _bot_checker_instance
 
@@ -34,18 +49,24 @@ def initialize_bot_checker():
         log.info("BotChecker disabled in settings.")
         return None
 
-    if not all([settings.API_ID, settings.API_HASH, settings.USERBOT_SESSION]):
+    if not all([settings.API_ID, settings.API_HASH, settings.USERBOT_SESSIONS]):
         log.warning(
-            "BotChecker not configured: missing API_ID, API_HASH, or USERBOT_SESSION."
+            "BotChecker not configured: missing API_ID, API_HASH, or USERBOT_SESSIONS."
         )
         return None
 
     try:
         from botlistbot.botcheckerworker.botchecker import BotChecker as _BotChecker
+        from botlistbot.botcheckerworker.pool import CheckerPool
 
         BotChecker = _BotChecker
-        _bot_checker_instance = _create_bot_checker()
-        log.info("BotChecker initialized successfully.")
+        _bot_checker_instance = CheckerPool(
+            {name: _create_bot_checker(name) for name in settings.USERBOT_SESSIONS}
+        )
+        metrics.register("Userbot sessions", lambda: _bot_checker_instance.stats)
+        log.info(
+            f"BotChecker initialized successfully with {len(_bot_checker_instance)} session(s)."
+        )
         return _bot_checker_instance
     except ImportError as e:
         log.warning(f"BotChecker dependencies not available: {e}")
@@ -57,11 +78,11 @@ def initialize_bot_checker():
 
 def start_bot_checker(job_queue, bot_checker):
     """
-    Start the BotChecker userbot and set up the periodic ping job.
+    Start the BotChecker userbots and set up the periodic ping job.
 
     Args:
         job_queue: The PTB job queue for scheduling periodic checks.
-        bot_checker: The BotChecker instance to use.
+        bot_checker: The CheckerPool to use.
     """
     if bot_checker is None:
         return
@@ -69,10 +90,11 @@ def start_bot_checker(job_queue, bot_checker):
     from botlistbot.botcheckerworker.botchecker import ping_bots_job
 
     try:
-        bot_checker.start()
-        log.info("BotChecker userbot started.")
+        for checker in bot_checker:
+            checker.start()
+        log.info("BotChecker userbots started.")
     except Exception as e:
-        log.error(f"Failed to start BotChecker userbot: {e}")
+        log.error(f"Failed to start BotChecker userbots: {e}")
         return
 
     stop_event = threading.Event()
@@ -82,13 +104,13 @@ def start_bot_checker(job_queue, bot_checker):
         ping_bots_job,
         data=context,
         first=60,  # Start first check after 60 seconds
-        interval=settings.BOTCHECKER_INTERVAL,
+        interval=settings.BOTCHECKER_RUN_INTERVAL,
     )
     log.info(
-        f"BotChecker periodic job scheduled (interval: {settings.BOTCHECKER_INTERVAL}s)."
+        f"BotChecker periodic job scheduled (interval: {settings.BOTCHECKER_RUN_INTERVAL}s)."
     )
 
 
 def get_bot_checker():
-    """Get the current BotChecker instance."""
+    """Get the current CheckerPool."""
     return _bot_checker_instance
@@ -0,0 +1,160 @@
+"""
+A small persistent queue for long-running admin jobs, such as publishing the BotList.
+
+Jobs are stored in the database and executed one after another by `work`. A job handler saves
+checkpoints through its `JobContext`; when the bot is restarted while a job is running, the job
+is resumed with its last checkpoint.
+"""
+import asyncio
+import datetime
+import json
+import time
+import traceback
+from typing import Optional
+
+from logzero import logger as log
+from telegram.error import TelegramError
+
+from botlistbot import appglobals
+from botlistbot import asyncdb
+from botlistbot import metrics
+from botlistbot import util
+from botlistbot.models import Job
+
+_handlers = {}  # kind -> coroutine function handling jobs of that kind
+_wakeup = asyncio.Event()
+_worker = None  # type: Optional[asyncio.Task]
+_stats = dict(current=None, done=0, failed=0)
+metrics.register('Admin jobs', lambda: dict(_stats))
+
+REPORT_INTERVAL = 5  # seconds between two progress reports
+
+
+def handler(kind: str):
+    """ Registers the decorated coroutine function as the handler of jobs of the given kind """
+
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+
+    return decorator
+
+
+async def enqueue(kind: str, payload: dict, report_chat_id=None, report_message_id=None) -> Job:
+    """ Stores a new job, whose progress is reported by editing the given message """
+    job = await asyncdb.run(
+        Job.create, kind=kind, payload=json.dumps(payload),
+        report_chat_id=report_chat_id, report_message_id=report_message_id)
+    log.info("Enqueued job {}.".format(job))
+    _wakeup.set()
+    return job
+
+
+class JobContext:
+    def __init__(self, bot, job: Job):
+        self.bot = bot
+        self.job = job
+        self.payload = job.data
+        self.checkpoint = json.loads(job.checkpoint)
+        self.resumed = job.state == Job.RUNNING
+        self._rate_start = None  # (time, progress) the throughput is measured from
+        self._reported_at = 0.0
+
+    async def save(self, **checkpoint):
+        """ Persists the given values, which are available in `checkpoint` when resumed """
+        self.checkpoint.update(checkpoint)
+        self.job.checkpoint = json.dumps(self.checkpoint)
+        await asyncdb.run(self.job.save)
+
+    @property
+    def throughput(self) -> Optional[float]:
+        if self._rate_start is None:
+            return None
+        started, progress = self._rate_start
+        elapsed = time.monotonic() - started
+        return (self.job.progress - progress) / elapsed if elapsed > 0 else None
+
+    async def progress(self, done: int, total: int = None, unit: str = 'items'):
+        """ Records the progress of the current phase and reports it to the admin chat """
+        if self._rate_start is None or done < self._rate_start[1]:
+            self._rate_start = (time.monotonic(), done)
+        self.job.progress = done
+        self.job.total = total
+        await asyncdb.run(self.job.save)
+
+        if time.monotonic() - self._reported_at < REPORT_INTERVAL:
+            return
+        text = "{}/{} {}".format(done, total, unit) if total else "{} {}".format(done, unit)
+        if self.throughput:
+            text += " ({:.1f}/s)".format(self.throughput)
+        await self.report(text)
+
+    async def report(self, text: str):
+        """ Shows `text` in the message of the admin that started the job """
+        self._reported_at = time.monotonic()
+        if not self.job.report_chat_id:
+            return
+        text = "⏳ {}: {}".format(self.job, text)
+        try:
+            await appglobals.rate_limiter.run(
+                self.job.report_chat_id,
+                lambda: self.bot.formatter.send_or_edit(
+                    self.job.report_chat_id, text, to_edit=self.job.report_message_id))
+        except TelegramError as e:
+            log.warning("Could not report the progress of {}: {}".format(self.job, e))
+
+
+async def _run(bot, job: Job):
+    handle = _handlers.get(job.kind)
+    context = JobContext(bot, job)
+    if context.resumed:
+        log.info("Resuming job {} from {}.".format(job, context.checkpoint))
+    job.state = Job.RUNNING
+    job.started = job.started or datetime.datetime.now()
+    await asyncdb.run(job.save)
+    _stats['current'] = str(job)
+
+    start = time.monotonic()
+    try:
+        if handle is None:
+            raise ValueError("No handler for jobs of kind {}".format(job.kind))
+        await handle(context)
+        job.state = Job.DONE
+        _stats['done'] += 1
+        log.info("Job {} done after {:.1f}s.".format(job, time.monotonic() - start))
+    except asyncio.CancelledError:
+        raise  # shutting down, the job is resumed on the next start
+    except Exception as e:
+        log.exception(e)
+        job.state = Job.FAILED
+        job.error = traceback.format_exc()
+        _stats['failed'] += 1
+        if job.report_chat_id:
+            await bot.formatter.send_failure(job.report_chat_id, "Job {} failed: {}".format(
+                job, util.escape_markdown(str(e))))
+    finally:
+        _stats['current'] = None
+
+    job.finished = datetime.datetime.now()
+    await asyncdb.run(job.save)
+
+
+async def work(bot):
+    """ Executes queued jobs forever, starting with those that were interrupted """
+    while True:
+        _wakeup.clear()
+        job = await asyncdb.run(Job.next_unfinished)
+        if job is None:
+            await _wakeup.wait()
+            continue
+        await _run(bot, job)
+
+
+def start(bot):
+    global _worker
+    _worker = asyncio.get_running_loop().create_task(work(bot))
+
+
+def stop():
+    if _worker is not None:
+        _worker.cancel()
@@ -1,4 +1,5 @@
 from .inlinecallbackbutton import InlineCallbackButton
 from .inlinecallbackhandler import InlineCallbackHandler
 from .inlineactionhandler import InlineActionHandler
+from .trigramindex import TrigramIndex
 
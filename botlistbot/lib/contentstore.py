@@ -0,0 +1,37 @@
+import hashlib
+import os
+
+
+class ContentStore:
+    """
+    Files stored under the SHA-256 hash of their content, so that identical files are only
+    stored once.
+    """
+
+    def __init__(self, directory: str, extension: str = ''):
+        self.directory = directory
+        self.extension = extension
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest + self.extension)
+
+    def __contains__(self, digest: str) -> bool:
+        return bool(digest) and os.path.exists(self.path(digest))
+
+    @staticmethod
+    def hash_file(file: str) -> str:
+        sha = hashlib.sha256()
+        with open(file, 'rb') as f:
+            for block in iter(lambda: f.read(64 * 1024), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def put(self, file: str) -> str:
+        """ Moves `file` into the store and returns its hash """
+        digest = self.hash_file(file)
+        if digest in self:
+            os.remove(file)
+        else:
+            os.replace(file, self.path(digest))
+        return digest
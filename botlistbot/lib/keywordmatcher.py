@@ -0,0 +1,46 @@
+import re
+from typing import Iterable, Set
+
+
+class KeywordMatcher:
+    """
+    Finds all words of a vocabulary that occur in a text as whole words, ignoring case, in a
+    single pass of one compiled alternation over the text.
+
+    At every position, only the longest keyword is matched by the regex, so keywords that are
+    prefixes of a match ("music" in "music player") are looked up separately.
+    """
+
+    def __init__(self, vocabulary: Iterable[str]):
+        self.names = {}  # lowercase keyword -> spelling in the vocabulary
+        for name in vocabulary:
+            self.names.setdefault(name.lower(), name)
+
+        if self.names:
+            alternation = '|'.join(
+                re.escape(k) for k in sorted(self.names, key=len, reverse=True))
+            # unlike \b, these also delimit keywords that start or end with a symbol ("c++")
+            self.pattern = re.compile(r'(?<!\w)(?=({})(?!\w))'.format(alternation), re.IGNORECASE)
+        else:
+            self.pattern = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefixes(self, match: str) -> Iterable[str]:
+        for i in range(1, len(match)):
+            if not (match[i].isalnum() or match[i] == '_'):
+                yield match[:i]
+
+    def find(self, text: str) -> Set[str]:
+        """ The keywords in `text`, as spelled in the vocabulary """
+        if self.pattern is None:
+            return set()
+        found = set()
+        for match in self.pattern.finditer(text):
+            longest = match.group(1).lower()
+            found.add(self.names[longest])
+            for prefix in self._prefixes(longest):
+                if prefix in self.names:
+                    found.add(self.names[prefix])
+        return found
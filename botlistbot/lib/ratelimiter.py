@@ -0,0 +1,119 @@
+import asyncio
+import datetime
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from telegram.error import RetryAfter
+
+T = TypeVar('T')
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.nominal_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """ Seconds until a token is available """
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def take(self):
+        self.tokens -= 1
+
+    def slow_down(self, retry_after: float, now: float):
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        self.rate = max(self.rate / 2, self.nominal_rate / 16)
+        self.tokens = 0
+
+    def speed_up(self):
+        self.rate = min(self.nominal_rate, self.rate + self.nominal_rate / 20)
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.blocked_until <= now
+
+
+class RateLimiter:
+    """
+    Token buckets for Telegram's flood limits: one for all requests of the bot, and one per
+    chat with different limits for private chats and groups/channels (negative chat ids).
+
+    Whenever Telegram answers with `RetryAfter`, the chat is paused for the requested time and
+    its rate is halved. Every successful request raises the rate again until it reaches the
+    nominal one.
+    """
+
+    def __init__(self, global_rate=30.0, private_rate=1.0, group_rate=20 / 60, group_burst=20,
+                 max_retries=5):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self.chats = {}  # chat id -> TokenBucket
+        self.requests = 0
+        self.retries = 0
+        self.waited = 0.0
+
+    def _bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            if len(self.chats) > 10000:
+                now = time.monotonic()
+                self.chats = {c: b for c, b in self.chats.items() if not b.idle(now)}
+            if int(chat_id) < 0:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.private_rate, 1)
+            self.chats[chat_id] = bucket
+        return bucket
+
+    async def acquire(self, chat_id: int):
+        bucket = self._bucket(chat_id)
+        while True:
+            now = time.monotonic()
+            delay = max(self.global_bucket.delay(now), bucket.delay(now))
+            if delay <= 0:
+                self.global_bucket.take()
+                bucket.take()
+                return
+            self.waited += delay
+            await asyncio.sleep(delay)
+
+    async def run(self, chat_id: int, request: Callable[[], Awaitable[T]]) -> T:
+        """ Awaits `request()` as soon as the limits allow, retrying it on `RetryAfter` """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(chat_id)
+            self.requests += 1
+            try:
+                result = await request()
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                retry_after = e.retry_after
+                if isinstance(retry_after, datetime.timedelta):
+                    retry_after = retry_after.total_seconds()
+                self._bucket(chat_id).slow_down(float(retry_after), time.monotonic())
+                continue
+            self._bucket(chat_id).speed_up()
+            return result
+
+    @property
+    def stats(self) -> dict:
+        return dict(
+            requests=self.requests,
+            retries=self.retries,
+            waited_s=round(self.waited, 1),
+            chats=len(self.chats),
+        )
@@ -0,0 +1,101 @@
+import heapq
+import math
+from array import array
+from collections import defaultdict
+from operator import itemgetter
+from typing import Iterable, List, Tuple
+
+
+def trigrams(text: str) -> set:
+    """ Trigrams of a word, padded like pg_trgm: two blanks in front and one at the end """
+    padded = '  ' + text + ' '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Immutable trigram index for typo-tolerant lookups of short texts such as usernames.
+
+    Postings are stored as compact `array`s of document positions. Trigrams that occur in
+    more than `common_fraction` of all documents (e.g. "bot") are not used to collect
+    candidates, but are still counted when scoring them, as are the trigrams skipped because of
+    the `max_postings` budget of `search`.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[int, str]], common_fraction=0.05):
+        keys = array('l')
+        texts = []
+        lengths = array('H')
+        postings = defaultdict(list)
+
+        for position, (key, text) in enumerate(documents):
+            grams = trigrams(text)
+            keys.append(key)
+            texts.append('  ' + text + ' ')
+            lengths.append(len(grams))
+            for gram in grams:
+                postings[gram].append(position)
+
+        self.keys = keys
+        self.texts = texts
+        self.lengths = lengths
+        self.postings = {gram: array('I', positions) for gram, positions in postings.items()}
+        self.common_threshold = max(int(len(texts) * common_fraction), 100)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, query: str, limit=10, min_similarity=0.3, max_postings=15000,
+               max_candidates=300) -> List[Tuple[int, float]]:
+        """
+        Postings are read rarest trigram first, and only until `max_postings` positions have been
+        read. The trigrams left over are counted in the text of the best `max_candidates`
+        candidates instead. This keeps a lookup at a few milliseconds on large indexes, at the
+        price of rarely missing a match that only shares frequent trigrams with the query.
+
+        :return: Up to `limit` tuples of (key, similarity) ordered by descending similarity,
+            where similarity is the Jaccard index of both trigram sets.
+        """
+        grams = trigrams(query)
+        known = sorted((gram for gram in grams if gram in self.postings),
+                       key=lambda gram: len(self.postings[gram]))
+        if not known or len(self.postings[known[0]]) > self.common_threshold:
+            return []
+
+        # sim = shared / (|query| + |doc| - shared) >= min_similarity needs at least this many
+        min_shared = min_similarity * len(grams) / (1 + min_similarity)
+        # ...so every match contains at least one of the rarest `prefix` trigrams
+        prefix = max(len(known) - math.ceil(min_shared) + 1, 1)
+
+        shared = defaultdict(int)
+        read = 0
+        collected = 0
+        for gram in known[:prefix]:
+            positions = self.postings[gram]
+            if len(positions) > self.common_threshold or (
+                    collected and read + len(positions) > max_postings):
+                break
+            for position in positions:
+                shared[position] += 1
+            read += len(positions)
+            collected += 1
+        remaining = known[collected:]
+
+        candidates = shared.items()
+        if len(shared) > max_candidates:
+            candidates = heapq.nlargest(max_candidates, candidates, key=itemgetter(1))
+
+        best = {}
+        for position, count in candidates:
+            if count + len(remaining) < min_shared:
+                continue
+            text = self.texts[position]
+            count += sum(1 for gram in remaining if gram in text)
+            similarity = count / (len(grams) + self.lengths[position] - count)
+            if similarity < min_similarity:
+                continue
+            key = self.keys[position]
+            if similarity > best.get(key, 0):
+                best[key] = similarity
+
+        return heapq.nlargest(limit, best.items(), key=itemgetter(1))
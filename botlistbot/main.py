@@ -6,11 +6,15 @@ from sentry_sdk.integrations.logging import LoggingIntegration
 from telegram.ext import ApplicationBuilder
 
 from botlistbot import appglobals
+from botlistbot import asyncdb
+from botlistbot import jobs
 from botlistbot import routing
+from botlistbot import searchindex
 from botlistbot import settings
 from botlistbot.components import admin, basic
 from botlistbot.custom_botlistbot import BotListBot
 from botlistbot.lib.markdownformatter import MarkdownFormatter
+from botlistbot.models import BotIndex, Job, Revision, Statistic, User
 
 
 def setup_logging():
@@ -25,6 +29,25 @@ def setup_logging():
     )
 
 
+async def flush_pending_writes(_):
+    """ Job and shutdown hook writing changes that models buffer in memory """
+    await asyncdb.run(User.flush_changes)
+    await asyncdb.run(Statistic.flush)
+
+
+async def start_jobs(application):
+    jobs.start(application.bot)
+
+
+async def shutdown(application):
+    jobs.stop()
+    await flush_pending_writes(application)
+
+
+async def flush_statistics(_):
+    await asyncdb.run(Statistic.flush)
+
+
 def main():
     if settings.is_sentry_enabled():
         setup_logging()
@@ -38,6 +61,8 @@ def main():
         .connect_timeout(7)
         .pool_timeout(max(settings.WORKER_COUNT, 4))
         .bot_class(BotListBot)
+        .post_init(start_jobs)
+        .post_shutdown(shutdown)
         .build()
     )
 
@@ -58,10 +83,17 @@ def main():
         except Exception as e:
             log.warning(f"BotChecker initialization skipped: {e}")
 
+    Revision.listen()
+    searchindex.index.build()
+    BotIndex.initialize()
+    Job.create_table(safe=True)
+
     routing.register(application, bot_checker)
     basic.register(application)
 
     application.job_queue.run_repeating(admin.last_update_job, interval=3600 * 24)
+    application.job_queue.run_repeating(flush_pending_writes, interval=settings.USER_WRITE_INTERVAL)
+    application.job_queue.run_repeating(flush_statistics, interval=settings.STATISTICS_FLUSH_INTERVAL)
 
     if settings.DEV:
         log.info("Starting using long polling...")
@@ -0,0 +1,13 @@
+from typing import Callable, Dict
+
+_providers = {}  # type: Dict[str, Callable[[], dict]]
+
+
+def register(name: str, provider: Callable[[], dict]):
+    """ Register a callable returning the current values of a group of internal metrics """
+    _providers[name] = provider
+
+
+def collect() -> Dict[str, dict]:
+    return {name: provider() for name, provider in _providers.items()}
+
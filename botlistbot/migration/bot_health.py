@@ -0,0 +1,52 @@
+"""
+Migration: response latency of the bot checks and daily uptime rollups
+
+Adds `latency` and `path` to `botcheck` and creates `botuptime`, which sums up the checks of
+every bot per day. Adds `latency_count` to a `botuptime` table created by an earlier run.
+
+Usage:
+    python -m botlistbot.migration.bot_health
+"""
+import sys
+from pathlib import Path
+
+botlistbot_path = str((Path(__file__).parent.parent.parent).absolute())
+if botlistbot_path not in sys.path:
+    sys.path.insert(0, botlistbot_path)
+
+from peewee import CharField, IntegerField
+from playhouse.migrate import PostgresqlMigrator, migrate
+
+from botlistbot import appglobals
+from botlistbot.models import BotUptime
+
+migrator = PostgresqlMigrator(appglobals.db)
+
+COLUMNS = [
+    # (table_name, column_name, field)
+    ("botcheck", "latency", IntegerField(null=True)),
+    ("botcheck", "path", CharField(null=True)),
+    ("botuptime", "latency_count", IntegerField(default=0)),
+]
+
+
+def run():
+    print("  CREATE TABLE botuptime ... ", end="")
+    BotUptime.create_table(safe=True)
+    print("OK")
+
+    print("Adding bot check columns...")
+    for table, column, field in COLUMNS:
+        print(f"  ALTER TABLE {table} ADD {column} ... ", end="")
+        try:
+            migrate(
+                migrator.add_column(table, column, field),
+            )
+            print("OK")
+        except Exception as e:
+            print(f"SKIPPED ({e})")
+    print("Done.")
+
+
+if __name__ == "__main__":
+    run()
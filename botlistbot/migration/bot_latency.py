@@ -0,0 +1,46 @@
+"""
+Migration: response times of the bots
+
+`botcheck.full_latency` is the time until a bot finished responding to a ping, and
+`bot.latency` the usual time until its first response, which is shown as ⚡/🐢.
+
+Usage:
+    python -m botlistbot.migration.bot_latency
+"""
+import sys
+from pathlib import Path
+
+botlistbot_path = str((Path(__file__).parent.parent.parent).absolute())
+if botlistbot_path not in sys.path:
+    sys.path.insert(0, botlistbot_path)
+
+from peewee import IntegerField
+from playhouse.migrate import PostgresqlMigrator, migrate
+
+from botlistbot import appglobals
+
+migrator = PostgresqlMigrator(appglobals.db)
+
+COLUMNS = [
+    # (table_name, column_name)
+    ("botcheck", "full_latency"),
+    ("bot", "latency"),
+]
+
+
+def run():
+    print("Adding latency columns...")
+    for table, column in COLUMNS:
+        print(f"  ALTER TABLE {table} ADD {column} ... ", end="")
+        try:
+            migrate(
+                migrator.add_column(table, column, IntegerField(null=True)),
+            )
+            print("OK")
+        except Exception as e:
+            print(f"SKIPPED ({e})")
+    print("Done.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,63 @@
+"""
+Migration: content-addressed profile pictures
+
+`bot.photo_id` is the id of the profile photo on Telegram that was downloaded last, so that
+unchanged photos are not downloaded again, and `bot.photo_hash` the name of the downloaded file
+in BOT_THUMBNAIL_DIR.
+
+The pictures downloaded before, named by username, are moved into the content store and their
+hash is set, so that the first check after the migration does not take them for new ones.
+
+Usage:
+    python -m botlistbot.migration.bot_photos
+"""
+import os
+import sys
+from pathlib import Path
+
+botlistbot_path = str((Path(__file__).parent.parent.parent).absolute())
+if botlistbot_path not in sys.path:
+    sys.path.insert(0, botlistbot_path)
+
+from peewee import CharField
+from playhouse.migrate import PostgresqlMigrator, migrate
+
+from botlistbot import appglobals
+from botlistbot import settings
+from botlistbot.models import Bot
+from botlistbot.models.bot import photo_store
+
+migrator = PostgresqlMigrator(appglobals.db)
+
+COLUMNS = [
+    # (table_name, column_name)
+    ("bot", "photo_id"),
+    ("bot", "photo_hash"),
+]
+
+
+def run():
+    print("Adding profile picture columns...")
+    for table, column in COLUMNS:
+        print(f"  ALTER TABLE {table} ADD {column} ... ", end="")
+        try:
+            migrate(
+                migrator.add_column(table, column, CharField(null=True)),
+            )
+            print("OK")
+        except Exception as e:
+            print(f"SKIPPED ({e})")
+
+    print("Seeding the hashes of downloaded profile pictures ... ", end="")
+    seeded = 0
+    for bot in Bot.select(Bot.id, Bot.username).where(Bot.photo_hash.is_null()):
+        picture = os.path.join(settings.BOT_THUMBNAIL_DIR, bot.username[1:].lower() + '.jpg')
+        if os.path.exists(picture):
+            Bot.update(photo_hash=photo_store.put(picture)).where(Bot.id == bot.id).execute()
+            seeded += 1
+    print(f"{seeded} bots")
+    print("Done.")
+
+
+if __name__ == "__main__":
+    run()
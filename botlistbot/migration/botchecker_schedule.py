@@ -0,0 +1,44 @@
+"""
+Migration: priority scheduling of the bot checker
+
+`bot.next_check` is the time the bot checker pings the bot next, and `botcheck` keeps the
+outcome of every check, from which the checker derives how volatile a bot is.
+
+Usage:
+    python -m botlistbot.migration.botchecker_schedule
+"""
+import sys
+from pathlib import Path
+
+botlistbot_path = str((Path(__file__).parent.parent.parent).absolute())
+if botlistbot_path not in sys.path:
+    sys.path.insert(0, botlistbot_path)
+
+from peewee import DateTimeField
+from playhouse.migrate import PostgresqlMigrator, migrate
+
+from botlistbot import appglobals
+from botlistbot.models import BotCheck
+
+migrator = PostgresqlMigrator(appglobals.db)
+
+
+def run():
+    print("  ALTER TABLE bot ADD next_check ... ", end="")
+    try:
+        migrate(
+            migrator.add_column("bot", "next_check", DateTimeField(null=True)),
+            migrator.add_index("bot", ("next_check",), False),
+        )
+        print("OK")
+    except Exception as e:
+        print(f"SKIPPED ({e})")
+
+    print("  CREATE TABLE botcheck ... ", end="")
+    BotCheck.create_table(safe=True)
+    print("OK")
+    print("Done.")
+
+
+if __name__ == "__main__":
+    run()
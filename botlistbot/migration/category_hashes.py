@@ -0,0 +1,41 @@
+"""
+Migration: content hashes of the category messages in the BotList channel
+
+The channel publisher compares them to skip categories whose text or buttons did not change.
+
+Usage:
+    python -m botlistbot.migration.category_hashes
+"""
+import sys
+from pathlib import Path
+
+botlistbot_path = str((Path(__file__).parent.parent.parent).absolute())
+if botlistbot_path not in sys.path:
+    sys.path.insert(0, botlistbot_path)
+
+from peewee import CharField
+from playhouse.migrate import PostgresqlMigrator, migrate
+
+from botlistbot import appglobals
+
+migrator = PostgresqlMigrator(appglobals.db)
+
+COLUMNS = ["text_hash", "buttons_hash"]
+
+
+def run():
+    print("Adding content hash columns to category...")
+    for column in COLUMNS:
+        print(f"  ALTER TABLE category ADD {column} ... ", end="")
+        try:
+            migrate(
+                migrator.add_column("category", column, CharField(max_length=40, null=True)),
+            )
+            print("OK")
+        except Exception as e:
+            print(f"SKIPPED ({e})")
+    print("Done.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,45 @@
+"""
+Migration: progress of the subscriber notifications sent after a BotList update
+
+`notifications.last_notified_revision` records which subscribers already got the notification of
+a revision, so that an interrupted fan-out only sends to the remaining ones.
+
+Usage:
+    python -m botlistbot.migration.notification_progress
+"""
+import sys
+from pathlib import Path
+
+botlistbot_path = str((Path(__file__).parent.parent.parent).absolute())
+if botlistbot_path not in sys.path:
+    sys.path.insert(0, botlistbot_path)
+
+from peewee import IntegerField
+from playhouse.migrate import PostgresqlMigrator, migrate
+
+from botlistbot import appglobals
+
+migrator = PostgresqlMigrator(appglobals.db)
+
+COLUMNS = [
+    # (table_name, column_name)
+    ("notifications", "last_notified_revision"),
+]
+
+
+def run():
+    print("Adding notification progress columns...")
+    for table, column in COLUMNS:
+        print(f"  ALTER TABLE {table} ADD {column} ... ", end="")
+        try:
+            migrate(
+                migrator.add_column(table, column, IntegerField(null=True)),
+            )
+            print("OK")
+        except Exception as e:
+            print(f"SKIPPED ({e})")
+    print("Done.")
+
+
+if __name__ == "__main__":
+    run()
@@ -5,6 +5,8 @@ from botlistbot.models.apiaccess import APIAccess
 from botlistbot.models.country import Country
 from botlistbot.models.group import Group
 from botlistbot.models.keywordmodel import Keyword
+from botlistbot.models.botindex import BotIndex
+from botlistbot.models import botchanges
 from botlistbot.models.notifications import Notifications
 from botlistbot.models.user import User
 from botlistbot.models.suggestion import Suggestion
@@ -13,6 +15,9 @@ from botlistbot.models.message import Message
 from botlistbot.models.statistic import Statistic
 from botlistbot.models.statistic import track_activity
 from botlistbot.models.revision import Revision
+from botlistbot.models.job import Job
+from botlistbot.models.uptime import BotUptime
+from botlistbot.models.botcheck import BotCheck
 
 
 if __name__ == "__main__":
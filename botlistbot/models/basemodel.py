@@ -1,20 +1,21 @@
 from enum import Enum
 
 from peewee import *
-from playhouse.sqlite_ext import FTSModel
+from playhouse.signals import Model as SignalModel
+from playhouse.sqlite_ext import FTS5Model
 
 from botlistbot.appglobals import db
 
 
-class BaseModel(Model):
+class BaseModel(SignalModel):
     class Meta:
         database = db
 
 
-class BaseFTSModel(FTSModel):
+class BaseFTSModel(FTS5Model):
     class Meta:
         database = db
-        extension_options = {'tokenize': 'porter'}
+        options = {'tokenize': 'porter unicode61'}
 
 
 class EnumField(SmallIntegerField):
@@ -8,12 +8,16 @@ from typing import List
 from botlistbot import helpers
 from botlistbot import settings
 from botlistbot import util
+from botlistbot.lib.contentstore import ContentStore
 from botlistbot.models.basemodel import BaseModel, EnumField
 from botlistbot.models.category import Category
 from botlistbot.models.country import Country
 from botlistbot.models.revision import Revision
 from botlistbot.models.user import User
 
+# downloaded profile photos of the bots, see `Bot.photo_hash`
+photo_store = ContentStore(settings.BOT_THUMBNAIL_DIR, '.jpg')
+
 
 class Bot(BaseModel):
     class DisabledReason(IntEnum):
@@ -45,6 +49,10 @@ class Bot(BaseModel):
 
     last_ping = DateTimeField(null=True)
     last_response = DateTimeField(null=True)
+    next_check = DateTimeField(null=True, index=True)
+    latency = IntegerField(null=True)  # milliseconds, 90th percentile of the first responses
+    photo_id = CharField(null=True)  # unique id of the current profile photo on Telegram
+    photo_hash = CharField(null=True)  # of the downloaded profile photo in BOT_THUMBNAIL_DIR
     disabled = BooleanField(default=False)
     disabled_reason = EnumField(DisabledReason, null=True)
 
@@ -66,15 +74,37 @@ class Bot(BaseModel):
     def online(self) -> bool:
         return not self.offline
 
+    @property
+    def speed(self) -> str:
+        if self.offline or self.latency is None:
+            return ''
+        if self.latency <= settings.FAST_BOT_LATENCY:
+            return '⚡'
+        if self.latency >= settings.SLOW_BOT_LATENCY:
+            return '🐢'
+        return ''
+
     @property
     def offline_for(self) -> timedelta:
         if not self.last_response:
             return timedelta(days=365 * 2)
         return self.last_ping - self.last_response if self.offline else None
 
+    @staticmethod
+    def select_with_relations():
+        """
+        Bots joined with their country and category, so that rendering them does not need an
+        additional query per bot.
+        """
+        return Bot.select(Bot, Country, Category).join(
+            Country, JOIN.LEFT_OUTER, on=Bot.country
+        ).switch(Bot).join(
+            Category, JOIN.LEFT_OUTER, on=Bot.category
+        ).switch(Bot)
+
     @staticmethod
     def select_approved():
-        return Bot.select().where(
+        return Bot.select_with_relations().where(
             Bot.approved == True,
             Bot.revision <= Revision.get_instance().nr,
             Bot.disabled == False
@@ -86,7 +116,7 @@ class Bot(BaseModel):
 
     @staticmethod
     def select_pending_update():
-        return Bot.select().where(
+        return Bot.select_with_relations().where(
             Bot.approved == True,
             Bot.revision == Revision.get_instance().next,
             Bot.disabled == False
@@ -96,7 +126,7 @@ class Bot(BaseModel):
     def serialize(self):
         return {
             'id': self.id,
-            'category_id': self.category.id,
+            'category_id': self.category_id,
             # 'name': self.name,
             'username': self.username,
             'description': self.description,
@@ -143,8 +173,9 @@ class Bot(BaseModel):
 
     @property
     def detail_text(self):
-        from botlistbot.models import Keyword
+        from botlistbot.models import BotUptime, Keyword
         keywords = Keyword.select().where(Keyword.entity == self)
+        uptime = BotUptime.of_bot(self)
         txt = '{}'.format(self.__str__())
         txt += '\n_{}_'.format(util.escape_markdown(self.name)) if self.name else ''
         txt += '\n\n{}'.format(self.description) if self.description else ''
@@ -153,6 +184,11 @@ class Bot(BaseModel):
                 ', '.join([str(k) for k in keywords])
             ) if keywords else ''
         )
+        txt += util.escape_markdown(
+            '\n\nUptime (30 days): {}'.format(uptime) if uptime.checks else '')
+        if self.speed:
+            txt += '\n{} {} ({:.1f}s to respond)'.format(
+                self.speed, 'fast' if self.speed == '⚡' else 'slow', self.latency / 1000)
         return txt
 
     @property
@@ -161,9 +197,11 @@ class Bot(BaseModel):
                ('🚮 ' if self.spam else '') + \
                ('🆕 ' if self.is_new else '') + \
                self.username + \
-               (' ' if any([self.inlinequeries, self.official, self.country]) else '') + \
+               (' ' if any([self.inlinequeries, self.official, self.country, self.speed])
+                else '') + \
                ('🔎' if self.inlinequeries else '') + \
                ('🔹' if self.official else '') + \
+               self.speed + \
                (self.country.emoji if self.country else '') + \
                (' ' + self.extra if self.extra else '')
 
@@ -208,7 +246,7 @@ class Bot(BaseModel):
 
     @staticmethod
     def of_category_without_new(category):
-        return Bot.select().where(
+        return Bot.select_with_relations().where(
             (Bot.category == category),
             (Bot.approved == True),
             (Bot.revision <= Revision.get_instance().nr),
@@ -217,12 +255,12 @@ class Bot(BaseModel):
 
     @staticmethod
     def select_official_bots():
-        return Bot.select().where(Bot.approved == True, Bot.official == True,
-                                  Bot.disabled == False)
+        return Bot.select_with_relations().where(Bot.approved == True, Bot.official == True,
+                                                 Bot.disabled == False)
 
     @staticmethod
     def select_new_bots():
-        return Bot.select().where(
+        return Bot.select_with_relations().where(
             Bot.is_new == True,
             Bot.revision < Revision.get_instance().next,
             Bot.approved == True,
@@ -248,5 +286,7 @@ class Bot(BaseModel):
 
     @property
     def thumbnail_file(self):
+        if self.photo_hash:
+            return photo_store.path(self.photo_hash)
         path = os.path.join(settings.BOT_THUMBNAIL_DIR, self.username[1:].lower() + '.jpg')
         return path
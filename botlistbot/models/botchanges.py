@@ -0,0 +1,36 @@
+"""
+Announces saved and deleted bots and keywords to the other processes through
+`Revision.announce_bot_change`, e.g. the results of the bot checker to the web process.
+"""
+from playhouse.signals import post_delete, post_save, pre_save
+
+from botlistbot.models.bot import Bot
+from botlistbot.models.keywordmodel import Keyword
+from botlistbot.models.revision import Revision
+
+
+@pre_save(sender=Bot)
+def _announce_bot_pre_save(model_class, instance, created):
+    moved = created or any(f.name == 'category' for f in instance.dirty_fields)
+    instance._listed_category_id = None if moved else instance.category_id
+
+
+@post_save(sender=Bot)
+def _announce_bot_saved(model_class, instance, created):
+    Revision.announce_bot_change(instance.id, getattr(instance, '_listed_category_id', None))
+
+
+@post_delete(sender=Bot)
+def _announce_bot_deleted(model_class, instance):
+    Revision.announce_bot_change(instance.id, instance.category_id)
+
+
+# the category is not looked up for keywords, they are added rarely and one at a time
+@post_save(sender=Keyword)
+def _announce_keyword_saved(model_class, instance, created):
+    Revision.announce_bot_change(instance.entity_id, None)
+
+
+@post_delete(sender=Keyword)
+def _announce_keyword_deleted(model_class, instance):
+    Revision.announce_bot_change(instance.entity_id, None)
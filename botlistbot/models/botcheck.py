@@ -0,0 +1,137 @@
+import datetime
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from logzero import logger as log
+from peewee import *
+
+from botlistbot import asyncdb
+from botlistbot import metrics
+from botlistbot import settings
+from botlistbot.models.basemodel import BaseModel
+from botlistbot.models.bot import Bot
+from botlistbot.models.uptime import BotUptime
+
+
+class CheckHistory(NamedTuple):
+    last_online: Optional[datetime.datetime]  # most recent check that found the bot online
+    last_offline: Optional[datetime.datetime]
+    flaps: int  # changes between online and offline in the history window
+
+
+class BotCheck(BaseModel):
+    """ The outcome of pinging a bot, one row per check """
+    MESSAGE = 'message'
+    INLINE = 'inline'
+
+    id = AutoField()
+    bot = ForeignKeyField(Bot, on_delete='CASCADE')
+    checked_at = DateTimeField(default=datetime.datetime.now)
+    online = BooleanField()
+    changed = BooleanField(default=False)  # online state differs from the previous check
+    latency = IntegerField(null=True)  # milliseconds until the first response
+    full_latency = IntegerField(null=True)  # milliseconds until the complete response
+    path = CharField(null=True)  # MESSAGE or INLINE, whichever got a response
+
+    class Meta:
+        indexes = (
+            (('bot', 'checked_at'), False),
+        )
+
+    @staticmethod
+    def record(bot: Bot, checked_at: datetime.datetime, online: bool, changed: bool,
+               latency: int = None, full_latency: int = None, path: str = None):
+        """ Queues a check, which is written with the next batch by `flush` """
+        with _lock:
+            _queue.append(dict(bot=bot.id, checked_at=checked_at, online=online, changed=changed,
+                               latency=latency, full_latency=full_latency, path=path))
+            full = len(_queue) >= settings.BOTCHECK_BATCH_SIZE
+        if full:
+            asyncdb.submit(BotCheck.flush)
+
+    @staticmethod
+    def flush() -> int:
+        """ Writes the queued checks and adds them to the daily uptime rollups """
+        with _lock:
+            rows = list(_queue)
+            _queue.clear()
+        if not rows:
+            return 0
+
+        try:
+            with BotCheck._meta.database.atomic():
+                for batch in chunked(rows, 500):
+                    BotCheck.insert_many(batch).execute()
+                BotUptime.add(_rollups(rows))
+        except Exception as e:
+            log.exception("Dropped {} bot checks: {}".format(len(rows), e))
+            return 0
+        _stats['written'] += len(rows)
+        return len(rows)
+
+    @staticmethod
+    def history_of(bot_ids: Iterable[int], window: datetime.timedelta) -> Dict[int, CheckHistory]:
+        bot_ids = list(bot_ids)
+        if not bot_ids:
+            return {}
+        since = datetime.datetime.now() - window
+
+        last = {}
+        for bot_id, online, checked_at in BotCheck.select(
+                BotCheck.bot, BotCheck.online, fn.MAX(BotCheck.checked_at)
+        ).where(BotCheck.bot.in_(bot_ids)).group_by(BotCheck.bot, BotCheck.online).tuples():
+            last[(bot_id, online)] = checked_at
+
+        flaps = dict(BotCheck.select(BotCheck.bot, fn.COUNT(BotCheck.id)).where(
+            BotCheck.bot.in_(bot_ids),
+            BotCheck.changed == True,
+            BotCheck.checked_at >= since
+        ).group_by(BotCheck.bot).tuples())
+
+        return {
+            bot_id: CheckHistory(
+                last_online=last.get((bot_id, True)),
+                last_offline=last.get((bot_id, False)),
+                flaps=flaps.get(bot_id, 0),
+            ) for bot_id in bot_ids
+        }
+
+    @staticmethod
+    def latencies_of(bot_ids: Iterable[int], window: datetime.timedelta) -> Dict[int, List[int]]:
+        """ The times to the first response of the successful checks within `window` """
+        since = datetime.datetime.now() - window
+        result = defaultdict(list)
+        for bot_id, latency in BotCheck.select(BotCheck.bot, BotCheck.latency).where(
+                BotCheck.bot.in_(list(bot_ids)),
+                BotCheck.checked_at >= since,
+                BotCheck.latency.is_null(False)
+        ).tuples():
+            result[bot_id].append(latency)
+        return result
+
+
+def percentile(values: List[int], fraction: float) -> Optional[int]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def _rollups(rows: List[dict]) -> List[dict]:
+    days = defaultdict(lambda: dict(checks=0, online=0, latency_sum=0, latency_count=0))
+    for row in rows:
+        day = days[(row['bot'], row['checked_at'].date())]
+        day['checks'] += 1
+        if row['online']:
+            day['online'] += 1
+            if row['latency'] is not None:
+                day['latency_sum'] += row['latency']
+                day['latency_count'] += 1
+    return [dict(bot=bot_id, day=day, **counts) for (bot_id, day), counts in days.items()]
+
+
+_queue = []  # type: List[dict]
+_lock = threading.Lock()
+_stats = dict(written=0)
+metrics.register('Bot check writer', lambda: dict(queued=len(_queue), **_stats))
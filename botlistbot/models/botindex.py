@@ -1,22 +1,178 @@
-from playhouse.sqlite_ext import *
+import re
 
-from botlistbot.models.basemodel import BaseFTSModel
+from peewee import *
+from playhouse.postgres_ext import TSVectorField
+from playhouse.signals import post_delete, post_save, pre_save
+from playhouse.sqlite_ext import RowIDField, SearchField
 
+from botlistbot.appglobals import db
+from botlistbot.models.basemodel import BaseFTSModel, BaseModel
+from botlistbot.models.bot import Bot
+from botlistbot.models.keywordmodel import Keyword
+from botlistbot.models.revision import Revision
 
-class BotIndex(BaseFTSModel):
+INDEXED_FIELDS = ('username', 'name', 'description', 'extra')
+TS_LANGUAGE = 'english'
+
+# Relevance of a hit in each column: username, name, keywords, extra, description
+FTS5_WEIGHTS = (10.0, 5.0, 4.0, 2.0, 1.0)
+TS_WEIGHTS = ('A', 'A', 'B', 'C', 'D')
+
+
+def _tokenize(query: str):
+    return re.findall(r'\w+', query.lower())
+
+
+def _document(bot: Bot):
+    keywords = ' '.join(name for (name,) in
+                        Keyword.select(Keyword.name).where(Keyword.entity == bot).tuples())
+    return (
+        bot.username.lstrip('@'),
+        bot.name or '',
+        keywords,
+        bot.extra or '',
+        bot.description or '',
+    )
+
+
+def _select_ranked(join_on, where, rank):
+    return Bot.select_with_relations().join(BotIndex, on=join_on).where(
+        where,
+        (Bot.approved == True),
+        (Bot.revision <= Revision.get_instance().nr),
+        (Bot.disabled == False)
+    ).order_by(rank)
+
+
+class _BotIndexMixin:
+    # bot id -> last indexed document, so that unchanged bots are not rewritten
+    _documents = {}
+
+    @classmethod
+    def save_bot(cls, bot: Bot):
+        document = _document(bot)
+        if cls._documents.get(bot.id) == document:
+            return
+        cls._write(bot, document)
+        cls._documents[bot.id] = document
+
+    @classmethod
+    def remove_bot(cls, bot: Bot):
+        cls._documents.pop(bot.id, None)
+        cls.delete().where(cls._bot_id_field() == bot.id).execute()
+
+    @classmethod
+    def initialize(cls):
+        cls.create_table(safe=True)
+        if not cls.select().exists():
+            cls.rebuild()
+
+    @classmethod
+    def rebuild(cls):
+        with db.atomic():
+            cls.delete().execute()
+            cls._documents.clear()
+            for bot in Bot.select():
+                cls.save_bot(bot)
+
+
+class SqliteBotIndex(_BotIndexMixin, BaseFTSModel):
+    """ FTS5 table with the bot id as rowid, ranked by BM25 """
+    rowid = RowIDField()
+    username = SearchField()
     name = SearchField()
-    description = SearchField()
+    keywords = SearchField()
     extra = SearchField()
+    description = SearchField()
+
+    class Meta:
+        table_name = 'botindex'
+
+    @classmethod
+    def _bot_id_field(cls):
+        return cls.rowid
+
+    @classmethod
+    def _write(cls, bot, document):
+        cls.insert(dict(zip(
+            (cls.rowid, cls.username, cls.name, cls.keywords, cls.extra, cls.description),
+            (bot.id,) + document
+        ))).on_conflict_replace().execute()
+
+    @classmethod
+    def search_bots(cls, query: str):
+        tokens = _tokenize(query)
+        if not tokens:
+            return []
+        match = ' OR '.join('"{}"*'.format(t) for t in tokens)
+        return _select_ranked(
+            (cls.rowid == Bot.id),
+            cls.match(match),
+            cls.bm25(*FTS5_WEIGHTS)
+        )
+
+
+class PostgresBotIndex(_BotIndexMixin, BaseModel):
+    """ Weighted `tsvector` per bot with a GIN index, ranked by `ts_rank` """
+    bot = ForeignKeyField(Bot, primary_key=True, on_delete='CASCADE')
+    document = TSVectorField()
+
+    class Meta:
+        table_name = 'botindex'
+
+    @classmethod
+    def _bot_id_field(cls):
+        return cls.bot
+
+    @classmethod
+    def _write(cls, bot, document):
+        vector = None
+        for text, weight in zip(document, TS_WEIGHTS):
+            part = fn.setweight(fn.to_tsvector(TS_LANGUAGE, text), weight)
+            vector = part if vector is None else vector.concat(part)
+        cls.insert(bot=bot.id, document=vector).on_conflict(
+            conflict_target=[cls.bot],
+            update={cls.document: vector}
+        ).execute()
+
+    @classmethod
+    def search_bots(cls, query: str):
+        tokens = _tokenize(query)
+        if not tokens:
+            return []
+        ts_query = ' | '.join('{}:*'.format(t) for t in tokens)
+        return _select_ranked(
+            (cls.bot == Bot.id),
+            cls.document.match(ts_query, language=TS_LANGUAGE),
+            fn.ts_rank(cls.document, fn.to_tsquery(TS_LANGUAGE, ts_query)).desc()
+        )
+
+
+BotIndex = SqliteBotIndex if isinstance(db.obj, SqliteDatabase) else PostgresBotIndex
+
+
+@pre_save(sender=Bot)
+def _index_bot_pre_save(model_class, instance, created):
+    instance._index_outdated = created or any(
+        f.name in INDEXED_FIELDS for f in instance.dirty_fields)
+
+
+@post_save(sender=Bot)
+def _index_bot_saved(model_class, instance, created):
+    if getattr(instance, '_index_outdated', True):
+        BotIndex.save_bot(instance)
+
+
+@post_delete(sender=Bot)
+def _index_bot_deleted(model_class, instance):
+    BotIndex.remove_bot(instance)
+
+
+@post_save(sender=Keyword)
+def _index_keyword_saved(model_class, instance, created):
+    BotIndex.save_bot(instance.entity)
+
 
-    # http://docs.peewee-orm.com/en/latest/peewee/playhouse.html
-
-    @staticmethod
-    def save_bot(bot):
-        pass
-        # bot_index = BotIndex.get()
-        #     # TODO
-        # BotIndex.insert({
-        #     BotIndex.name: bot.name,
-        #     BotIndex.description: bot.description,
-        #     BotIndex.extra: bot.extra}).execute()
-        # })
+@post_delete(sender=Keyword)
+def _index_keyword_deleted(model_class, instance):
+    BotIndex.save_bot(instance.entity)
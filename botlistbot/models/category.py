@@ -13,6 +13,9 @@ class Category(BaseModel):
     name = CharField(unique=True)
     extra = CharField(null=True)
     current_message_id = IntegerField(null=True)
+    # sha1 of what was last published to the channel message
+    text_hash = CharField(max_length=40, null=True)
+    buttons_hash = CharField(max_length=40, null=True)
 
     @staticmethod
     def select_all():
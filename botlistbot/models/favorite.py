@@ -36,18 +36,23 @@ class Favorite(BaseModel):
 
     @staticmethod
     def select_all(user):
-        user_favs = list(Favorite.select().where(Favorite.user == user))
-        for n, f in enumerate(user_favs):
-            try:
-                if not fn.exists(f.bot):
-                    bot = Bot(category=Favorite.CUSTOM_CATEGORY, username=f.custom_bot, approved=True,
-                              date_added=datetime.date.today())
-                    f.bot = bot
-                    user_favs[n] = f
-                if not fn.exists(f.bot.category):
-                    f.bot.category = Favorite.CUSTOM_CATEGORY
-            except (Bot.DoesNotExist, AttributeError):
+        favs = Favorite.select(Favorite, Bot, Category, Country).join(
+            Bot, JOIN.LEFT_OUTER, on=Favorite.bot
+        ).join(
+            Category, JOIN.LEFT_OUTER, on=Bot.category
+        ).switch(Bot).join(
+            Country, JOIN.LEFT_OUTER, on=Bot.country
+        ).where(Favorite.user == user)
+
+        user_favs = []
+        for f in favs:
+            if f.bot is None:
+                # Bot does not exist (anymore)
                 f.delete_instance()
+                continue
+            if f.bot.category is None:
+                f.bot.category = Favorite.CUSTOM_CATEGORY
+            user_favs.append(f)
         return user_favs
 
     @staticmethod
@@ -0,0 +1,42 @@
+import datetime
+import json
+
+from peewee import *
+
+from botlistbot.models.basemodel import BaseModel
+
+
+class Job(BaseModel):
+    """ A long-running admin job, executed and resumed by `botlistbot.jobs` """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    id = AutoField()
+    kind = CharField()
+    payload = TextField(default='{}')
+    state = CharField(default=QUEUED, index=True)
+    checkpoint = TextField(default='{}')
+    progress = IntegerField(default=0)
+    total = IntegerField(null=True)
+    report_chat_id = BigIntegerField(null=True)
+    report_message_id = IntegerField(null=True)
+    error = TextField(null=True)
+    created = DateTimeField(default=datetime.datetime.now)
+    started = DateTimeField(null=True)
+    finished = DateTimeField(null=True)
+
+    @property
+    def data(self) -> dict:
+        return json.loads(self.payload)
+
+    @staticmethod
+    def next_unfinished():
+        """ The oldest job that was not finished, including those interrupted while running """
+        return Job.select().where(
+            Job.state.in_([Job.QUEUED, Job.RUNNING])
+        ).order_by(Job.id).first()
+
+    def __str__(self):
+        return '{} #{}'.format(self.kind, self.id)
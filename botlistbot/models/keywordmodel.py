@@ -18,6 +18,11 @@ class Keyword(BaseModel):
     def __str__(self):
         return '#' + self.name
 
+    @classmethod
+    def vocabulary(cls) -> Set[str]:
+        """ The names of all keywords in use """
+        return {name for name, in cls.select(cls.name).distinct().tuples()}
+
     @classmethod
     def get_distinct_names(cls, exclude_from_bot: Bot, exclude_suggestions=True) -> Set[str]:
         exclude_kw = {x.name for x in exclude_from_bot.keywords}
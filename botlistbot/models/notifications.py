@@ -1,4 +1,8 @@
+import datetime
+
 from peewee import *
+from typing import List, Tuple  # after peewee, which exports a `Tuple` of its own
+
 from botlistbot.models.basemodel import BaseModel
 
 
@@ -7,3 +11,24 @@ class Notifications(BaseModel):
     chat_id = BigIntegerField(unique=True)
     enabled = BooleanField(default=True)
     last_notification = DateField(null=True)
+    last_notified_revision = IntegerField(null=True)
+
+    @staticmethod
+    def select_pending(revision: int) -> List[Tuple[int, int]]:
+        """ :return: (id, chat_id) of every subscriber not yet notified about `revision` """
+        return list(Notifications.select(Notifications.id, Notifications.chat_id).where(
+            Notifications.enabled == True,
+            Notifications.last_notified_revision.is_null() |
+            (Notifications.last_notified_revision < revision)
+        ).order_by(Notifications.id).tuples())
+
+    @staticmethod
+    def mark_notified(revision: int, succeeded: List[int], failed: List[int]):
+        """ Records a batch of delivered (`succeeded`) and undeliverable (`failed`) notifications """
+        if succeeded:
+            Notifications.update(
+                last_notification=datetime.date.today(), last_notified_revision=revision
+            ).where(Notifications.id.in_(succeeded)).execute()
+        if failed:
+            Notifications.update(last_notified_revision=revision).where(
+                Notifications.id.in_(failed)).execute()
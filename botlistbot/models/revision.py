@@ -1,11 +1,40 @@
+import json
+import os
+import select
+import threading
+import time
+from typing import Callable, Optional
+
+from logzero import logger as log
 from peewee import *
 
+from botlistbot import settings
+from botlistbot.appglobals import db
 from botlistbot.models.basemodel import BaseModel
 
+NOTIFY_CHANNEL = 'botlist_revision'
+BOTS_CHANNEL = 'botlist_bots'
+
 
 class Revision(BaseModel):
+    """
+    The single row holding the current revision of the BotList.
+
+    Every process keeps the row in memory. Bumps are broadcast through Postgres
+    `NOTIFY`, so that the web process, the worker and any replica pick them up right away.
+    Without a listener (e.g. on SQLite), the row is read again once it is older than
+    `settings.REVISION_REFRESH_INTERVAL` seconds.
+
+    Saved and deleted bots are broadcast the same way, for the caches of bots that do not
+    wait for the next revision.
+    """
     nr = IntegerField(default=1)
     _instance = None
+    _loaded_at = 0.0
+    _listening = False
+    _subscribers = []  # callbacks of `subscribe`
+    _bot_subscribers = []  # callbacks of `subscribe_bot_changes`
+    _lock = threading.Lock()
 
     @property
     def next(self):
@@ -13,8 +42,123 @@ class Revision(BaseModel):
 
     @staticmethod
     def get_instance() -> 'Revision':
-        if not Revision._instance:
-            selection = list(Revision.select())
-            assert len(selection) == 1
+        instance = Revision._instance
+        if instance is None or (
+                not Revision._listening and
+                time.monotonic() - Revision._loaded_at > settings.REVISION_REFRESH_INTERVAL):
+            instance = Revision.reload()
+        return instance
+
+    @staticmethod
+    def reload() -> 'Revision':
+        selection = list(Revision.select())
+        assert len(selection) == 1
+        with Revision._lock:
+            previous = Revision._instance
             Revision._instance = selection[0]
-        return Revision._instance
+            Revision._loaded_at = time.monotonic()
+        if previous is not None and previous.nr != selection[0].nr:
+            Revision._notify_subscribers(selection[0].nr)
+        return selection[0]
+
+    @staticmethod
+    def bump() -> 'Revision':
+        """ Increments the revision atomically and announces it to all processes """
+        Revision.update(nr=Revision.nr + 1).execute()
+        return Revision._announce()
+
+    @staticmethod
+    def set_to(nr: int) -> 'Revision':
+        """ Sets the revision to `nr` and announces it, so that repeating it changes nothing """
+        Revision.update(nr=nr).execute()
+        return Revision._announce()
+
+    @staticmethod
+    def _announce() -> 'Revision':
+        instance = Revision.reload()
+        if isinstance(db.obj, PostgresqlDatabase):
+            db.execute_sql("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, str(instance.nr)))
+        return instance
+
+    @staticmethod
+    def subscribe(callback: Callable[[int], None]):
+        """ Calls `callback(new_nr)` whenever this process learns about a new revision """
+        Revision._subscribers.append(callback)
+
+    @staticmethod
+    def listening() -> bool:
+        """ Whether the changes of other processes are announced to this one """
+        return Revision._listening
+
+    @staticmethod
+    def announce_bot_change(bot_id: int, category_id: Optional[int]):
+        """
+        Tells the other processes that the bot was saved or deleted. `category_id` is the category
+        the bot was listed in, None if it is unknown. Only on Postgres, see `listen`.
+        """
+        if isinstance(db.obj, PostgresqlDatabase):
+            payload = json.dumps(dict(pid=os.getpid(), bot=bot_id, category=category_id))
+            db.execute_sql("SELECT pg_notify(%s, %s)", (BOTS_CHANNEL, payload))
+
+    @staticmethod
+    def subscribe_bot_changes(callback: Callable[[int, Optional[int]], None]):
+        """ Calls `callback(bot_id, category_id)` when another process saved or deleted a bot """
+        Revision._bot_subscribers.append(callback)
+
+    @staticmethod
+    def _notify_subscribers(nr: int):
+        _call_all(Revision._subscribers, nr)
+
+    @staticmethod
+    def _bot_changed(payload: str):
+        change = json.loads(payload)
+        if change['pid'] != os.getpid():  # our own saves were already handled by the signals
+            _call_all(Revision._bot_subscribers, change['bot'], change['category'])
+
+    @staticmethod
+    def listen():
+        """ Starts a daemon thread following revision bumps of other processes (Postgres only) """
+        if not isinstance(db.obj, PostgresqlDatabase):
+            return
+        thread = threading.Thread(target=_listen_forever, name='revision-listener', daemon=True)
+        thread.start()
+
+
+def _call_all(callbacks, *args):
+    for callback in callbacks:
+        try:
+            callback(*args)
+        except Exception as e:
+            log.exception(e)
+
+
+def _listen_forever():
+    import psycopg2
+
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(database=db.obj.database, **db.obj.connect_params)
+            conn.autocommit = True
+            conn.cursor().execute("LISTEN {}; LISTEN {}".format(NOTIFY_CHANNEL, BOTS_CHANNEL))
+            Revision._listening = True
+            # a bump or bot change may have happened while we were not listening
+            Revision._notify_subscribers(Revision.reload().nr)
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                notifies = list(conn.notifies)
+                conn.notifies.clear()
+                if any(n.channel == NOTIFY_CHANNEL for n in notifies):
+                    Revision.reload()
+                for n in notifies:
+                    if n.channel == BOTS_CHANNEL:
+                        Revision._bot_changed(n.payload)
+        except Exception as e:
+            log.warning("Revision listener failed, falling back to polling: {}".format(e))
+        finally:
+            Revision._listening = False
+            if conn is not None:
+                conn.close()
+        time.sleep(10)
@@ -1,11 +1,18 @@
 import datetime
 
 import logging
+import threading
+import time
+from collections import deque
 from functools import wraps
+from logzero import logger as log
 from peewee import *
 from telegram import Update
 
+from botlistbot import asyncdb
 from botlistbot import helpers
+from botlistbot import metrics
+from botlistbot import settings
 from botlistbot import util
 from botlistbot.models import User
 from botlistbot.models.basemodel import BaseModel
@@ -16,7 +23,7 @@ def track_activity(action: str, entity: str = None, level: int = logging.INFO):
         @wraps(func)
         async def wrapped(update, context, *args, **kwargs):
             result = await func(update, context, *args, **kwargs)
-            Statistic.of(update, action, entity, level)
+            await asyncdb.run(Statistic.of, update, action, entity, level)
             return result
 
         return wrapped
@@ -92,6 +99,10 @@ class Statistic(BaseModel):
 
     @classmethod
     def of(cls, issuer, action: str, entity: str = None, level=logging.INFO):
+        """
+        Records an event. It is only queued here and written later by `flush`, either once
+        `settings.STATISTICS_BATCH_SIZE` events are waiting or by the periodic flush job.
+        """
         if isinstance(issuer, User):
             user = issuer
         elif isinstance(issuer, Update):
@@ -99,9 +110,37 @@ class Statistic(BaseModel):
         else:
             raise AttributeError("The issuer argument needs to be an object of type User or Update.")
         obj = cls(user=user, date=datetime.datetime.now(), action=action, entity=entity, level=level)
-        obj.save()
+        _queue.append(obj)
+
+        if len(_queue) >= settings.STATISTICS_BATCH_SIZE:
+            asyncdb.submit(cls.flush)
         return obj
 
+    @staticmethod
+    def flush() -> int:
+        """ Writes all queued events with bulk inserts and returns their number """
+        with _flush_lock:
+            events = []
+            while _queue:
+                events.append(_queue.popleft())
+            if not events:
+                return 0
+
+            start = time.perf_counter()
+            rows = [dict(user=e.user_id, date=e.date, action=e.action, entity=e.entity,
+                         level=e.level) for e in events]
+            try:
+                with Statistic._meta.database.atomic():
+                    for batch in chunked(rows, 500):
+                        Statistic.insert_many(batch).execute()
+            except Exception as e:
+                log.exception("Dropped {} statistics: {}".format(len(events), e))
+                return 0
+            _flush_stats['flushes'] += 1
+            _flush_stats['written'] += len(events)
+            _flush_stats['last_flush_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            return len(events)
+
     def md_str(self, no_date=False):
         return '{} {}{} _{}_{}.'.format(
             self.EMOJIS[self.level],
@@ -110,3 +149,9 @@ class Statistic(BaseModel):
             self.__get_action_text(),
             ' ' + self.__format_entity() if self.entity else ''
         )
+
+
+_queue = deque()  # Statistics waiting to be written
+_flush_lock = threading.Lock()
+_flush_stats = dict(flushes=0, written=0, last_flush_ms=None)
+metrics.register('Statistics writer', lambda: dict(queued=len(_queue), **_flush_stats))
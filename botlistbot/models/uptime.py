@@ -0,0 +1,71 @@
+import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from peewee import *
+
+from botlistbot.models.basemodel import BaseModel
+from botlistbot.models.bot import Bot
+
+
+class Uptime(NamedTuple):
+    checks: int
+    online: int
+
+    @property
+    def ratio(self) -> float:
+        return self.online / self.checks if self.checks else 0.0
+
+    def __str__(self):
+        return '{:.1f}%'.format(self.ratio * 100)
+
+
+class BotUptime(BaseModel):
+    """ Daily rollup of the `BotCheck`s of a bot """
+    id = AutoField()
+    bot = ForeignKeyField(Bot, on_delete='CASCADE')
+    day = DateField()
+    checks = IntegerField(default=0)
+    online = IntegerField(default=0)
+    latency_sum = IntegerField(default=0)  # milliseconds, of the online checks with a latency
+    latency_count = IntegerField(default=0)  # online checks with a latency
+
+    class Meta:
+        indexes = (
+            (('bot', 'day'), True),
+        )
+
+    @property
+    def average_latency(self) -> Optional[float]:
+        return self.latency_sum / self.latency_count if self.latency_count else None
+
+    @staticmethod
+    def add(rows: Iterable[dict]):
+        """
+        Adds the given counts (bot, day, checks, online, latency_sum, latency_count) to the daily
+        rollups
+        """
+        BotUptime.insert_many(rows).on_conflict(
+            conflict_target=[BotUptime.bot, BotUptime.day],
+            update={
+                BotUptime.checks: BotUptime.checks + EXCLUDED.checks,
+                BotUptime.online: BotUptime.online + EXCLUDED.online,
+                BotUptime.latency_sum: BotUptime.latency_sum + EXCLUDED.latency_sum,
+                BotUptime.latency_count: BotUptime.latency_count + EXCLUDED.latency_count,
+            }
+        ).execute()
+
+    @staticmethod
+    def of(bot_ids: Iterable[int], days=30) -> Dict[int, Uptime]:
+        since = datetime.date.today() - datetime.timedelta(days=days - 1)
+        query = BotUptime.select(
+            BotUptime.bot, fn.SUM(BotUptime.checks), fn.SUM(BotUptime.online)
+        ).where(
+            BotUptime.bot.in_(list(bot_ids)),
+            BotUptime.day >= since
+        ).group_by(BotUptime.bot)
+        return {bot_id: Uptime(int(checks), int(online)) for bot_id, checks, online in
+                query.tuples()}
+
+    @staticmethod
+    def of_bot(bot: Bot, days=30) -> Uptime:
+        return BotUptime.of([bot.id], days).get(bot.id, Uptime(0, 0))
@@ -1,13 +1,26 @@
+import threading
+
 import inflect
+from logzero import logger as log
 from peewee import *
+from playhouse.signals import post_delete, post_save
 
+from botlistbot import metrics
 from botlistbot import settings
 from telegram import User as TelegramUser
 
 from botlistbot import util
 from botlistbot.layouts import Layouts
+from botlistbot.lib.lrucache import LRUCache
 from botlistbot.models.basemodel import BaseModel
 
+# chat_id -> User. Bounded by a TTL so that changes made by other processes show up eventually.
+_cache = LRUCache(maxsize=10000, ttl=600)
+metrics.register('User cache', lambda: _cache.stats)
+
+_pending = {}  # chat_id -> User whose name changed, but was not written yet
+_pending_lock = threading.Lock()
+
 
 class User(BaseModel):
     id = AutoField()
@@ -22,17 +35,52 @@ class User(BaseModel):
 
     @staticmethod
     def from_telegram_object(user: TelegramUser):
-        try:
-            u = User.get(User.chat_id == user.id)
+        """
+        Returns the (cached) user for `user`. New users are created right away, whereas
+        changes to the names of known users are written in batches by `flush_changes`.
+        """
+        u = _cache.get(user.id)
+        if u is None:
+            try:
+                u = User.get(User.chat_id == user.id)
+            except User.DoesNotExist:
+                u = User.create(chat_id=user.id, username=user.username,
+                                first_name=user.first_name, last_name=user.last_name)
+            _cache.put(user.id, u)
+
+        if (u.first_name, u.last_name, u.username) != (
+                user.first_name, user.last_name, user.username):
             u.first_name = user.first_name
             u.last_name = user.last_name
             u.username = user.username
-        except User.DoesNotExist:
-            u = User(chat_id=user.id, username=user.username, first_name=user.first_name, last_name=user.last_name)
-
-        u.save()
+            with _pending_lock:
+                _pending[u.chat_id] = u
         return u
 
+    @staticmethod
+    def flush_changes() -> int:
+        """ Writes all pending name changes with batched upserts and returns their number """
+        with _pending_lock:
+            users = list(_pending.values())
+            _pending.clear()
+        if not users:
+            return 0
+
+        rows = [dict(id=u.id, chat_id=u.chat_id, first_name=u.first_name,
+                     last_name=u.last_name, username=u.username) for u in users]
+        fields = [User.first_name, User.last_name, User.username]
+        try:
+            for batch in chunked(rows, 100):
+                User.insert_many(batch).on_conflict(
+                    conflict_target=[User.id], preserve=fields).execute()
+        except Exception:
+            with _pending_lock:
+                for u in users:
+                    _pending.setdefault(u.chat_id, u)
+            raise
+        log.debug("Wrote name changes of {} users.".format(len(users)))
+        return len(users)
+
     @staticmethod
     def from_update(update):
         return User.from_telegram_object(update.effective_user)
@@ -104,3 +152,17 @@ class User(BaseModel):
             })
             cls._botlist_user = bl_user
         return cls._botlist_user
+
+
+@post_save(sender=User)
+def _user_cache_saved(model_class, instance, created):
+    _cache.put(instance.chat_id, instance)
+    with _pending_lock:
+        _pending.pop(instance.chat_id, None)
+
+
+@post_delete(sender=User)
+def _user_cache_deleted(model_class, instance):
+    _cache.pop(instance.chat_id)
+    with _pending_lock:
+        _pending.pop(instance.chat_id, None)
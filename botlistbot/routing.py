@@ -43,7 +43,7 @@ from botlistbot.components.explore import (
     send_category,
     show_new_bots,
 )
-from botlistbot.components.misc import access_token, set_notifications, t3chnostats
+from botlistbot.components.misc import access_token, send_metrics, set_notifications, t3chnostats
 from botlistbot.components.search import search_handler, search_query
 from botlistbot.const import BotStates, CallbackActions
 from botlistbot.dialog import messages
@@ -61,7 +61,7 @@ from botlistbot.models import (
 )
 
 try:
-    from botlistbot.components.userbot import BotChecker
+    from botlistbot.botcheckerworker.pool import CheckerPool
 except:
     pass
 
@@ -379,7 +379,7 @@ async def reply_router(update, context):
                 pass
 
 
-def register(application: Application, bot_checker: "BotChecker"):
+def register(application: Application, bot_checker: "CheckerPool"):
     def add(*args, **kwargs):
         application.add_handler(*args, **kwargs)
 
@@ -545,6 +545,7 @@ def register(application: Application, bot_checker: "BotChecker"):
         )
     )
     add(CommandHandler("t3chno", t3chnostats))
+    add(CommandHandler("metrics", send_metrics))
     add(CommandHandler("random", eastereggs.send_random_bot))
     add(CommandHandler("easteregg", eastereggs.send_next))
 
@@ -1,15 +1,21 @@
+import itertools
 import re
 
 from peewee import fn
 
 from botlistbot import settings
 from botlistbot.models import Bot
+from botlistbot.models import BotIndex
 from botlistbot.models import Category
-from botlistbot.models import Keyword
-from botlistbot.models.revision import Revision
+from botlistbot.searchindex import index
 
 
-def search_bots(query):
+def search_bots(query, ranked=False):
+    """
+    :param ranked: Use the full-text index (which also covers descriptions) and order the
+        results by relevance, with explicitly mentioned @usernames and an exactly matching
+        username first. Bots whose username merely contains the query come last.
+    """
     query = query.lower().strip()
     split = query.split(' ')
 
@@ -17,35 +23,25 @@ def search_bots(query):
     if query in ('awesome bot', 'great bot', 'superb bot', 'best bot', 'best bot ever'):
         return [Bot.by_username('@botlistbot')]
 
-    # exact results
-    where_query = (
-        (fn.lower(Bot.username).contains(query) |
-         fn.lower(Bot.name) << split |
-         fn.lower(Bot.extra) ** query) &
-        (Bot.revision <= Revision.get_instance().nr &
-         Bot.approved == True & Bot.disabled == False)
-    )
-    results = set(Bot.select().distinct().where(where_query))
-
-    # keyword results
-    keyword_results = Bot.select(Bot).join(Keyword).where(
-        (fn.lower(Keyword.name) << split) &
-        (Bot.revision <= Revision.get_instance().nr) &
-        (Bot.approved == True & Bot.disabled == False)
-    )
-    results.update(keyword_results)
-
-    # many @usernames
     usernames = re.findall(settings.REGEX_BOT_ONLY, query)
-    if usernames:
-        try:
-            bots = Bot.many_by_usernames(usernames)
-            print([b.username for b in bots])
-            results.update(bots)
-        except Bot.DoesNotExist:
-            pass
-
-    return list(results)
+
+    if ranked:
+        results = {}
+        for b in itertools.chain(
+                index.by_usernames(usernames + ['@' + query.lstrip('@')]),
+                BotIndex.search_bots(query),
+                # full-text tokens only match prefixes, so "list" would not find @botlistbot
+                index.by_username_part(query)):
+            results.setdefault(b.id, b)
+        return list(results.values()) or index.fuzzy_search(query)
+
+    # exact, keyword and many @usernames results
+    results = index.search(query, split, usernames)
+    if results:
+        return results
+
+    # typos
+    return index.fuzzy_search(query)
 
 
 def search_categories(query):
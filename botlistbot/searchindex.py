@@ -0,0 +1,245 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable
+
+from logzero import logger as log
+from playhouse.signals import post_delete, post_save
+
+from botlistbot import settings
+from botlistbot.lib.trigramindex import TrigramIndex
+from botlistbot.models import Bot
+from botlistbot.models import Keyword
+from botlistbot.models.revision import Revision
+
+
+class SearchIndex:
+    """
+    Process-local inverted index over all approved bots, answering `search.search_bots`
+    without hitting the database.
+
+    Built once at startup, rebuilt when the revision changes and patched in place whenever
+    a single bot or keyword is saved or deleted, by this or (see `Revision.listen`) another
+    process. Without a listener, it is rebuilt after `settings.REVISION_REFRESH_INTERVAL` seconds
+    instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._revision = None
+        self._built_at = 0.0
+        self.bots = {}
+        self.usernames = {}
+        self.names = defaultdict(set)
+        self.extras = defaultdict(set)
+        self.keywords = defaultdict(set)
+        self._keys = {}  # bot id -> (username, name, extra) as indexed
+        self._trigrams = None
+
+    def invalidate(self):
+        self._revision = None
+
+    def build(self):
+        with self._lock:
+            revision = Revision.get_instance().nr
+
+            self.bots = {}
+            self.usernames = {}
+            self.names = defaultdict(set)
+            self.extras = defaultdict(set)
+            self.keywords = defaultdict(set)
+            self._keys = {}
+
+            for b in Bot.select_approved():
+                self._add_bot(b)
+
+            for name, bot_id in Keyword.select(Keyword.name, Keyword.entity).tuples():
+                if bot_id in self.bots:
+                    self.keywords[name.lower()].add(bot_id)
+
+            self._trigrams = self._build_trigrams()
+            self._revision = revision
+            self._built_at = time.monotonic()
+
+        log.info("Search index built with {} bots and {} keywords.".format(
+            len(self.bots), len(self.keywords)))
+
+    def _build_trigrams(self) -> TrigramIndex:
+        documents = []
+        for bot_id, (username, name, _) in self._keys.items():
+            documents.append((bot_id, username.lstrip('@')))
+            if name:
+                documents.append((bot_id, name))
+        return TrigramIndex(documents)
+
+    def _ensure_built(self):
+        if self._revision != Revision.get_instance().nr or (
+                not Revision.listening() and
+                time.monotonic() - self._built_at > settings.REVISION_REFRESH_INTERVAL):
+            self.build()
+
+    @staticmethod
+    def _is_searchable(bot: Bot) -> bool:
+        return (
+            bot.approved and
+            not bot.disabled and
+            bot.revision is not None and
+            bot.revision <= Revision.get_instance().nr
+        )
+
+    def _add_bot(self, bot: Bot):
+        username = bot.username.lower()
+        name = bot.name.lower() if bot.name else None
+        extra = bot.extra.lower() if bot.extra else None
+
+        self.bots[bot.id] = bot
+        self.usernames[username] = bot.id
+        if name:
+            self.names[name].add(bot.id)
+        if extra:
+            self.extras[extra].add(bot.id)
+        self._keys[bot.id] = (username, name, extra)
+
+    def _remove_bot(self, bot_id: int, keep_keywords=False):
+        self.bots.pop(bot_id, None)
+        keys = self._keys.pop(bot_id, None)
+        if keys:
+            username, name, extra = keys
+            if self.usernames.get(username) == bot_id:
+                del self.usernames[username]
+            if name:
+                self.names[name].discard(bot_id)
+            if extra:
+                self.extras[extra].discard(bot_id)
+        if not keep_keywords:
+            for ids in self.keywords.values():
+                ids.discard(bot_id)
+
+    def update_bot(self, bot: Bot):
+        with self._lock:
+            if self._revision is None:
+                return  # will be built from scratch on next search
+
+            known = bot.id in self.bots
+            keys_before = self._keys.get(bot.id)
+            self._remove_bot(bot.id, keep_keywords=True)
+            if self._is_searchable(bot):
+                self._add_bot(bot)
+                if not known:
+                    for (name,) in Keyword.select(Keyword.name).where(
+                            Keyword.entity == bot).tuples():
+                        self.keywords[name.lower()].add(bot.id)
+            else:
+                self._remove_bot(bot.id)
+
+            if self._keys.get(bot.id) != keys_before:
+                self._trigrams = None
+
+    def refresh_bot(self, bot_id: int):
+        """ Reads the bot and its keywords again, after another process changed them """
+        with self._lock:
+            if self._revision is None:
+                return
+            bot = Bot.get_or_none(Bot.id == bot_id)
+            keys_before = self._keys.get(bot_id)
+            self._remove_bot(bot_id)
+            if bot is not None and self._is_searchable(bot):
+                self._add_bot(bot)
+                for (name,) in Keyword.select(Keyword.name).where(Keyword.entity == bot).tuples():
+                    self.keywords[name.lower()].add(bot.id)
+            if self._keys.get(bot_id) != keys_before:
+                self._trigrams = None
+
+    def remove_bot(self, bot: Bot):
+        with self._lock:
+            self._remove_bot(bot.id)
+            self._trigrams = None
+
+    def add_keywords(self, bot_id: int, names: Iterable[str]):
+        with self._lock:
+            if bot_id not in self.bots:
+                return
+            for name in names:
+                self.keywords[name.lower()].add(bot_id)
+
+    def remove_keyword(self, bot_id: int, name: str):
+        with self._lock:
+            ids = self.keywords.get(name.lower())
+            if ids:
+                ids.discard(bot_id)
+
+    def by_usernames(self, usernames: Iterable[str]):
+        with self._lock:
+            self._ensure_built()
+            ids = (self.usernames.get(u.lower()) for u in usernames)
+            return [self.bots[i] for i in dict.fromkeys(ids) if i is not None]
+
+    def _username_matches(self, query: str):
+        return [bot_id for username, bot_id in self.usernames.items() if query in username]
+
+    def by_username_part(self, query: str):
+        """ Bots whose username contains `query` """
+        with self._lock:
+            self._ensure_built()
+            return [self.bots[i] for i in self._username_matches(query.lower())]
+
+    def search(self, query: str, split: Iterable[str], usernames: Iterable[str]):
+        """
+        Same semantics as the former SQL lookup: `query` is contained in the username,
+        equals the extra text, or one of the words in `split` equals the name or a keyword.
+        Additionally, all `usernames` mentioned explicitly are included.
+        """
+        with self._lock:
+            self._ensure_built()
+
+            ids = set(self._username_matches(query))
+            ids.update(self.extras.get(query, ()))
+            for word in split:
+                ids.update(self.names.get(word, ()))
+                ids.update(self.keywords.get(word, ()))
+            for username in usernames:
+                bot_id = self.usernames.get(username.lower())
+                if bot_id is not None:
+                    ids.add(bot_id)
+
+            return [self.bots[i] for i in ids]
+
+    def fuzzy_search(self, query: str):
+        """
+        Typo-tolerant lookup by trigram similarity of usernames and names, best match first.
+        """
+        with self._lock:
+            self._ensure_built()
+            if self._trigrams is None:
+                self._trigrams = self._build_trigrams()
+            matches = self._trigrams.search(
+                query.lstrip('@'),
+                limit=settings.FUZZY_SEARCH_RESULTS,
+                min_similarity=settings.FUZZY_SEARCH_MIN_SIMILARITY
+            )
+            return [self.bots[bot_id] for bot_id, _ in matches]
+
+
+index = SearchIndex()
+Revision.subscribe(lambda nr: index.invalidate())
+Revision.subscribe_bot_changes(lambda bot_id, category_id: index.refresh_bot(bot_id))
+
+
+@post_save(sender=Bot)
+def _bot_saved(model_class, instance, created):
+    index.update_bot(instance)
+
+
+@post_delete(sender=Bot)
+def _bot_deleted(model_class, instance):
+    index.remove_bot(instance)
+
+
+@post_save(sender=Keyword)
+def _keyword_saved(model_class, instance, created):
+    index.add_keywords(instance.entity_id, [instance.name])
+
+
+@post_delete(sender=Keyword)
+def _keyword_deleted(model_class, instance):
+    index.remove_keyword(instance.entity_id, instance.name)
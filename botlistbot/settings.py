@@ -34,6 +34,22 @@ MODERATORS = [
 ] + ADMINS
 DEVELOPER_ID = config("DEVELOPER_ID", default=62056065, cast=int)
 BOT_CONSIDERED_NEW = 1  # Revision difference
+DB_WORKERS = config("DB_WORKERS", default=8, cast=int)  # threads running blocking queries
+# Postgres connections shared by the worker threads, the event loop and the bot checker. 0 disables pooling.
+DATABASE_POOL_SIZE = config("DATABASE_POOL_SIZE", default=DB_WORKERS + 4, cast=int)
+DATABASE_STALE_TIMEOUT = config("DATABASE_STALE_TIMEOUT", default=300, cast=int)  # seconds until a connection is recycled
+DATABASE_POOL_TIMEOUT = config("DATABASE_POOL_TIMEOUT", default=10, cast=int)  # seconds to wait for a free connection
+# Telegram flood limits in messages per second, see https://core.telegram.org/bots/faq
+TELEGRAM_GLOBAL_RATE = 30
+TELEGRAM_PRIVATE_CHAT_RATE = 1
+TELEGRAM_GROUP_RATE = 20 / 60
+TELEGRAM_GROUP_BURST = 20
+NOTIFICATION_CONCURRENCY = 10  # subscribers notified at the same time
+NOTIFICATION_PROGRESS_BATCH = 50  # notifications between two progress writes
+STATISTICS_BATCH_SIZE = 200  # queued statistics that trigger a write
+STATISTICS_FLUSH_INTERVAL = 5  # seconds
+USER_WRITE_INTERVAL = 30  # seconds between batched writes of changed user names
+REVISION_REFRESH_INTERVAL = config("REVISION_REFRESH_INTERVAL", default=30, cast=int)  # seconds, without NOTIFY (also the age of cached bots)
 WORKER_COUNT = 5 if DEV else 40
 TEST_BOT_NAME = "gottesgebot"
 LIVE_BOT_NAME = "botlistbot"
@@ -49,6 +65,8 @@ REGEX_BOT_ONLY = r"(@[a-zA-Z0-9_]{3,31})"
 PAGE_SIZE_SUGGESTIONS_LIST = 5
 PAGE_SIZE_BOT_APPROVAL = 5
 MAX_SEARCH_RESULTS = 25
+FUZZY_SEARCH_RESULTS = 5
+FUZZY_SEARCH_MIN_SIMILARITY = 0.3
 MAX_BOTS_PER_MESSAGE = 140
 BOT_ACCEPTED_IDLE_TIME = 2  # minutes
 SUGGESTION_LIMIT = 25
@@ -63,17 +81,35 @@ USE_USERBOT = RUN_BOTCHECKER
 API_ID = config("API_ID", cast=lambda v: int(v) if v else None, default=None)
 API_HASH = config("API_HASH", default=None)
 USERBOT_SESSION = config("USERBOT_SESSION", default=None)
-USERBOT_PHONE = config("USERBOT_PHONE", default=None)
+USERBOT_PHONE = config("USERBOT_PHONE", default=None)  # of USERBOT_SESSION
+# the bot checks are spread over these sessions, which are downloaded from the account repository
+# if they do not exist in the accounts directory
+USERBOT_SESSIONS = config("USERBOT_SESSIONS", cast=Csv(), default=USERBOT_SESSION or "")
 PING_MESSAGES = ["/start", "/help"]
 PING_INLINEQUERIES = ["", "abc", "/test"]
+PING_TIMEOUT = 30  # seconds to wait for a response of bots that are offline or not measured yet
+PING_MIN_TIMEOUT = 5
+PING_TIMEOUT_FACTOR = 3  # times the usual response time of a bot
+FAST_BOT_LATENCY = 1000  # milliseconds
+SLOW_BOT_LATENCY = 8000
 BOTCHECKER_CONCURRENT_COUNT = 20
-BOTCHECKER_INTERVAL = 3600 * 3
+BOTCHECKER_INTERVAL = 3600 * 3  # seconds between two checks of new, offline or unsteady bots
+BOTCHECKER_MIN_INTERVAL = 60 * 30
+BOTCHECKER_MAX_INTERVAL = 3600 * 24 * 3  # for bots that have been online for a long time
+BOTCHECKER_RUN_INTERVAL = 60 * 15  # seconds between two runs checking the bots that are due
+BOTCHECKER_HOURLY_BUDGET = config("BOTCHECKER_HOURLY_BUDGET", default=600, cast=int)  # pings per hour and session
+BOTCHECK_BATCH_SIZE = 50  # recorded checks that trigger a write
+BOTCHECK_FLUSH_INTERVAL = 5  # seconds after which the results of a checker run are written
+BOTCHECKER_DIGEST_INTERVAL = 300  # seconds the notifications of a checker run are collected
 DELETE_CONVERSATION_AFTER_PING = config(
     "DELETE_CONVERSATIONS_AFTER_PING", True, cast=bool
 )
 NOTIFY_NEW_PROFILE_PICTURE = not DEV
 DOWNLOAD_PROFILE_PICTURES = config("DOWNLOAD_PROFILE_PICTURES", True, cast=bool)
+PROFILE_PICTURE_DOWNLOADS = 4  # concurrent downloads per userbot session
 DISABLE_BOT_INACTIVITY_DELTA = timedelta(days=15)
+DISABLE_BOT_MIN_UPTIME = 0.1  # bots that are offline and rarely online in 30 days are disabled
+DISABLE_BOT_MIN_CHECKS = 30  # checks in 30 days needed to judge the uptime
 
 OFFLINE_DETERMINERS = [
     "under maintenance",
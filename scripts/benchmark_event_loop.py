@@ -0,0 +1,143 @@
+"""
+Latency of the inline query handler under concurrent queries, with its database work either
+blocking the event loop or running on the `asyncdb` worker threads.
+
+Every simulated inline query runs `inlinequeries.inlinequery_handler` for the name of a random
+category or the username of a random bot, as a random user. The cache of inline query answers
+is disabled, so that every query reaches the database. `--rtt` delays every SQL statement to
+mimic the network round trip to a remote Postgres; use `--rtt 0` with a real
+`DATABASE_URL`. The blocking variant replaces `asyncdb.run` by a direct call, like the
+handlers made their database calls before.
+
+Usage: python scripts/benchmark_event_loop.py [--rate 40] [--duration 5] [--rtt 5]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+os.environ.setdefault(
+    'DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'botlistbot-benchmark.db'))
+
+from botlistbot import asyncdb
+from botlistbot.appglobals import db
+from botlistbot.components import inlinequeries
+from botlistbot.models import (
+    Bot, BotUptime, Category, Country, Favorite, Keyword, Revision, User)
+from botlistbot.models import user as user_model
+from botlistbot.searchindex import index
+
+MODELS = [Country, User, Category, Revision, Bot, Keyword, Favorite, BotUptime]
+NUM_CATEGORIES = 20
+NUM_BOTS = 2000
+NUM_USERS = 200
+
+
+def populate():
+    db.drop_tables(MODELS)
+    db.create_tables(MODELS)
+    Revision.create(nr=10)
+    with db.atomic():
+        categories = [Category.create(order=i, emojis=':robot_face:', name='Category {}'.format(i))
+                      for i in range(NUM_CATEGORIES)]
+        Bot.insert_many([dict(
+            username='@bench{}bot'.format(i), revision=5, approved=True,
+            category=categories[i % NUM_CATEGORIES], date_added=datetime.date.today(),
+        ) for i in range(NUM_BOTS)]).execute()
+        User.insert_many([dict(chat_id=i, first_name='User {}'.format(i))
+                          for i in range(NUM_USERS)]).execute()
+        Favorite.insert_many([dict(
+            user=u, bot=random.randrange(1, NUM_BOTS), date_added=datetime.date.today(),
+        ) for u in range(1, NUM_USERS + 1) for _ in range(5)]).execute()
+
+
+def add_round_trip(rtt):
+    """ Delays every SQL statement by `rtt` seconds """
+    execute_sql = db.obj.execute_sql
+
+    def delayed_execute_sql(*args, **kwargs):
+        time.sleep(rtt)
+        return execute_sql(*args, **kwargs)
+
+    db.obj.execute_sql = delayed_execute_sql
+
+
+async def blocking_run(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+def inline_query(rnd: random.Random):
+    if rnd.random() < 0.5:
+        query = 'category {}'.format(rnd.randrange(NUM_CATEGORIES))
+    else:
+        query = 'bench{}bot'.format(rnd.randrange(NUM_BOTS))
+    user_id = rnd.randrange(NUM_USERS)
+    return SimpleNamespace(
+        inline_query=SimpleNamespace(id=str(rnd.random()), query=query, offset=''),
+        effective_user=SimpleNamespace(id=user_id, first_name='User {}'.format(user_id),
+                                       last_name=None, username=None))
+
+
+async def simulate(pooled, arrivals, rnd):
+    """ :return: The sorted latencies in ms, measured from the arrival of each query """
+    latencies = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def answer_inline_query(inline_query_id, results, **kwargs):
+        pass
+
+    context = SimpleNamespace(bot=SimpleNamespace(answer_inline_query=answer_inline_query))
+
+    async def handle(arrival, update):
+        await asyncio.sleep(start + arrival - loop.time())
+        await inlinequeries.inlinequery_handler(update, context)
+        latencies.append((loop.time() - start - arrival) * 1000)
+
+    run = asyncdb.run
+    if not pooled:
+        asyncdb.run = blocking_run
+    try:
+        await asyncio.gather(*(handle(a, inline_query(rnd)) for a in arrivals))
+    finally:
+        asyncdb.run = run
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rate', type=float, default=40, help='inline queries per second')
+    parser.add_argument('--duration', type=float, default=5, help='seconds per run')
+    parser.add_argument('--rtt', type=float, default=5, help='ms added to every SQL statement')
+    args = parser.parse_args()
+
+    populate()
+    if args.rtt:
+        add_round_trip(args.rtt / 1000)
+    inlinequeries.results_cache.maxsize = 0
+    index.build()
+
+    rnd = random.Random(42)
+    arrivals = []  # Poisson arrivals, in seconds since the start
+    t = rnd.expovariate(args.rate)
+    while t < args.duration:
+        arrivals.append(t)
+        t += rnd.expovariate(args.rate)
+
+    for pooled in (False, True):
+        user_model._cache.clear()
+        latencies = asyncio.run(simulate(pooled, arrivals, random.Random(42)))
+        print("{:>16} | {:5} queries | p50 {:8.2f}ms | p99 {:8.2f}ms".format(
+            'db worker pool' if pooled else 'on event loop', len(latencies),
+            latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Latency of the typo-tolerant username search as the catalog grows.
+
+Usage: python scripts/benchmark_fuzzy_search.py [sizes...]
+"""
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from statistics import median
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+
+from botlistbot.lib.trigramindex import TrigramIndex
+
+SIZES = [5_000, 50_000, 500_000]
+QUERIES = 200
+SYLLABLES = ['sti', 'ck', 'er', 'mu', 'sic', 'vo', 'te', 'po', 'll', 'ga', 'me', 'list',
+             'file', 'conv', 'ert', 'trans', 'late', 'we', 'ath', 'news', 'gif', 'you',
+             'tube', 'rss', 'feed', 'quiz', 'chat', 'img', 'pic', 'dl', 'zip']
+
+
+def random_username(rnd: random.Random) -> str:
+    stem = ''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+    if rnd.random() < 0.3:
+        stem += str(rnd.randint(0, 99))
+    return stem + rnd.choice(['bot', '_bot', 'robot', 'bot'])
+
+
+def typo(rnd: random.Random, word: str) -> str:
+    i = rnd.randrange(len(word) - 1)
+    operation = rnd.choice(['swap', 'drop', 'replace'])
+    if operation == 'swap':
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if operation == 'drop':
+        return word[:i] + word[i + 1:]
+    return word[:i] + rnd.choice(string.ascii_lowercase) + word[i + 1:]
+
+
+def benchmark(size: int, rnd: random.Random):
+    usernames = [random_username(rnd) for _ in range(size)]
+
+    start = time.perf_counter()
+    index = TrigramIndex(enumerate(usernames))
+    build_time = time.perf_counter() - start
+
+    latencies = []
+    hits = 0
+    for _ in range(QUERIES):
+        target = rnd.randrange(size)
+        query = typo(rnd, usernames[target])
+        start = time.perf_counter()
+        results = index.search(query, limit=5)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += any(usernames[key] == usernames[target] for key, _ in results)
+
+    latencies.sort()
+    print("{:>8} bots | build {:7.2f}s | median {:7.2f}ms | p99 {:7.2f}ms | "
+          "target in top 5: {:.0%}".format(
+              size, build_time, median(latencies),
+              latencies[int(len(latencies) * 0.99) - 1], hits / QUERIES))
+
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1:]] or SIZES
+    rnd = random.Random(42)
+    for size in sizes:
+        benchmark(size, rnd)
@@ -36,18 +36,26 @@ create_order = [
     Favorite,
     Group,
     Keyword,
+    BotIndex,
     Notifications,
     Statistic,
     Suggestion,
+    Job,
+    BotCheck,
+    BotUptime,
 ]
 
 delete_order = [
+    BotUptime,
+    BotCheck,
+    Job,
     APIAccess,
     Revision,
     Channel,
     Favorite,
     Group,
     Keyword,
+    BotIndex,
     Notifications,
     Statistic,
     Suggestion,
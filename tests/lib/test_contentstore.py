@@ -0,0 +1,20 @@
+import os
+
+from botlistbot.lib.contentstore import ContentStore
+
+
+def test_identical_files_are_stored_once(tmp_path):
+    store = ContentStore(str(tmp_path / 'store'), '.jpg')
+    first, second, other = tmp_path / 'a', tmp_path / 'b', tmp_path / 'c'
+    first.write_bytes(b'picture')
+    second.write_bytes(b'picture')
+    other.write_bytes(b'another picture')
+
+    digest = store.put(str(first))
+    assert store.put(str(second)) == digest
+    assert store.put(str(other)) != digest
+
+    assert digest in store and None not in store
+    assert open(store.path(digest), 'rb').read() == b'picture'
+    assert not first.exists() and not second.exists()
+    assert len(os.listdir(store.directory)) == 2
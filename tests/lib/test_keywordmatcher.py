@@ -0,0 +1,10 @@
+from botlistbot.lib.keywordmatcher import KeywordMatcher
+
+
+def test_finds_whole_words_ignoring_case():
+    matcher = KeywordMatcher(['music', 'Music Player', 'youtube', 'c++', 'tube', 'play'])
+    text = "Send me a YouTube link and I'll be your music player. Works with c++ too!"
+
+    assert matcher.find(text) == {'music', 'Music Player', 'youtube', 'c++'}
+    assert matcher.find("musical players") == set()
+    assert KeywordMatcher([]).find(text) == set()
@@ -0,0 +1,37 @@
+import time
+
+from telegram.error import RetryAfter
+
+from botlistbot.lib.ratelimiter import RateLimiter
+
+
+async def test_sends_bursts_then_paces_per_chat():
+    limiter = RateLimiter(global_rate=1000, group_rate=20, group_burst=5)
+
+    async def request():
+        return 'sent'
+
+    start = time.monotonic()
+    for _ in range(5):
+        assert await limiter.run(-100, request) == 'sent'
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(4):
+        await limiter.run(-100, request)
+    assert time.monotonic() - start >= 0.15
+
+
+async def test_backs_off_after_retry_after():
+    limiter = RateLimiter(global_rate=1000, private_rate=100)
+    attempts = []
+
+    async def request():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RetryAfter(0.1)
+        return 'sent'
+
+    assert await limiter.run(42, request) == 'sent'
+    assert attempts[1] - attempts[0] >= 0.1
+    assert limiter.retries == 1
+    assert limiter.chats[42].rate < 100
@@ -0,0 +1,33 @@
+from botlistbot.lib.trigramindex import TrigramIndex, trigrams
+
+
+def test_trigrams_are_padded_like_pg_trgm():
+    assert trigrams('bot') == {'  b', ' bo', 'bot', 'ot '}
+
+
+def test_finds_mistyped_words_best_match_first():
+    index = TrigramIndex([(1, 'weatherbot'), (2, 'whetherbot'), (3, 'musicbot'), (3, 'Music')])
+
+    assert [key for key, _ in index.search('weathrbot')] == [1]
+    assert [key for key, _ in index.search('whetherbt')] == [2]
+    assert {key for key, _ in index.search('wheatherbot')} == {1, 2}
+    assert index.search('weatherbot')[0] == (1, 1.0)
+    assert [key for key, _ in index.search('musikbot')] == [3]
+    assert index.search('translator') == []
+    assert len(index.search('bot', limit=1, min_similarity=0)) == 1
+
+
+def test_common_trigrams_only_count_for_scoring():
+    documents = [(i, 'test{}bot'.format(i)) for i in range(200)] + [(999, 'newsbot')]
+    index = TrigramIndex(documents, common_fraction=0.01)
+
+    assert index.search('nwsbot')[0][0] == 999
+    assert index.search('bot') == []  # only common trigrams
+
+
+def test_trigrams_beyond_the_postings_budget_still_count_for_scoring():
+    documents = [(i, 'news{}feed'.format(i)) for i in range(50)] + [(999, 'newsbot')]
+    index = TrigramIndex(documents)
+
+    assert index.search('newsbot', max_postings=1)[0] == (999, 1.0)
+    assert index.search('newsbt', max_postings=1, max_candidates=1)[0][0] == 999
@@ -0,0 +1,74 @@
+import datetime
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# a file, so that the database worker threads see the same tables
+os.environ.setdefault(
+    "DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "botlistbot-tests.db"))
+
+from playhouse.test_utils import count_queries
+
+from botlistbot import searchindex
+from botlistbot.appglobals import db
+from botlistbot.models import user as user_model
+from botlistbot.models import (
+    Bot, BotCheck, BotIndex, BotUptime, Category, Channel, Country, Favorite, Job, Keyword, Notifications, Revision,
+    Statistic, User)
+
+MODELS = [Country, User, Category, Revision, Bot, Keyword, Favorite, Statistic, Notifications, Job,
+          BotCheck, BotUptime, Channel]
+
+
+# not counted as queries, older peewee versions log them like any other statement
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+@contextmanager
+def assert_max_queries(expected: int):
+    """
+    Fails if the wrapped block executes more than `expected` database queries, not counting
+    the statements that begin and end transactions
+    """
+    with count_queries() as counter:
+        yield counter
+    queries = [q.msg[0] for q in counter.get_queries()
+               if not q.msg[0].lstrip().upper().startswith(TRANSACTION_STATEMENTS)]
+    assert len(queries) <= expected, "Expected at most {} queries, got {}:\n{}".format(
+        expected, len(queries), '\n'.join(queries))
+
+
+@pytest.fixture
+def database():
+    db.create_tables(MODELS)
+    BotIndex.create_table(safe=True)
+    Revision._instance = None
+    Revision.create(nr=10)
+    Revision.get_instance()
+    searchindex.index.invalidate()
+    user_model._cache.clear()
+    yield db
+    BotIndex.drop_table(safe=True)
+    db.drop_tables(MODELS)
+
+
+@pytest.fixture
+def category(database):
+    return Category.create(order=1, emojis=":robot_face:", name="Tools")
+
+
+@pytest.fixture
+def bots(category):
+    country = Country.create(name="Italy", emoji="🇮🇹")
+    created = []
+    for i in range(20):
+        created.append(Bot.create(
+            revision=9 + i % 3,  # some of them are new, some pending
+            category=category,
+            username="@test{}bot".format(i),
+            date_added=datetime.date.today(),
+            country=country if i % 2 else None,
+        ))
+    return created
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from playhouse.pool import PooledSqliteDatabase
+
+from botlistbot import asyncdb, settings
+from botlistbot.appglobals import db
+from botlistbot.models import Statistic, User
+
+
+@pytest.fixture
+def pool(database, monkeypatch):
+    # connections move between the worker threads, as psycopg2 connections may
+    pooled = PooledSqliteDatabase(database.obj.database, max_connections=2,
+                                  timeout=settings.DATABASE_POOL_TIMEOUT,
+                                  check_same_thread=False)
+    monkeypatch.setattr(db, 'obj', pooled)
+    yield pooled
+    pooled.close_all()
+
+
+async def test_calls_check_out_a_pooled_connection_and_release_it(pool):
+    checked_out = []
+
+    def count_users():
+        checked_out.append(len(pool._in_use))
+        return User.select().count()
+
+    def fail():
+        checked_out.append(len(pool._in_use))
+        raise ValueError
+
+    assert await asyncdb.run(count_users) == 0
+    with pytest.raises(ValueError):
+        await asyncdb.run(fail)
+    # more concurrent calls than connections
+    assert await asyncio.gather(*(asyncdb.run(count_users) for _ in range(6))) == [0] * 6
+
+    assert len(checked_out) == 8 and all(1 <= n <= 2 for n in checked_out)
+    assert len(pool._in_use) == 0
+    assert 1 <= len(pool._connections) <= 2
+
+
+async def test_statistics_are_flushed_with_a_pooled_connection(pool, monkeypatch):
+    monkeypatch.setattr(settings, 'STATISTICS_BATCH_SIZE', 10)
+    user = await asyncdb.run(User.create, chat_id=1)
+
+    for i in range(10):
+        Statistic.of(user, 'search', 'query {}'.format(i))
+    for _ in range(100):
+        if await asyncdb.run(Statistic.select().count) == 10:
+            break
+        await asyncio.sleep(0.01)
+
+    assert await asyncdb.run(Statistic.select().count) == 10
+    assert len(pool._in_use) == 0
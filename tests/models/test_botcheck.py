@@ -0,0 +1,266 @@
+import asyncio
+import datetime
+import os
+from types import SimpleNamespace
+
+from botlistbot import settings
+from botlistbot.botcheckerworker import botchecker, scheduler
+from botlistbot.botcheckerworker.pool import CheckerPool
+from botlistbot.lib.contentstore import ContentStore
+from botlistbot.models import Bot, BotCheck, BotUptime
+from botlistbot.models import bot as bot_model
+from botlistbot.models.botcheck import CheckHistory
+from tests.models.conftest import assert_max_queries
+
+
+def test_history_counts_recent_flaps(bots):
+    now = datetime.datetime.now()
+    stable, flapping = bots[0], bots[1]
+    BotCheck.create(bot=stable, checked_at=now - datetime.timedelta(days=20), online=False)
+    BotCheck.create(bot=stable, checked_at=now - datetime.timedelta(hours=1), online=True)
+    for hours, online in [(30, False), (20, True), (10, False)]:
+        BotCheck.create(bot=flapping, checked_at=now - datetime.timedelta(hours=hours),
+                        online=online, changed=True)
+
+    history = BotCheck.history_of([stable.id, flapping.id, bots[2].id], scheduler.HISTORY_WINDOW)
+
+    assert history[stable.id].flaps == 0
+    assert history[stable.id].last_offline < history[stable.id].last_online
+    assert history[flapping.id].flaps == 3
+    assert history[bots[2].id] == CheckHistory(None, None, 0)
+
+
+def test_volatile_bots_are_checked_more_often(bots):
+    now = datetime.datetime.now()
+    bot = bots[0]
+    bot.date_added = now.date() - datetime.timedelta(days=365)
+    long_online = CheckHistory(now, now - datetime.timedelta(days=60), 0)
+    flapping = CheckHistory(now, now, 2)
+
+    stable_interval = scheduler.next_check_interval(bot, long_online, now, True, False)
+    flapping_interval = scheduler.next_check_interval(bot, flapping, now, True, False)
+    offline_interval = scheduler.next_check_interval(bot, long_online, now, False, True)
+
+    assert flapping_interval < offline_interval < stable_interval
+    assert stable_interval.total_seconds() <= settings.BOTCHECKER_MAX_INTERVAL * 1.1
+    assert flapping_interval.total_seconds() >= settings.BOTCHECKER_MIN_INTERVAL * 0.9
+
+
+def test_due_bots_are_selected_most_overdue_first(bots):
+    now = datetime.datetime.now()
+    Bot.update(next_check=now + datetime.timedelta(hours=1)).execute()
+    Bot.update(next_check=now - datetime.timedelta(hours=2)).where(Bot.id == bots[3].id).execute()
+    Bot.update(next_check=now - datetime.timedelta(hours=5)).where(Bot.id == bots[4].id).execute()
+    Bot.update(next_check=None).where(Bot.id == bots[5].id).execute()
+
+    assert [b.id for b in scheduler.select_due(10)] == [bots[5].id, bots[4].id, bots[3].id]
+    assert len(scheduler.select_due(2)) == 2
+
+
+def test_checks_are_written_in_bulk_and_rolled_up(bots):
+    now = datetime.datetime.now()
+    yesterday = now - datetime.timedelta(days=1)
+    bot = bots[0]
+
+    with assert_max_queries(0):
+        BotCheck.record(bot, yesterday, online=True, changed=False, latency=200,
+                        path=BotCheck.MESSAGE)
+        BotCheck.record(bot, now, online=False, changed=True)
+        BotCheck.record(bot, now, online=True, changed=True, latency=400, path=BotCheck.INLINE)
+    assert BotCheck.select().count() == 0
+
+    assert BotCheck.flush() == 3
+    BotCheck.record(bot, now, online=True, changed=False, latency=100, path=BotCheck.MESSAGE)
+    assert BotCheck.flush() == 1
+
+    assert BotCheck.select().count() == 4
+    assert BotUptime.select().count() == 2
+    today = BotUptime.get(BotUptime.bot == bot, BotUptime.day == now.date())
+    assert (today.checks, today.online, today.latency_sum) == (3, 2, 500)
+
+    uptime = BotUptime.of_bot(bot)
+    assert (uptime.checks, uptime.online) == (4, 3)
+    assert str(uptime) == '75.0%'
+    assert BotUptime.of_bot(bot, days=1).checks == 3
+    assert 'Uptime (30 days): 75.0%' in bot.detail_text
+
+    BotCheck.record(bot, now, online=True, changed=False)  # without a latency
+    BotCheck.flush()
+    today = BotUptime.get_by_id(today.id)
+    assert (today.online, today.latency_count, today.average_latency) == (3, 2, 250)
+
+
+def test_usual_response_time_is_shown_and_shortens_the_timeout(bots):
+    from botlistbot.botcheckerworker.botchecker import ping_timeout
+
+    now = datetime.datetime.now()
+    fast, slow = bots[0], bots[1]
+    for latency in [300, 400, 500, 600, 900]:
+        BotCheck.record(fast, now, online=True, changed=False, latency=latency)
+    BotCheck.record(slow, now, online=True, changed=False, latency=12000)
+    BotCheck.record(slow, now, online=False, changed=True)
+    BotCheck.flush()
+
+    latencies = BotCheck.latencies_of([fast.id, slow.id], scheduler.HISTORY_WINDOW)
+    assert sorted(latencies[fast.id]) == [300, 400, 500, 600, 900]
+    assert latencies[slow.id] == [12000]
+
+    fast.last_ping = fast.last_response = now
+    fast.latency = 900
+    slow.last_ping = slow.last_response = now
+    slow.latency = 12000
+    assert '⚡' in fast.str_no_md and '⚡ fast (0.9s to respond)' in fast.detail_text
+    assert '🐢' in slow.str_no_md and '🐢 slow (12.0s to respond)' in slow.detail_text
+    listed = fast.str_no_md
+    fast.latency = 950
+    assert fast.str_no_md == listed  # the listing only changes when a threshold is crossed
+    fast.latency = 900
+
+    assert ping_timeout(fast, latencies[fast.id]) == settings.PING_MIN_TIMEOUT
+    assert ping_timeout(slow, latencies[slow.id]) == settings.PING_TIMEOUT
+    fast.last_response = None
+    assert ping_timeout(fast, latencies[fast.id]) == settings.PING_TIMEOUT
+
+
+def test_sessions_share_the_bots_and_take_over_from_flooded_ones():
+    sessions = {name: SimpleNamespace(username_flood_until=None) for name in 'abc'}
+    pool = CheckerPool(sessions)
+    bots = [SimpleNamespace(id=i) for i in range(3000)]
+
+    queues = {name: asyncio.Queue() for name in sessions}
+    for bot in bots:
+        queues[pool.session_for(bot)].put_nowait((bot, None, []))
+    assert all(800 < q.qsize() < 1200 for q in queues.values())
+
+    # adding a session only moves bots to the new one
+    bigger = CheckerPool(dict(sessions, d=SimpleNamespace(username_flood_until=None)))
+    moved = [b for b in bots if bigger.sessions_for(b)[0] != pool.sessions_for(b)[0]]
+    assert all(bigger.sessions_for(b)[0] == 'd' for b in moved)
+    assert len(moved) < 1200
+
+    sessions['a'].username_flood_until = datetime.datetime.now() + datetime.timedelta(minutes=5)
+    flooded_bot = queues['a']._queue[0][0]
+    assert pool.checker_for(flooded_bot) is not sessions['a']
+    assert pool.next_bot('a', queues) is None
+
+    queues['b'] = asyncio.Queue()
+    assert pool.next_bot('b', queues)[0] is flooded_bot
+
+
+async def test_run_streams_the_due_bots_through_all_sessions(bots, monkeypatch):
+    checked = []
+
+    async def check_bot(telegram_bot, bot_checker, to_check, result_queue, history, latencies,
+                        matcher, writes, digest):
+        checked.append((bot_checker.name, to_check.id))
+        to_check.next_check = datetime.datetime.now() + datetime.timedelta(hours=1)
+        await asyncio.sleep(0.01)
+        await writes.put(to_check)
+        await result_queue.put('online')
+
+    monkeypatch.setattr(botchecker, 'check_bot', check_bot)
+    monkeypatch.setattr(botchecker, 'PAGE_SIZE', 3)
+    monkeypatch.setattr(botchecker, 'IDLE_INTERVAL', 0.01)
+    pool = CheckerPool({name: SimpleNamespace(name=name, username_flood_until=None)
+                        for name in 'ab'})
+
+    result = await botchecker.run(None, pool, scheduler.iter_due(15, page_size=4))
+
+    assert result['online'] == 15
+    assert sorted(bot_id for _, bot_id in checked) == sorted(b.id for b in bots)[:15]
+    assert {name for name, _ in checked} == {'a', 'b'}
+    assert len(scheduler.select_due(100)) == 5
+
+
+async def test_only_changed_fields_are_written_in_bulk(bots):
+    before = [dict(b.__data__) for b in bots[:4]]
+    now = datetime.datetime.now()
+    for bot in bots[:4]:
+        bot.name = bot.name  # assigned, but unchanged
+        bot.last_ping = bot.last_response = now
+    bots[0].official = True
+    # edited by an admin in the meantime
+    Bot.update(description='Edited').where(Bot.id << [b.id for b in bots[:4]]).execute()
+
+    writes = asyncio.Queue()
+    for bot, data in zip(bots[:4], before):
+        await botchecker.persist(bot, data, writes)
+    batch = [writes.get_nowait() for _ in range(4)]
+    with assert_max_queries(2):  # one UPDATE per combination of changed fields, in one transaction
+        botchecker.save_checked(batch)
+
+    for bot in Bot.select().where(Bot.id << [b.id for b in bots[:4]]):
+        assert bot.description == 'Edited'
+        assert bot.last_ping == now
+    assert Bot.get_by_id(bots[0].id).official
+    assert not bots[0]._dirty
+
+
+async def test_notifications_of_a_run_are_sent_as_a_digest(tmp_path):
+    from botlistbot.botcheckerworker import digest as notifications
+
+    sent = []
+
+    async def send_message(chat_id, text, **kwargs):
+        sent.append(text)
+
+    async def send_sticker(chat_id, sticker, **kwargs):
+        sent.append(sticker.read())
+
+    digest = notifications.Digest(
+        SimpleNamespace(send_message=send_message, send_sticker=send_sticker), chat_id=-1,
+        interval=3600)
+    for i in range(300):
+        await digest.add(notifications.WENT_OFFLINE, '@outage{}bot'.format(i))
+    await digest.add(notifications.NEW_KEYWORDS, '@test1bot: #music')
+    await digest.add(notifications.DISABLED, '@test2bot (offline)')
+    assert not sent and len(digest) == 302
+
+    await digest.flush(header='BotChecker completed in 10s')
+
+    assert 1 < len(sent) <= 3
+    assert all(len(text) <= notifications.MAX_MESSAGE_LENGTH for text in sent)
+    text = '\n'.join(sent)
+    assert text.startswith('BotChecker completed in 10s\n\n💤 Went offline (300):\n@outage0bot')
+    assert '@outage299bot' in text and '#music' in text and '🚫 Disabled (1)' in text
+    assert not digest
+
+    # every sticker is preceded by the bot it belongs to
+    for i in range(2):
+        picture = tmp_path / '{}.jpg'.format(i)
+        picture.write_bytes(b'picture %d' % i)
+        await digest.add_picture('@test{}bot'.format(i), str(picture))
+    sent.clear()
+    await digest.flush()
+    assert sent[1:] == ['New profile picture of @test0bot:', b'picture 0',
+                        'New profile picture of @test1bot:', b'picture 1']
+
+
+async def test_unchanged_profile_photos_are_not_downloaded(bots, tmp_path, monkeypatch):
+    monkeypatch.setattr(botchecker, 'TMP_DIR', str(tmp_path))
+    store = ContentStore(str(tmp_path / 'photos'), '.jpg')
+    monkeypatch.setattr(botchecker, 'photo_store', store)
+    monkeypatch.setattr(bot_model, 'photo_store', store)
+    photo = SimpleNamespace(file_unique_id='photo-1')
+    downloads = []
+
+    def download_media(media, file_name, block):
+        downloads.append(media.file_unique_id)
+        with open(file_name, 'wb') as f:
+            f.write(b'the same picture')
+
+    checker = botchecker.BotChecker('session', 1, 'hash', None)
+    checker.get_user_profile_photos = lambda chat_id: SimpleNamespace(photos=[[photo]])
+    checker.download_media = download_media
+
+    bot, copy = bots[0], bots[1]
+    assert await checker.download_profile_photo(bot)
+    assert bot.thumbnail_file == store.path(bot.photo_hash)
+    assert not await checker.download_profile_photo(bot)
+    assert downloads == ['photo-1']
+
+    # a new photo with the same content as the one of another bot
+    photo.file_unique_id = 'photo-2'
+    assert await checker.download_profile_photo(copy)
+    assert copy.photo_hash == bot.photo_hash
+    assert len(os.listdir(store.directory)) == 1
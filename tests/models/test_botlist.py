@@ -0,0 +1,106 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from botlistbot import appglobals
+from botlistbot import jobs
+from botlistbot import settings
+from botlistbot.components import botlist
+from botlistbot.lib.ratelimiter import RateLimiter
+from botlistbot.models import Category, Channel, Job, Revision
+
+
+class FakeBot:
+    """ Records what is sent to the channel and the admin """
+
+    def __init__(self):
+        self.texts = []  # (chat id, text, message id to edit)
+        self.markups = []  # (chat id, message id)
+        self.formatter = SimpleNamespace(send_or_edit=self.send_or_edit,
+                                         send_failure=self.send_failure)
+
+    async def send_or_edit(self, chat_id, text, to_edit=None, **kwargs):
+        self.texts.append((chat_id, text, to_edit))
+        return SimpleNamespace(message_id=to_edit or 1000 + len(self.texts))
+
+    async def send_failure(self, chat_id, text):
+        self.texts.append((chat_id, text, None))
+
+    async def edit_message_reply_markup(self, chat_id, message_id, reply_markup=None, **kwargs):
+        self.markups.append((chat_id, message_id))
+
+    async def delete_message(self, chat_id, message_id):
+        pass
+
+
+@pytest.fixture
+def channel(database, monkeypatch):
+    # every test publishes a whole BotList, which the flood limits would slow down
+    monkeypatch.setattr(appglobals, 'rate_limiter', RateLimiter(
+        global_rate=1000, private_rate=1000, group_rate=1000, group_burst=1000))
+    return Channel.create(chat_id=-1001, username=settings.SELF_CHANNEL_USERNAME)
+
+
+async def test_publishing_job_updates_the_channel(bots, channel):
+    bot = FakeBot()
+    await jobs.enqueue('send_botlist', dict(resend=False, silent=True),
+                       report_chat_id=1, report_message_id=2)
+    await jobs._run(bot, Job.next_unfinished())
+
+    job = Job.get()
+    assert job.state == Job.DONE, job.error
+    channel_texts = [text for chat_id, text, _ in bot.texts if chat_id == channel.chat_id]
+    assert any('@test0bot' in text for text in channel_texts)
+    assert bot.markups
+    assert 'BotList updated successfully' in bot.texts[-1][1]
+    assert Channel.get_by_id(channel.id).last_update is not None
+    assert Revision.get_instance().nr == 11
+
+
+async def test_a_resumed_job_does_not_bump_the_revision_again(bots, channel):
+    await jobs.enqueue('send_botlist', dict(resend=False, silent=True))
+    job = Job.next_unfinished()
+    # interrupted after storing the new revision, maybe after setting it as well
+    job.state = Job.RUNNING
+    job.checkpoint = json.dumps(dict(revision=11))
+    job.save()
+    Revision.set_to(11)
+
+    await jobs._run(FakeBot(), Job.next_unfinished())
+    assert Job.get().state == Job.DONE, Job.get().error
+    assert Revision.get_instance().nr == 11
+
+
+async def test_only_changed_categories_are_edited(category, bots, channel):
+    games = Category.create(order=2, emojis=':video_game:', name='Games')
+    for b in bots[10:]:
+        b.category = games
+        b.save()
+    bot = FakeBot()
+
+    async def publish():
+        bot.texts.clear()
+        bot.markups.clear()
+        await botlist.BotList(bot, 1, 2, channel, resend=False, silent=True).update_categories(
+            list(Category.select_all()))
+        edited = [to_edit for chat_id, _, to_edit in bot.texts if chat_id == channel.chat_id]
+        return edited, [message_id for _, message_id in bot.markups]
+
+    edited, markups = await publish()
+    assert edited == [None, None]  # sent
+    tools, games = Category.select_all()
+    assert markups == [tools.current_message_id, games.current_message_id]
+
+    assert await publish() == ([], [])
+
+    bots[12].extra = 'Edited'
+    bots[12].save()
+    assert await publish() == ([games.current_message_id], [games.current_message_id])
+
+    # a new category only changes the buttons of its neighbour
+    news = Category.create(order=3, emojis=':newspaper:', name='News')
+    edited, markups = await publish()
+    news = Category.get_by_id(news.id)
+    assert edited == [None]
+    assert markups == [games.current_message_id, news.current_message_id]
@@ -0,0 +1,58 @@
+import json
+import os
+
+from botlistbot import categorycache, settings
+from botlistbot.models import Bot, Revision
+from tests.models.conftest import assert_max_queries
+
+
+def test_categories_are_rendered_once_until_a_bot_is_saved(category, bots):
+    categorycache.invalidate()
+    rendered = categorycache.rendered_category(category)
+    with assert_max_queries(0):
+        assert categorycache.rendered_category(category) is rendered
+
+    bots[0].extra = 'Edited'
+    bots[0].save()
+    assert any('Edited' in line for line in categorycache.rendered_category(category).lines)
+
+
+def test_renderings_outdated_by_a_concurrent_save_are_not_cached(category, bots, monkeypatch):
+    categorycache.invalidate()
+    of_category_without_new = Bot.of_category_without_new
+
+    def saved_while_rendering(c):
+        selected = list(of_category_without_new(c))
+        Bot.update(extra='Edited').where(Bot.id == bots[0].id).execute()
+        categorycache.invalidate(c.id)  # as done by the post_save signal of the other thread
+        return selected
+
+    monkeypatch.setattr(Bot, 'of_category_without_new', saved_while_rendering)
+    stale = categorycache.rendered_category(category)
+    monkeypatch.setattr(Bot, 'of_category_without_new', of_category_without_new)
+
+    assert not any('Edited' in line for line in stale.lines)
+    assert any('Edited' in line for line in categorycache.rendered_category(category).lines)
+
+
+def test_bots_saved_by_another_process_are_rendered_again(category, bots, monkeypatch):
+    monkeypatch.setattr(Revision, '_listening', True)
+    categorycache.invalidate()
+    categorycache.rendered_category(category)
+    Bot.update(extra='Edited').where(Bot.id == bots[0].id).execute()  # without signals
+
+    change = dict(bot=bots[0].id, category=category.id)
+    Revision._bot_changed(json.dumps(dict(change, pid=os.getpid())))  # sent by this process
+    assert not any('Edited' in line for line in categorycache.rendered_category(category).lines)
+    Revision._bot_changed(json.dumps(dict(change, pid=os.getpid() + 1)))
+    assert any('Edited' in line for line in categorycache.rendered_category(category).lines)
+
+
+def test_renderings_expire_without_a_listener(category, bots, monkeypatch):
+    categorycache.invalidate()
+    categorycache.rendered_category(category)
+    Bot.update(extra='Edited').where(Bot.id == bots[0].id).execute()
+    assert not any('Edited' in line for line in categorycache.rendered_category(category).lines)
+
+    monkeypatch.setattr(settings, 'REVISION_REFRESH_INTERVAL', -1)
+    assert any('Edited' in line for line in categorycache.rendered_category(category).lines)
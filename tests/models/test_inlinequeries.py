@@ -0,0 +1,103 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from botlistbot.components import inlinequeries
+from botlistbot.models import Bot, User
+from botlistbot.models.revision import Revision
+
+
+@pytest.fixture
+def searches(bots, monkeypatch):
+    """ The queries that were actually searched, rather than answered from the cache """
+    inlinequeries.results_cache.clear()
+    queries = []
+    search_bots = inlinequeries.search.search_bots
+
+    def counting_search_bots(query):
+        queries.append(query)
+        return search_bots(query)
+
+    monkeypatch.setattr(inlinequeries.search, 'search_bots', counting_search_bots)
+    return queries
+
+
+@pytest.fixture
+def user(database):
+    return User.create(chat_id=1)
+
+
+def test_answers_are_cached_per_normalized_query(searches, user):
+    hits = inlinequeries.results_cache.hits
+    page, total, kwargs = inlinequeries._answer_page(user, 'test', 0)
+    assert inlinequeries._answer_page(user, '  test ', 0) == (page, total, kwargs)
+    inlinequeries._answer_page(user, 'test', 30)
+
+    assert searches == ['test']
+    assert inlinequeries.results_cache.hits == hits + 2
+
+
+def test_cached_answers_expire(searches, user, monkeypatch):
+    monkeypatch.setattr(inlinequeries.results_cache, 'ttl', 0.01)
+    inlinequeries._answer_page(user, 'test', 0)
+    time.sleep(0.02)
+    inlinequeries._answer_page(user, 'test', 0)
+
+    assert searches == ['test', 'test']
+
+
+def test_new_revisions_invalidate_cached_answers(searches, user):
+    _, published, _ = inlinequeries._answer_page(user, 'test', 0)
+    Revision.bump()
+    assert len(inlinequeries.results_cache) == 0
+
+    _, total, _ = inlinequeries._answer_page(user, 'test', 0)
+    assert searches == ['test', 'test']
+    assert total > published  # the bots of the new revision
+
+
+async def answer(query, offset):
+    answers = []
+
+    async def answer_inline_query(inline_query_id, results, **kwargs):
+        answers.append((results, kwargs))
+
+    update = SimpleNamespace(
+        inline_query=SimpleNamespace(id='1', query=query, offset=offset),
+        effective_user=SimpleNamespace(id=1, first_name='Test', last_name=None, username=None))
+    context = SimpleNamespace(bot=SimpleNamespace(answer_inline_query=answer_inline_query))
+    await inlinequeries.inlinequery_handler(update, context)
+    return answers[0]
+
+
+async def test_results_are_paginated(bots):
+    for i in range(50):
+        Bot.create(revision=10, category=bots[0].category, username='@more{}testbot'.format(i),
+                   date_added=bots[0].date_added)
+    inlinequeries.results_cache.clear()
+
+    offsets = ['']
+    pages = []
+    while True:
+        results, kwargs = await answer('test', offsets[-1])
+        pages.append(results)
+        if not kwargs['next_offset']:
+            break
+        offsets.append(kwargs['next_offset'])
+
+    assert offsets == ['', '30', '60']
+    assert [len(page) for page in pages] == [30, 30, 5]  # all bots and one article with all of them
+    titles = [article.title for page in pages for article in page]
+    assert len(set(titles)) == len(titles)
+
+    summary = pages[0][0].input_message_content.message_text
+    assert summary.count('\n@') + summary.count('\n🆕') == inlinequeries.RESULTS_PER_PAGE
+    assert summary.endswith('... and 34 more')
+
+
+async def test_bad_offsets_start_at_the_first_page(bots):
+    first_page, _ = await answer('test', '')
+    for offset in ['abc', '-30', '1.5']:
+        results, _ = await answer('test', offset)
+        assert [r.title for r in results] == [r.title for r in first_page]
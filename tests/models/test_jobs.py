@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from botlistbot import jobs
+from botlistbot.models import Job
+
+
+async def test_interrupted_jobs_resume_from_their_checkpoint(database):
+    steps = []
+
+    @jobs.handler('test')
+    async def handler(job: jobs.JobContext):
+        for step in range(job.checkpoint.get('step', 0), 3):
+            steps.append(step)
+            if step == 1 and not job.resumed:
+                raise asyncio.CancelledError  # the bot is restarted
+            await job.save(step=step + 1)
+
+    await jobs.enqueue('test', {})
+    with pytest.raises(asyncio.CancelledError):
+        await jobs._run(None, Job.next_unfinished())
+
+    job = Job.next_unfinished()
+    assert job.state == Job.RUNNING
+    await jobs._run(None, job)
+
+    assert steps == [0, 1, 1, 2]
+    assert Job.get_by_id(job.id).state == Job.DONE
+    assert Job.next_unfinished() is None
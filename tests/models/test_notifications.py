@@ -0,0 +1,16 @@
+from botlistbot.models import Notifications
+
+
+def test_notified_subscribers_are_not_pending_anymore(database):
+    subscribers = [Notifications.create(chat_id=i) for i in range(1, 6)]
+    Notifications.create(chat_id=100, enabled=False)
+    ids = [s.id for s in subscribers]
+
+    assert [id_ for id_, _ in Notifications.select_pending(11)] == ids
+
+    Notifications.mark_notified(11, succeeded=ids[:2], failed=ids[2:3])
+    assert [id_ for id_, _ in Notifications.select_pending(11)] == ids[3:]
+    assert Notifications.get_by_id(ids[0]).last_notification is not None
+    assert Notifications.get_by_id(ids[2]).last_notification is None
+
+    assert len(Notifications.select_pending(12)) == 5
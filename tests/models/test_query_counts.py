@@ -0,0 +1,57 @@
+import datetime
+
+from botlistbot.models import Bot, Favorite, User
+from tests.models.conftest import assert_max_queries
+
+
+def test_category_listing_is_a_single_query(category, bots):
+    with assert_max_queries(1):
+        lines = [str(b) for b in Bot.of_category_without_new(category)]
+    assert any("🇮🇹" in line for line in lines)
+
+
+def test_new_bots_markdown_is_a_single_query(bots):
+    with assert_max_queries(1):
+        Bot.get_new_bots_markdown()
+
+
+def test_pending_and_official_bots_are_a_single_query(bots):
+    with assert_max_queries(1):
+        Bot.get_pending_update_bots_markdown()
+    with assert_max_queries(1):
+        Bot.get_official_bots_markdown()
+
+
+def test_favorites_are_a_single_query(bots):
+    user = User.create(chat_id=1)
+    for b in bots[:10]:
+        Favorite.create(user=user, bot=b, date_added=datetime.date.today())
+
+    with assert_max_queries(1):
+        favorites = Favorite.select_all(user)
+        lines = ["{} {}".format(f.bot.category, f.bot) for f in favorites]
+    assert len(lines) == 10
+
+
+def test_search_results_render_without_queries(bots):
+    from botlistbot import search
+
+    search.search_bots("test")  # builds the index
+    with assert_max_queries(0):
+        results = search.search_bots("test")
+        lines = [str(b) for b in results]
+    assert len(lines) > 0
+
+
+def test_ranked_search_results_render_in_a_single_query(bots):
+    from botlistbot import search
+
+    for b in bots[:10]:
+        b.description = "Forecasts the weather"
+        b.save()
+
+    search.search_bots("weather", ranked=True)  # builds the index
+    with assert_max_queries(1):
+        results = search.search_bots("weather", ranked=True)
+        lines = [str(b) for b in results]
+    assert any("🇮🇹" in line for line in lines)
@@ -0,0 +1,20 @@
+from botlistbot.models import Revision
+
+
+def test_bump_notifies_subscribers(database):
+    seen = []
+    Revision.subscribe(seen.append)
+    try:
+        assert Revision.bump().nr == 11
+        assert Revision.get_instance().nr == 11
+    finally:
+        Revision._subscribers.remove(seen.append)
+    assert seen == [11]
+
+
+def test_picks_up_bumps_of_other_processes(database):
+    Revision.update(nr=Revision.nr + 5).execute()  # as if done by another process
+    assert Revision.get_instance().nr == 10
+
+    Revision._loaded_at -= 3600
+    assert Revision.get_instance().nr == 15
@@ -0,0 +1,115 @@
+import json
+import os
+import re
+
+import pytest
+from peewee import fn
+
+from botlistbot import settings
+from botlistbot.models import Bot, Keyword
+from botlistbot.models.revision import Revision
+from botlistbot.searchindex import index
+
+
+def sql_search_bots(query):
+    """ The SQL lookup that `search_bots` answered before the in-memory index """
+    split = query.split(' ')
+    searchable = (
+        (Bot.revision <= Revision.get_instance().nr) &
+        (Bot.approved == True) & (Bot.disabled == False)
+    )
+
+    results = set(Bot.select().distinct().where(
+        (fn.lower(Bot.username).contains(query) |
+         fn.lower(Bot.name) << split |
+         fn.lower(Bot.extra) ** query) & searchable
+    ))
+    results.update(Bot.select(Bot).join(Keyword).where(
+        (fn.lower(Keyword.name) << split) & searchable
+    ))
+    usernames = re.findall(settings.REGEX_BOT_ONLY, query)
+    if usernames:
+        results.update(Bot.select().where(
+            (fn.lower(Bot.username) << [u.lower() for u in usernames]) & searchable))
+    return {b.id for b in results}
+
+
+def index_search_bots(query):
+    usernames = re.findall(settings.REGEX_BOT_ONLY, query)
+    return {b.id for b in index.search(query, query.split(' '), usernames)}
+
+
+@pytest.fixture
+def catalog(bots):
+    bots[0].name, bots[0].extra = 'Music', 'Plays songs'
+    bots[1].name = 'Weather'
+    bots[2].extra = 'weather'  # not published yet
+    bots[9].extra = 'Weather'
+    bots[4].approved = False
+    bots[6].disabled = True
+    for b in bots[:10]:
+        b.save()
+    Keyword.create(name='music', entity=bots[3])
+    Keyword.create(name='music', entity=bots[4])
+    Keyword.create(name='news', entity=bots[7])
+    return bots
+
+
+@pytest.mark.parametrize('query', [
+    'test1', 'test', '@test12bot', 'music', 'weather', 'plays songs', 'news', 'music news',
+    '@test3bot @test13bot', '@test4bot', 'test6bot', 'nothing',
+])
+def test_index_finds_the_same_bots_as_the_sql_search(catalog, query):
+    assert index_search_bots(query) == sql_search_bots(query)
+
+
+def test_ranked_search_also_matches_parts_of_usernames(bots):
+    from botlistbot import search
+
+    botlist = Bot.create(revision=10, category=bots[0].category, username='@BotListBot',
+                         date_added=bots[0].date_added)
+    bots[1].description = 'Keeps lists of your tasks'
+    bots[1].save()
+
+    results = search.search_bots('list', ranked=True)
+    assert results.index(bots[1]) < results.index(botlist)
+    assert search.search_bots('test3bot', ranked=True)[0] == bots[3]
+    assert search.search_bots('@test7bot music', ranked=True)[0] == bots[7]
+
+
+def test_mistyped_queries_find_bots_by_the_current_name(bots):
+    from botlistbot import search
+
+    bots[1].name = 'Weather'
+    bots[1].save()
+    assert search.search_bots('wether')[0] == bots[1]
+    assert search.search_bots('@tset13bot')[0] == bots[13]
+
+    bots[1].name = 'Forecast'
+    bots[1].save()
+    assert search.search_bots('forcast') == [bots[1]]
+    assert bots[1] not in search.search_bots('wether')
+
+
+def test_bots_changed_by_another_process_are_found(bots, monkeypatch):
+    monkeypatch.setattr(Revision, '_listening', True)
+    assert index_search_bots('weather') == set()
+    # saved by the bot checker, whose signals are not seen by this process
+    Bot.update(name='Weather').where(Bot.id == bots[1].id).execute()
+    Keyword.insert(name='forecast', entity=bots[1]).execute()
+    Bot.update(disabled=True).where(Bot.id == bots[3].id).execute()
+    assert index_search_bots('weather') == set()
+
+    for bot in (bots[1], bots[3]):
+        Revision._bot_changed(json.dumps(dict(pid=os.getpid() + 1, bot=bot.id, category=None)))
+    assert index_search_bots('weather') == index_search_bots('forecast') == {bots[1].id}
+    assert index_search_bots('test3bot') == set()
+
+
+def test_index_is_rebuilt_without_a_listener(bots, monkeypatch):
+    assert index_search_bots('weather') == set()
+    Bot.update(name='Weather').where(Bot.id == bots[1].id).execute()
+    assert index_search_bots('weather') == set()
+
+    monkeypatch.setattr(settings, 'REVISION_REFRESH_INTERVAL', -1)
+    assert index_search_bots('weather') == {bots[1].id}
@@ -0,0 +1,16 @@
+from botlistbot.models import Statistic, User
+from tests.models.conftest import assert_max_queries
+
+
+def test_statistics_are_written_in_bulk(database):
+    user = User.create(chat_id=1234, first_name="Joseph")
+
+    with assert_max_queries(0):
+        for i in range(50):
+            Statistic.of(user, 'search', 'query {}'.format(i))
+    assert Statistic.select().count() == 0
+
+    with assert_max_queries(1):
+        assert Statistic.flush() == 50
+    assert Statistic.select().where(Statistic.user == user).count() == 50
+    assert Statistic.flush() == 0
@@ -0,0 +1,28 @@
+from telegram import User as TelegramUser
+
+from botlistbot.models import User
+from tests.models.conftest import assert_max_queries
+
+
+def test_known_users_are_served_from_cache(database):
+    tg_user = TelegramUser(id=1234, first_name="Joseph", is_bot=False, username="josxa")
+    created = User.from_telegram_object(tg_user)
+
+    with assert_max_queries(0):
+        for _ in range(5):
+            assert User.from_telegram_object(tg_user) is created
+
+
+def test_name_changes_are_written_in_batches(database):
+    users = [TelegramUser(id=i, first_name="User", is_bot=False) for i in range(1, 11)]
+    for u in users:
+        User.from_telegram_object(u)
+
+    with assert_max_queries(0):
+        for u in users:
+            User.from_telegram_object(TelegramUser(id=u.id, first_name="Renamed", is_bot=False))
+
+    with assert_max_queries(1):
+        assert User.flush_changes() == 10
+    assert User.select().where(User.first_name == "Renamed").count() == 10
+    assert User.flush_changes() == 0